@@ -8,3 +8,7 @@ class SiteConfigurationError(Exception):
 
 class MissingLmsUserIdException(Exception):
     """Exception indicating the user is missing an LMS user id. """
+
+
+class RequestBudgetExceeded(Exception):
+    """ Raised when a request exceeds its instrumentation budgets, and budgets are enforced. """
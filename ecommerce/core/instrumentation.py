@@ -0,0 +1,172 @@
+"""
+Per-request instrumentation of database queries, TieredCache lookups and outbound API calls.
+
+While `track_request_metrics` is active, every SQL query made through any database connection, every
+TieredCache lookup and every response received by a `SiteConfiguration.oauth_api_client` is recorded in a
+RequestMetrics object. RequestInstrumentationMiddleware uses it to export these metrics for every request as
+custom monitoring attributes, and to check them against the configured budgets.
+"""
+
+
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from urllib.parse import urlparse
+
+from django.db import connections
+from edx_django_utils.cache import TieredCache
+
+_local = threading.local()
+
+IN_CLAUSE_PATTERN = re.compile(r'IN \((?:%s, )*%s\)')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def fingerprint_sql(sql):
+    """
+    Returns the fingerprint of an SQL statement, shared by all the executions of the same query.
+
+    Parameter values are not part of the SQL passed to execute wrappers, so only the variable length of IN
+    clauses needs to be normalized.
+    """
+    return IN_CLAUSE_PATTERN.sub('IN (...)', WHITESPACE_PATTERN.sub(' ', sql.strip()))
+
+
+class RequestMetrics:
+    """
+    Metrics recorded while handling a single request.
+
+    Instances are used as database execute wrappers, so they count and time every query they wrap.
+    """
+
+    UNKNOWN_RESOURCE = 'unknown'
+
+    def __init__(self):
+        self.sql_queries = 0
+        self.sql_time = 0.0
+        self.sql_fingerprints = Counter()
+        self.cache_hits = Counter()
+        self.cache_misses = Counter()
+        self.http_calls = Counter()
+        self.cache_key_resources = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.sql_queries += 1
+            self.sql_fingerprints[fingerprint_sql(sql)] += 1
+
+    @property
+    def duplicate_queries(self):
+        """ Number of queries that repeated a query already made during the request. """
+        return sum(count - 1 for count in self.sql_fingerprints.values())
+
+    def record_cache_lookup(self, key, is_found):
+        resource = self.cache_key_resources.get(key, self.UNKNOWN_RESOURCE)
+        if is_found:
+            self.cache_hits[resource] += 1
+        else:
+            self.cache_misses[resource] += 1
+
+    def as_custom_attributes(self):
+        """ Returns the metrics as custom monitoring attributes. Counters are formatted as `name:count` lists. """
+        def format_counter(counter):
+            return ','.join('{}:{}'.format(name, count) for name, count in counter.most_common())
+
+        top_duplicate_queries = [
+            (fingerprint, count) for fingerprint, count in self.sql_fingerprints.most_common(3) if count > 1
+        ]
+        return {
+            'request_sql_query_count': self.sql_queries,
+            'request_sql_time_ms': round(self.sql_time * 1000, 2),
+            'request_sql_duplicate_query_count': self.duplicate_queries,
+            'request_sql_top_duplicate_queries': ' | '.join(
+                '{}x {}'.format(count, fingerprint[:200]) for fingerprint, count in top_duplicate_queries
+            ),
+            'request_cache_hit_count': sum(self.cache_hits.values()),
+            'request_cache_miss_count': sum(self.cache_misses.values()),
+            'request_cache_hits': format_counter(self.cache_hits),
+            'request_cache_misses': format_counter(self.cache_misses),
+            'request_http_call_count': sum(self.http_calls.values()),
+            'request_http_calls': format_counter(self.http_calls),
+        }
+
+    def exceeded_budgets(self, budgets):
+        """
+        Compares the metrics to the given budgets.
+
+        Arguments:
+            budgets (dict): Maximum values of `sql_queries`, `duplicate_queries`, `cache_misses` and `http_calls`.
+                Missing or None budgets are not enforced.
+
+        Returns:
+            list: Descriptions of the exceeded budgets, empty if there are none.
+        """
+        values = {
+            'sql_queries': self.sql_queries,
+            'duplicate_queries': self.duplicate_queries,
+            'cache_misses': sum(self.cache_misses.values()),
+            'http_calls': sum(self.http_calls.values()),
+        }
+        return [
+            '{} {} exceeds the budget of {}'.format(values[name], name, budget)
+            for name, budget in sorted(budgets.items())
+            if budget is not None and values.get(name, 0) > budget
+        ]
+
+
+def get_current_metrics():
+    """ Returns the RequestMetrics of the request being tracked in this thread, or None. """
+    return getattr(_local, 'metrics', None)
+
+
+@contextmanager
+def track_request_metrics():
+    """ Records the queries, cache lookups and API calls made in the block in a new RequestMetrics. """
+    metrics = RequestMetrics()
+    previous_metrics = get_current_metrics()
+    _local.metrics = metrics
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            yield metrics
+    finally:
+        _local.metrics = previous_metrics
+
+
+def record_cache_key(key, resource):
+    """ Attributes lookups of the given cache key, in the current request, to the given resource. """
+    metrics = get_current_metrics()
+    if metrics is not None:
+        metrics.cache_key_resources[key] = resource or RequestMetrics.UNKNOWN_RESOURCE
+
+
+def record_http_call(response, *args, **kwargs):  # pylint: disable=unused-argument
+    """ Response hook recording an API call, by host, in the current request. """
+    metrics = get_current_metrics()
+    if metrics is not None:
+        metrics.http_calls[urlparse(response.url).netloc] += 1
+
+
+def install_tiered_cache_hook():
+    """ Wraps TieredCache.get_cached_response, once, so that lookups are recorded in the current request. """
+    if getattr(TieredCache.get_cached_response, 'is_instrumented', False):
+        return
+
+    get_cached_response = TieredCache.get_cached_response
+
+    def instrumented_get_cached_response(key):
+        cached_response = get_cached_response(key)
+        metrics = get_current_metrics()
+        if metrics is not None:
+            metrics.record_cache_lookup(key, cached_response.is_found)
+        return cached_response
+
+    instrumented_get_cached_response.is_instrumented = True
+    TieredCache.get_cached_response = staticmethod(instrumented_get_cached_response)
@@ -0,0 +1,57 @@
+"""
+Middleware for the core app.
+"""
+
+
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from edx_django_utils import monitoring as monitoring_utils
+
+from ecommerce.core.exceptions import RequestBudgetExceeded
+from ecommerce.core.instrumentation import install_tiered_cache_hook, track_request_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Records the SQL queries, TieredCache lookups and API calls made by each request, when
+    REQUEST_INSTRUMENTATION_ENABLED is set.
+
+    The metrics are exported as custom monitoring attributes, and compared to the budgets configured in
+    REQUEST_INSTRUMENTATION_BUDGETS for the view handling the request, or to its 'default' budgets. Exceeded
+    budgets are logged, or raise RequestBudgetExceeded if REQUEST_INSTRUMENTATION_ENFORCE_BUDGETS is set, as it
+    can be in tests.
+
+    When instrumentation is disabled, the middleware is removed from the middleware chain, and TieredCache is left
+    untouched.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        install_tiered_cache_hook()
+
+    def __call__(self, request):
+        with track_request_metrics() as metrics:
+            response = self.get_response(request)
+
+        for name, value in metrics.as_custom_attributes().items():
+            monitoring_utils.set_custom_attribute(name, value)
+
+        view_name = request.resolver_match.view_name if request.resolver_match else None
+        budgets = settings.REQUEST_INSTRUMENTATION_BUDGETS
+        exceeded_budgets = metrics.exceeded_budgets(budgets.get(view_name, budgets.get('default', {})))
+        if exceeded_budgets:
+            message = 'Request to [{path}] exceeded its budgets: {budgets}.'.format(
+                path=request.path, budgets='; '.join(exceeded_budgets)
+            )
+            if settings.REQUEST_INSTRUMENTATION_ENFORCE_BUDGETS:
+                raise RequestBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
@@ -9,8 +9,10 @@ from django.contrib.sites.models import Site
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
 from django.utils.translation import ugettext_lazy as _
 from edx_django_utils import monitoring as monitoring_utils
+from edx_django_utils.cache import TieredCache
 from edx_rbac.models import UserRole, UserRoleAssignment
 from edx_rest_api_client.client import OAuthAPIClient
 from jsonfield.fields import JSONField
@@ -20,10 +22,11 @@ from simple_history.models import HistoricalRecords
 
 from ecommerce.core.constants import ALL_ACCESS_CONTEXT, ALLOW_MISSING_LMS_USER_ID
 from ecommerce.core.exceptions import MissingLmsUserIdException
-from ecommerce.core.utils import log_message_and_raise_validation_error
+from ecommerce.core.instrumentation import record_http_call
+from ecommerce.core.utils import get_cache_key, log_message_and_raise_validation_error
 from ecommerce.extensions.basket.constants import ENABLE_STRIPE_PAYMENT_PROCESSOR
 from ecommerce.extensions.payment.exceptions import ProcessorNotFoundError
-from ecommerce.extensions.payment.helpers import get_processor_class, get_processor_class_by_name
+from ecommerce.extensions.payment.helpers import get_processor_class_by_name, get_processor_classes
 
 log = logging.getLogger(__name__)
 
@@ -250,30 +253,55 @@ class SiteConfiguration(models.Model):
 
     def _all_payment_processors(self):
         """ Returns all processor classes declared in settings. """
-        all_processors = [get_processor_class(path) for path in settings.PAYMENT_PROCESSORS]
-        return all_processors
+        return list(get_processor_classes())
+
+    @property
+    def _payment_processors_cache_key(self):
+        return get_cache_key(
+            site_id=self.site_id,
+            payment_processors=self.payment_processors,
+            processor_paths=settings.PAYMENT_PROCESSORS,
+        )
+
+    def invalidate_payment_processors_cache(self):
+        """ Clears the cached list of enabled payment processors, e.g. after a processor switch is toggled. """
+        TieredCache.delete_all_tiers(self._payment_processors_cache_key)
 
     def get_payment_processors(self):
         """
         Returns payment processor classes enabled for the corresponding Site
 
+        The names of the enabled processors are cached for PAYMENT_PROCESSORS_CACHE_TIMEOUT seconds, keyed by
+        the payment_processors field. The cache is cleared when a payment processor waffle switch is toggled.
+
         Returns:
             list[BasePaymentProcessor]: Returns payment processor classes enabled for the corresponding Site
         """
         all_processors = self._all_payment_processors()
-        all_processor_names = {processor.NAME for processor in all_processors}
+        cache_key = self._payment_processors_cache_key
+        cached_response = TieredCache.get_cached_response(cache_key)
+        if cached_response.is_found:
+            monitoring_utils.increment('payment_processors_cache_hit')
+            enabled_processor_names = cached_response.value
+        else:
+            monitoring_utils.increment('payment_processors_cache_miss')
+            payment_processors_set = self.payment_processors_set
+            all_processor_names = {processor.NAME for processor in all_processors}
+
+            missing_processor_configurations = payment_processors_set - all_processor_names
+            if missing_processor_configurations:
+                processor_config_repr = ", ".join(missing_processor_configurations)
+                log.warning(
+                    'Unknown payment processors [%s] are configured for site %s', processor_config_repr, self.site.id
+                )
 
-        missing_processor_configurations = self.payment_processors_set - all_processor_names
-        if missing_processor_configurations:
-            processor_config_repr = ", ".join(missing_processor_configurations)
-            log.warning(
-                'Unknown payment processors [%s] are configured for site %s', processor_config_repr, self.site.id
-            )
+            enabled_processor_names = [
+                processor.NAME for processor in all_processors
+                if processor.NAME in payment_processors_set and processor.is_enabled()
+            ]
+            TieredCache.set_all_tiers(cache_key, enabled_processor_names, settings.PAYMENT_PROCESSORS_CACHE_TIMEOUT)
 
-        return [
-            processor for processor in all_processors
-            if processor.NAME in self.payment_processors_set and processor.is_enabled()
-        ]
+        return [processor for processor in all_processors if processor.NAME in enabled_processor_names]
 
     def get_client_side_payment_processor_class(self, request):
         """ Returns the payment processor class to be used for client-side payments.
@@ -390,14 +418,22 @@ class SiteConfiguration(models.Model):
         """
         This client is authenticated with the configured oauth settings and automatically cached.
 
+        The client class can be replaced through the BACKEND_SERVICE_API_CLIENT_CLASS setting, e.g. with
+        StubAPIClient for load tests that should not reach the remote services.
+
         Returns:
             requests.Session: API client
         """
-        return OAuthAPIClient(
+        client_class = OAuthAPIClient
+        if settings.BACKEND_SERVICE_API_CLIENT_CLASS:
+            client_class = import_string(settings.BACKEND_SERVICE_API_CLIENT_CLASS)
+        client = client_class(
             settings.BACKEND_SERVICE_EDX_OAUTH2_PROVIDER_URL,
             settings.BACKEND_SERVICE_EDX_OAUTH2_KEY,
             settings.BACKEND_SERVICE_EDX_OAUTH2_SECRET,
         )
+        client.hooks['response'].append(record_http_call)
+        return client
 
     @cached_property
     def embargo_api_url(self):
@@ -459,6 +495,9 @@ class User(AbstractUser):
     class Meta:
         get_latest_by = 'date_joined'
         db_table = 'ecommerce_user'
+        indexes = [
+            models.Index(fields=['email']),
+        ]
 
     @property
     def access_token(self):
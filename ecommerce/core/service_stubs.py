@@ -0,0 +1,121 @@
+"""
+In-memory stand-ins for the remote services called through `SiteConfiguration.oauth_api_client`.
+
+Setting BACKEND_SERVICE_API_CLIENT_CLASS to 'ecommerce.core.service_stubs.StubAPIClient' makes every call to the
+Discovery, LMS (enrollment, entitlement, embargo) and Enterprise APIs return canned responses instead of reaching
+the network. This allows the checkout hot paths to be load tested on a single machine.
+
+Responses are looked up in SERVICE_STUB_FIXTURES, a JSON file holding a list of routes, before the default
+routes below. Each route is a dictionary with the following keys:
+
+    method: HTTP method, or '*' to match any method (optional, defaults to GET).
+    path: Regular expression searched for in the path of the requested URL.
+    status: HTTP status code of the response (optional, defaults to 200).
+    json: Body of the response.
+
+SERVICE_STUB_LATENCY adds a delay, in seconds, to every response to approximate the latency of the real services.
+"""
+
+
+import json
+import logging
+import re
+import time
+from functools import lru_cache
+
+import requests
+from django.conf import settings
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROUTES = [
+    # Discovery
+    {'path': r'/catalog/query_contains/$', 'json': {}},
+    {'path': r'/catalogs/[^/]+/contains/$', 'json': {'courses': {}}},
+    {'path': r'/course_runs/[^/]+/$', 'json': {'key': 'course-v1:edX+DemoX+Demo_Course', 'title': 'Demo Course'}},
+    {'path': r'/courses/[^/]+/$', 'json': {'key': 'edX+DemoX', 'title': 'Demo Course', 'course_runs': []}},
+    {'path': r'/programs/[^/]+/$', 'json': {'uuid': None, 'title': 'Demo Program', 'courses': []}},
+    # LMS
+    {'path': r'/api/embargo/v1/course_access/$', 'json': {'access': True}},
+    {'path': r'/api/enrollment/v1/enrollment', 'json': []},
+    {'method': 'POST', 'path': r'/api/entitlements/v1/entitlements/$', 'status': 201, 'json': {'uuid': None}},
+    {'path': r'/api/entitlements/v1/entitlements/', 'json': {'count': 0, 'next': None, 'results': []}},
+    # Enterprise
+    {'path': r'/contains_content_items/$', 'json': {'contains_content_items': True, 'catalog_list': []}},
+    {'path': r'/enterprise-learner/$', 'json': {'count': 0, 'next': None, 'previous': None, 'results': []}},
+    {'path': r'/enterprise-customer/[^/]+/$', 'json': {}},
+]
+
+
+@lru_cache(maxsize=None)
+def load_routes(fixtures_path):
+    """
+    Returns the compiled routes served by the stub backend, those of the given fixtures file first.
+
+    Arguments:
+        fixtures_path (str): Path of a JSON file holding a list of routes, or None.
+
+    Returns:
+        list: (method, compiled path pattern, status, body) tuples.
+    """
+    routes = []
+    if fixtures_path:
+        with open(fixtures_path) as fixtures_file:
+            routes = json.load(fixtures_file)
+
+    return [
+        (route.get('method', 'GET').upper(), re.compile(route['path']), route.get('status', 200), route.get('json'))
+        for route in routes + DEFAULT_ROUTES
+    ]
+
+
+class StubServiceAdapter(BaseAdapter):
+    """ Transport adapter answering every request with the response of the first matching route. """
+
+    def __init__(self, routes, latency=0):
+        super(StubServiceAdapter, self).__init__()
+        self.routes = routes
+        self.latency = latency
+
+    def send(self, request, **kwargs):  # pylint: disable=arguments-differ
+        path = requests.utils.urlparse(request.url).path
+        status, body = 404, {'detail': 'Not found.'}
+        for method, pattern, route_status, route_body in self.routes:
+            if method in ('*', request.method) and pattern.search(path):
+                status, body = route_status, route_body
+                break
+        else:
+            logger.warning('[Service stubs] No route matches [%s %s].', request.method, request.url)
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+        response._content = json.dumps(body).encode('utf-8')  # pylint: disable=protected-access
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+class StubAPIClient(requests.Session):
+    """
+    Drop-in replacement for OAuthAPIClient, serving the stub routes without any network access.
+
+    The OAuth arguments are accepted, and ignored, so the class can be selected through the
+    BACKEND_SERVICE_API_CLIENT_CLASS setting.
+    """
+
+    def __init__(self, oauth_uri=None, client_id=None, client_secret=None, **kwargs):  # pylint: disable=unused-argument
+        super(StubAPIClient, self).__init__()
+        adapter = StubServiceAdapter(load_routes(settings.SERVICE_STUB_FIXTURES), settings.SERVICE_STUB_LATENCY)
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
@@ -0,0 +1,130 @@
+
+
+import mock
+from django.contrib.sites.models import Site
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import resolve, reverse
+from edx_django_utils.cache import TieredCache
+
+from ecommerce.core.exceptions import RequestBudgetExceeded
+from ecommerce.core.instrumentation import fingerprint_sql, install_tiered_cache_hook, track_request_metrics
+from ecommerce.core.middleware import RequestInstrumentationMiddleware
+from ecommerce.core.utils import get_cache_key
+from ecommerce.tests.testcases import TestCase
+
+
+class RequestMetricsTests(TestCase):
+    """ Tests for the per-request metrics. """
+
+    def setUp(self):
+        super(RequestMetricsTests, self).setUp()
+        install_tiered_cache_hook()
+
+    def test_fingerprint_sql(self):
+        self.assertEqual(
+            fingerprint_sql('SELECT *\n  FROM "t" WHERE "id" IN (%s, %s, %s)'),
+            fingerprint_sql('SELECT * FROM "t" WHERE "id" IN (%s)'),
+        )
+
+    def test_sql_queries(self):
+        """ Verify queries are counted, and repeated queries are reported as duplicates. """
+        with track_request_metrics() as metrics:
+            for site_id in range(3):
+                list(Site.objects.filter(id=site_id))
+            Site.objects.count()
+
+        self.assertEqual(metrics.sql_queries, 4)
+        self.assertEqual(metrics.duplicate_queries, 2)
+        attributes = metrics.as_custom_attributes()
+        self.assertEqual(attributes['request_sql_query_count'], 4)
+        self.assertEqual(attributes['request_sql_duplicate_query_count'], 2)
+        self.assertTrue(attributes['request_sql_top_duplicate_queries'].startswith('3x SELECT'))
+
+    def test_cache_lookups(self):
+        """ Verify TieredCache lookups are counted by the resource of their cache key. """
+        TieredCache.set_all_tiers(get_cache_key(resource='catalogs', catalog_id=1), True, 60)
+
+        with track_request_metrics() as metrics:
+            TieredCache.get_cached_response(get_cache_key(resource='course_runs', course_id='a/b/c'))
+            TieredCache.get_cached_response(get_cache_key(resource='catalogs', catalog_id=1))
+            TieredCache.get_cached_response('not-a-resource-key')
+
+        self.assertEqual(dict(metrics.cache_hits), {'catalogs': 1})
+        self.assertEqual(dict(metrics.cache_misses), {'course_runs': 1, 'unknown': 1})
+
+    @override_settings(BACKEND_SERVICE_API_CLIENT_CLASS='ecommerce.core.service_stubs.StubAPIClient')
+    def test_http_calls(self):
+        """ Verify API calls are counted by host. """
+        site_configuration = self.site.siteconfiguration
+        with track_request_metrics() as metrics:
+            site_configuration.oauth_api_client.get(site_configuration.embargo_api_url + 'course_access/')
+            site_configuration.oauth_api_client.get('https://enterprise.example.com/enterprise-learner/')
+
+        self.assertEqual(dict(metrics.http_calls), {'lms.testserver.fake': 1, 'enterprise.example.com': 1})
+
+    def test_exceeded_budgets(self):
+        with track_request_metrics() as metrics:
+            Site.objects.count()
+            Site.objects.count()
+
+        self.assertEqual(metrics.exceeded_budgets({'sql_queries': 2, 'http_calls': None}), [])
+        self.assertEqual(
+            metrics.exceeded_budgets({'sql_queries': 1, 'duplicate_queries': 0}),
+            ['1 duplicate_queries exceeds the budget of 0', '2 sql_queries exceeds the budget of 1'],
+        )
+
+
+class RequestInstrumentationMiddlewareTests(TestCase):
+    """ Tests for RequestInstrumentationMiddleware. """
+
+    @override_settings(REQUEST_INSTRUMENTATION_ENABLED=True)
+    def test_custom_attributes(self):
+        with mock.patch('ecommerce.core.middleware.monitoring_utils.set_custom_attribute') as mock_set_attribute:
+            self.client.get(reverse('health'))
+
+        attributes = {call[0][0]: call[0][1] for call in mock_set_attribute.call_args_list}
+        self.assertGreater(attributes['request_sql_query_count'], 0)
+        self.assertEqual(attributes['request_http_call_count'], 0)
+
+    def test_disabled(self):
+        with mock.patch('ecommerce.core.middleware.monitoring_utils.set_custom_attribute') as mock_set_attribute:
+            self.client.get(reverse('health'))
+        self.assertNotIn('request_sql_query_count', [call[0][0] for call in mock_set_attribute.call_args_list])
+
+    def test_disabled_middleware_not_used(self):
+        """ Verify the middleware is not used, and TieredCache is not patched, when instrumentation is disabled. """
+        with mock.patch('ecommerce.core.middleware.install_tiered_cache_hook') as mock_install:
+            with self.assertRaises(MiddlewareNotUsed):
+                RequestInstrumentationMiddleware(HttpResponse)
+        self.assertFalse(mock_install.called)
+
+    @override_settings(
+        REQUEST_INSTRUMENTATION_ENABLED=True,
+        REQUEST_INSTRUMENTATION_BUDGETS={'default': {'sql_queries': 1000}, 'health': {'sql_queries': 0}},
+        REQUEST_INSTRUMENTATION_ENFORCE_BUDGETS=True,
+    )
+    def test_enforced_budgets(self):
+        """ Verify the budgets of the view handling the request are enforced. """
+        def get_response(request):  # pylint: disable=unused-argument
+            Site.objects.count()
+            return HttpResponse()
+
+        request = RequestFactory().get(reverse('health'))
+        request.resolver_match = resolve(reverse('health'))
+        middleware = RequestInstrumentationMiddleware(get_response)
+
+        with self.assertRaisesRegex(RequestBudgetExceeded, '1 sql_queries exceeds the budget of 0'):
+            middleware(request)
+
+    @override_settings(
+        REQUEST_INSTRUMENTATION_ENABLED=True,
+        REQUEST_INSTRUMENTATION_BUDGETS={'default': {'sql_queries': 0}},
+    )
+    def test_exceeded_budgets_logged(self):
+        with mock.patch('ecommerce.core.middleware.logger.warning') as mock_warning:
+            response = self.client.get(reverse('health'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(mock_warning.called)
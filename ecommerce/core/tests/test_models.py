@@ -330,6 +330,25 @@ class SiteConfigurationTests(TestCase):
         result = site_config.get_payment_processors()
         self.assertEqual(result, expected_result)
 
+    @override_settings(PAYMENT_PROCESSORS=[
+        'ecommerce.extensions.payment.tests.processors.DummyProcessor',
+        'ecommerce.extensions.payment.tests.processors.AnotherDummyProcessor',
+    ])
+    def test_get_payment_processors_cached(self):
+        """ Tests that the enabled processors are cached until a processor switch is toggled """
+        self._enable_processor_switches([DummyProcessor, AnotherDummyProcessor])
+        site_config = self.site.siteconfiguration
+        site_config.payment_processors = ','.join([DummyProcessor.NAME, AnotherDummyProcessor.NAME])
+        site_config.save()
+
+        self.assertEqual(site_config.get_payment_processors(), [DummyProcessor, AnotherDummyProcessor])
+        with mock.patch.object(DummyProcessor, 'is_enabled') as mock_is_enabled:
+            self.assertEqual(site_config.get_payment_processors(), [DummyProcessor, AnotherDummyProcessor])
+            self.assertFalse(mock_is_enabled.called)
+
+        toggle_switch(settings.PAYMENT_PROCESSOR_SWITCH_PREFIX + AnotherDummyProcessor.NAME, False)
+        self.assertEqual(site_config.get_payment_processors(), [DummyProcessor])
+
     def test_get_client_side_payment_processor(self):
         """ Verify the method returns the client-side payment processor. """
         processor_name = 'cybersource'
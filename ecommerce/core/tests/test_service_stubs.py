@@ -0,0 +1,61 @@
+
+
+import json
+import tempfile
+
+import mock
+from django.test import override_settings
+from requests.exceptions import HTTPError
+
+from ecommerce.core.service_stubs import StubAPIClient, load_routes
+from ecommerce.enterprise.api import catalog_contains_course_runs
+from ecommerce.tests.testcases import TestCase
+
+
+@override_settings(
+    BACKEND_SERVICE_API_CLIENT_CLASS='ecommerce.core.service_stubs.StubAPIClient',
+    SERVICE_STUB_FIXTURES=None,
+    SERVICE_STUB_LATENCY=0,
+)
+class StubAPIClientTests(TestCase):
+    """ Tests for the in-memory service stubs. """
+
+    def setUp(self):
+        super(StubAPIClientTests, self).setUp()
+        load_routes.cache_clear()
+        self.addCleanup(load_routes.cache_clear)
+        self.site_configuration = self.site.siteconfiguration
+
+    def test_oauth_api_client_class_setting(self):
+        """ Verify the site configuration API client class is selected by the setting. """
+        self.assertIsInstance(self.site_configuration.oauth_api_client, StubAPIClient)
+
+    def test_default_routes(self):
+        """ Verify the code calling remote services gets the default responses. """
+        client = self.site_configuration.oauth_api_client
+        response = client.get(self.site_configuration.embargo_api_url + 'course_access/', params={'user': 'edx'})
+        self.assertEqual(response.json(), {'access': True})
+        self.assertTrue(catalog_contains_course_runs(self.site, ['course-v1:edX+DemoX+Demo_Course'], 'fake-uuid'))
+
+    def test_unknown_route(self):
+        response = self.site_configuration.oauth_api_client.get('https://example.com/api/unknown/')
+        self.assertEqual(response.status_code, 404)
+        with self.assertRaises(HTTPError):
+            response.raise_for_status()
+
+    def test_fixtures(self):
+        """ Verify the routes of the fixtures file take precedence over the default routes. """
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as fixtures_file:
+            json.dump([{'path': r'/course_access/$', 'json': {'access': False}}], fixtures_file)
+            fixtures_file.flush()
+
+            with override_settings(SERVICE_STUB_FIXTURES=fixtures_file.name):
+                client = self.site_configuration.oauth_api_client
+                response = client.get(self.site_configuration.embargo_api_url + 'course_access/')
+        self.assertEqual(response.json(), {'access': False})
+
+    @override_settings(SERVICE_STUB_LATENCY=0.25)
+    def test_latency(self):
+        with mock.patch('ecommerce.core.service_stubs.time.sleep') as mock_sleep:
+            self.site_configuration.oauth_api_client.get(self.site_configuration.embargo_api_url + 'course_access/')
+        mock_sleep.assert_called_once_with(0.25)
@@ -8,6 +8,8 @@ from django.conf import settings
 from django.core.exceptions import ValidationError
 from edx_django_utils.cache import get_cache_key as get_django_cache_key
 
+from ecommerce.core.instrumentation import record_cache_key
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,7 +31,9 @@ def get_cache_key(**kwargs):
     """
     Wrapper method on edx_django_utils get_cache_key utility.
     """
-    return get_django_cache_key(**kwargs)
+    cache_key = get_django_cache_key(**kwargs)
+    record_cache_key(cache_key, kwargs.get('resource'))
+    return cache_key
 
 
 def deprecated_traverse_pagination(response, client, api_url):
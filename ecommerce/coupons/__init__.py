@@ -0,0 +1 @@
+default_app_config = 'ecommerce.coupons.apps.CouponsConfig'
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CouponsConfig(AppConfig):
+    name = 'ecommerce.coupons'
+
+    def ready(self):
+        # Register signal handlers
+        import ecommerce.coupons.signals  # pylint: disable=unused-import, import-outside-toplevel
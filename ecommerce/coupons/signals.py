@@ -0,0 +1,26 @@
+"""
+Signal handlers for the coupons app.
+"""
+
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from ecommerce.coupons.utils import invalidate_coupon_redemption_plans
+
+
+@receiver(post_save, sender='voucher.Voucher', dispatch_uid='coupons.invalidate_redemption_plans_on_voucher_save')
+def invalidate_redemption_plans_on_voucher_save(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_coupon_redemption_plans(codes=[instance.code])
+
+
+@receiver(post_save, sender='offer.ConditionalOffer', dispatch_uid='coupons.invalidate_redemption_plans_on_offer_save')
+def invalidate_redemption_plans_on_offer_save(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_coupon_redemption_plans(codes=instance.vouchers.values_list('code', flat=True))
+
+
+@receiver(
+    post_save, sender='partner.StockRecord', dispatch_uid='coupons.invalidate_redemption_plans_on_stock_record_save'
+)
+def invalidate_redemption_plans_on_stock_record_save(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_coupon_redemption_plans(skus=[instance.partner_sku])
@@ -1,17 +1,21 @@
 
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import ddt
 import responses
 from edx_django_utils.cache import TieredCache
 from mock import patch
+from oscar.core.loading import get_model
 from oscar.test.factories import ProductFactory, RangeFactory, VoucherFactory
 from pytz import UTC
 
 from ecommerce.coupons.tests.mixins import CouponMixin, DiscoveryMockMixin
 from ecommerce.coupons.utils import (
+    CouponRedemptionPlan,
+    Voucher,
     fetch_course_catalog,
+    get_coupon_redemption_plan,
     is_coupon_available,
     is_voucher_applied,
     prepare_course_seat_types,
@@ -21,6 +25,8 @@ from ecommerce.extensions.basket.utils import prepare_basket
 from ecommerce.extensions.test.factories import prepare_voucher
 from ecommerce.tests.testcases import TestCase
 
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+
 
 @ddt.ddt
 class CouponUtilsTests(TestCase, CouponMixin, DiscoveryMockMixin):
@@ -127,3 +133,72 @@ class CouponUtilsTests(TestCase, CouponMixin, DiscoveryMockMixin):
         coupon = self.create_coupon(start_datetime=start_datetime, end_datetime=end_datetime)
         with patch.object(timezone, 'now', return_value=timezone_now):
             self.assertEqual(is_coupon_available(coupon), coupon_available)
+
+
+@ddt.ddt
+class CouponRedemptionPlanTests(TestCase):
+    """ Tests for the cached coupon redemption plans. """
+
+    def setUp(self):
+        super(CouponRedemptionPlanTests, self).setUp()
+        product = ProductFactory(stockrecords__price=100)
+        self.voucher, self.product = prepare_voucher(_range=RangeFactory(products=[product]), benefit_value=10)
+        self.sku = self.product.stockrecords.first().partner_sku
+
+    def test_plan_cached(self):
+        """ Verify plans are cached, with only the offer usage reloaded from the database. """
+        plan = get_coupon_redemption_plan(self.site, self.voucher.code, self.sku)
+        self.assertEqual(plan.voucher, self.voucher)
+        self.assertEqual(plan.product, self.product)
+        self.assertEqual(plan.offer, self.voucher.best_offer)
+        self.assertIsNone(plan.enterprise_customer)
+
+        # Recording the usage saves the offer, which would invalidate the plan.
+        ConditionalOffer.objects.filter(id=self.voucher.best_offer.id).update(num_applications=1)
+        with self.assertNumQueries(1):
+            plan = get_coupon_redemption_plan(self.site, self.voucher.code, self.sku)
+            self.assertEqual(plan.offer.num_applications, 1)
+
+    def test_plan_invalidated_on_voucher_save(self):
+        """ Verify plans are rebuilt after their voucher is saved. """
+        get_coupon_redemption_plan(self.site, self.voucher.code, self.sku)
+
+        self.voucher.end_datetime = self.voucher.start_datetime + timedelta(days=1)
+        self.voucher.save()
+        plan = get_coupon_redemption_plan(self.site, self.voucher.code, self.sku)
+        self.assertEqual(plan.voucher.end_datetime, self.voucher.end_datetime)
+
+    def test_plan_invalidated_on_offer_save(self):
+        """ Verify plans are rebuilt after an offer of their voucher is saved. """
+        get_coupon_redemption_plan(self.site, self.voucher.code, self.sku)
+
+        offer = self.voucher.best_offer
+        offer.email_domains = 'example.com'
+        offer.save()
+        plan = get_coupon_redemption_plan(self.site, self.voucher.code, self.sku)
+        self.assertEqual(plan.offer.email_domains, 'example.com')
+
+    def test_plan_invalidated_on_stock_record_save(self):
+        """ Verify plans are rebuilt after the stock record of their product is saved. """
+        plan = get_coupon_redemption_plan(self.site, self.voucher.code, self.sku)
+
+        stock_record = self.product.stockrecords.first()
+        stock_record.product = ProductFactory(stockrecords=[])
+        stock_record.save()
+        plan = get_coupon_redemption_plan(self.site, self.voucher.code, self.sku)
+        self.assertEqual(plan.product, stock_record.product)
+
+    def test_voucher_does_not_exist(self):
+        with self.assertRaises(Voucher.DoesNotExist):
+            get_coupon_redemption_plan(self.site, 'DOESNOTEXIST', self.sku)
+
+    @ddt.data(
+        (None, False),
+        ({'id': 'abc', 'enable_data_sharing_consent': False}, False),
+        ({'id': 'abc', 'enable_data_sharing_consent': True}, True),
+        ({'id': 'abc'}, True),
+    )
+    @ddt.unpack
+    def test_may_require_consent(self, enterprise_customer, expected):
+        plan = CouponRedemptionPlan(self.voucher, self.product, enterprise_customer)
+        self.assertEqual(plan.may_require_consent, expected)
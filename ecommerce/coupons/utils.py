@@ -3,6 +3,7 @@
 
 import hashlib
 import logging
+import uuid
 from urllib.parse import urljoin
 
 from django.conf import settings
@@ -11,8 +12,11 @@ from edx_django_utils.cache import TieredCache
 from oscar.core.loading import get_model
 
 from ecommerce.core.utils import get_cache_key
+from ecommerce.enterprise.utils import get_enterprise_customer_from_voucher
 
 Product = get_model('catalogue', 'Product')
+StockRecord = get_model('partner', 'StockRecord')
+Voucher = get_model('voucher', 'Voucher')
 
 logger = logging.getLogger(__name__)
 
@@ -183,3 +187,96 @@ def is_coupon_available(coupon):
     end_datetime = voucher.end_datetime
     current_datetime = timezone.now()
     return start_datetime < current_datetime < end_datetime
+
+
+class CouponRedemptionPlan:
+    """
+    Facts about the redemption of a voucher code for a product that are the same for every user.
+
+    Attributes:
+        voucher (Voucher): The voucher, with its offers prefetched.
+        product (Product): The redeemed product.
+        enterprise_customer (dict): The Enterprise Customer of the voucher, or None.
+    """
+
+    def __init__(self, voucher, product, enterprise_customer):
+        self.voucher = voucher
+        self.product = product
+        self.enterprise_customer = enterprise_customer
+
+    @property
+    def offer(self):
+        return self.voucher.best_offer
+
+    @property
+    def may_require_consent(self):
+        """
+        Whether users may have to provide data sharing consent to redeem the voucher.
+
+        Consent is never required by Enterprise Customers that do not enable data sharing consent, so asking the
+        consent service can be skipped for them.
+        """
+        return bool(self.enterprise_customer) and self.enterprise_customer.get('enable_data_sharing_consent', True)
+
+
+def _get_coupon_redemption_plan_version(**identifier):
+    """ Returns the version of the cached plans of the given voucher code or product SKU, or None. """
+    cached_response = TieredCache.get_cached_response(
+        get_cache_key(resource='coupon_redemption_plan_version', **identifier)
+    )
+    return cached_response.value if cached_response.is_found else None
+
+
+def invalidate_coupon_redemption_plans(codes=(), skus=()):
+    """
+    Invalidates the cached CouponRedemptionPlans of the given voucher codes and product SKUs.
+
+    The plans cannot be looked up by code or SKU alone, so a new version is set for each of them instead. The
+    versions are part of the cache keys of the plans. They only need to outlive the plans cached before them.
+    """
+    identifiers = [{'code': code} for code in codes] + [{'sku': sku} for sku in skus]
+    for identifier in identifiers:
+        TieredCache.set_all_tiers(
+            get_cache_key(resource='coupon_redemption_plan_version', **identifier),
+            uuid.uuid4().hex,
+            settings.COUPON_REDEMPTION_PLAN_CACHE_TIMEOUT
+        )
+
+
+def get_coupon_redemption_plan(site, code, sku):
+    """
+    Returns the CouponRedemptionPlan of the given voucher code and product SKU.
+
+    Plans are cached for COUPON_REDEMPTION_PLAN_CACHE_TIMEOUT seconds, and invalidated when their voucher, offers
+    or stock record are saved. The status and number of applications of the offer, which change as the voucher is
+    redeemed, are reloaded from the database on every call.
+
+    Raises:
+        Voucher.DoesNotExist: If there is no voucher with the given code.
+        StockRecord.DoesNotExist: If there is no product with the given SKU.
+        EnterpriseDoesNotExist: If the Enterprise Customer of the voucher does not exist.
+    """
+    cache_key = get_cache_key(
+        site_domain=site.domain,
+        resource='coupon_redemption_plan',
+        code=code,
+        sku=sku,
+        code_version=_get_coupon_redemption_plan_version(code=code),
+        sku_version=_get_coupon_redemption_plan_version(sku=sku),
+    )
+    cached_response = TieredCache.get_cached_response(cache_key)
+    if cached_response.is_found:
+        plan = cached_response.value
+        plan.offer.refresh_from_db(fields=['status', 'num_applications'])
+        return plan
+
+    voucher = Voucher.objects.prefetch_related(
+        'offers__condition', 'offers__benefit', 'offers__partner'
+    ).get(code=code)
+    product = StockRecord.objects.select_related(
+        'product__course', 'product__parent', 'product__product_class'
+    ).get(partner_sku=sku).product
+    plan = CouponRedemptionPlan(voucher, product, get_enterprise_customer_from_voucher(site, voucher))
+
+    TieredCache.set_all_tiers(cache_key, plan, settings.COUPON_REDEMPTION_PLAN_CACHE_TIMEOUT)
+    return plan
@@ -21,7 +21,7 @@ from rest_framework.views import APIView
 from ecommerce.core.url_utils import absolute_redirect, get_ecommerce_url, get_lms_course_about_url
 from ecommerce.core.views import StaffOnlyMixin
 from ecommerce.coupons.decorators import login_required_for_credit
-from ecommerce.coupons.utils import is_voucher_applied
+from ecommerce.coupons.utils import get_coupon_redemption_plan, is_voucher_applied
 from ecommerce.enterprise.decorators import set_enterprise_cookie
 from ecommerce.enterprise.exceptions import EnterpriseDoesNotExist
 from ecommerce.enterprise.utils import (
@@ -170,15 +170,22 @@ class CouponRedeemView(EdxOrderPlacementMixin, APIView):
             return render(request, template_name, {'error': _('SKU not provided.')})
 
         try:
-            voucher = Voucher.objects.get(code=code)
+            plan = get_coupon_redemption_plan(request.site, code, sku)
         except Voucher.DoesNotExist:
             msg = 'No voucher found with code {code}'.format(code=code)
             return render(request, template_name, {'error': _(msg)})
-
-        try:
-            product = StockRecord.objects.get(partner_sku=sku).product
         except StockRecord.DoesNotExist:
             return render(request, template_name, {'error': _('The product does not exist.')})
+        except EnterpriseDoesNotExist as e:
+            # If an EnterpriseException is caught while pulling the EnterpriseCustomer, that means there's no
+            # corresponding EnterpriseCustomer in the Enterprise service (which should never happen).
+            logger.exception(str(e))
+            return render(
+                request,
+                template_name,
+                {'error': _('Couldn\'t find a matching Enterprise Customer for this coupon.')}
+            )
+        voucher, product, enterprise_customer = plan.voucher, plan.product, plan.enterprise_customer
 
         valid_voucher, msg, hide_error_message = voucher_is_valid(voucher, [product], request)
         if not valid_voucher:
@@ -187,7 +194,7 @@ class CouponRedeemView(EdxOrderPlacementMixin, APIView):
                            request.user.username, product.id, voucher.code, msg)
             return render(request, template_name, {'error': msg, 'hide_error_message': hide_error_message})
 
-        offer = voucher.best_offer
+        offer = plan.offer
         if not offer.is_email_valid(request.user.email):
             logger.warning('[Code Redemption Failure] Unable to apply offer because the user\'s email '
                            'does not meet the domain requirements. '
@@ -198,18 +205,6 @@ class CouponRedeemView(EdxOrderPlacementMixin, APIView):
         if email_confirmation_response:
             return email_confirmation_response
 
-        try:
-            enterprise_customer = get_enterprise_customer_from_voucher(request.site, voucher)
-        except EnterpriseDoesNotExist as e:
-            # If an EnterpriseException is caught while pulling the EnterpriseCustomer, that means there's no
-            # corresponding EnterpriseCustomer in the Enterprise service (which should never happen).
-            logger.exception(str(e))
-            return render(
-                request,
-                template_name,
-                {'error': _('Couldn\'t find a matching Enterprise Customer for this coupon.')}
-            )
-
         if enterprise_customer and product.is_course_entitlement_product:
             return render(
                 request,
@@ -220,7 +215,7 @@ class CouponRedeemView(EdxOrderPlacementMixin, APIView):
                 }
             )
 
-        if enterprise_customer is not None and enterprise_customer_user_needs_consent(
+        if plan.may_require_consent and enterprise_customer_user_needs_consent(
                 request.site,
                 enterprise_customer['id'],
                 product.course.id,
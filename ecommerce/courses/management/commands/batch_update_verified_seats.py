@@ -1,22 +1,23 @@
 """
-This command runs create_or_update_seat on all seats that contain 'ID verification' in the title.
+This command regenerates the title of all seats that contain 'ID verification' in the title.
 """
 import logging
 import time
 
 from django.core.management import BaseCommand
-from oscar.apps.partner.strategy import Selector
+from django.utils.timezone import now
+from simple_history.utils import bulk_update_with_history
 
-from ecommerce.courses.models import Course
+from ecommerce.extensions.catalogue.management.utils import BatchProgress, iterate_pk_batches
 from ecommerce.extensions.catalogue.models import Product
 
 logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
-    """Run create_or_update_seat on seats containing 'ID verification'."""
+    """Regenerate the title of seats containing 'ID verification'."""
 
-    help = 'Run create_or_update_seat on all seats that contain "ID verification" in the title'
+    help = 'Regenerate the title of all seats that contain "ID verification" in the title'
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -33,52 +34,43 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         batch_size = options['batch_size']
         sleep_time = options['sleep_time']
-        succeeded = 0
-        failed = 0
 
         seats = Product.objects.filter(title__icontains='ID verification')
-        total_seats = len(seats)
+        total_seats = seats.count()
         logger.info(
             'Updating a total of %d seats that contain "ID verification" in the title.',
             total_seats
         )
 
-        batch_seats = []
-
-        for seat in seats:
-            batch_seats.append(seat)
-
-            if len(batch_seats) == batch_size:
-                succeeded, failed = self._update_seats(batch_seats, succeeded, failed)
+        progress = BatchProgress('batch_update_verified_seats', total=total_seats)
+        batches = iterate_pk_batches(
+            seats.select_related('course').prefetch_related('attribute_values__attribute'), batch_size
+        )
+        for index, batch_seats in enumerate(batches):
+            if index:
                 time.sleep(sleep_time)
-                batch_seats = []
+            progress.record(*self._update_seats(batch_seats))
 
-        if len(batch_seats) > 0:
-            succeeded, failed = self._update_seats(batch_seats, succeeded, failed)
+        logger.info('Seat update complete. %d succeeded, %d failed.', progress.succeeded, progress.failed)
 
-        logger.info('Seat update complete. %d succeeded, %d failed.', succeeded, failed)
-
-    def _update_seats(self, batch_seats, succeeded, failed):
-        strategy = Selector().strategy()
+    def _update_seats(self, batch_seats):
+        updated_seats = []
+        failed = 0
+        updated_at = now()
 
         for seat in batch_seats:
-            info = strategy.fetch_for_product(seat)
-
+            # Read the certificate type from the prefetched values rather than seat.attr, which queries per seat.
+            attributes = {value.attribute.code: value.value for value in seat.attribute_values.all()}
             try:
-                course = Course.objects.get(id=seat.attr.course_key)
-                course.create_or_update_seat(
-                    seat.attr.certificate_type,
-                    seat.attr.id_verification_required,
-                    info.price.excl_tax,
-                    expires=seat.expires,
-                    sku=info.stockrecord.partner_sku
-                )
-                succeeded += 1
+                seat.title = seat.course.get_course_seat_name(attributes.get('certificate_type', ''))
+                seat.date_updated = updated_at
+                updated_seats.append(seat)
             except Exception:  # pylint: disable=broad-except
                 logger.error(
                     'Could not update seat title="%s" in course_id="%s".',
-                    seat.title, seat.attr.course_key
+                    seat.title, attributes.get('course_key')
                 )
                 failed += 1
 
-        return succeeded, failed
+        bulk_update_with_history(updated_seats, Product, ['title', 'date_updated'], batch_size=len(batch_seats))
+        return len(updated_seats), failed
@@ -7,6 +7,7 @@ import os
 from django.core.management import BaseCommand, CommandError
 
 from ecommerce.courses.models import Course
+from ecommerce.courses.publishers import BatchLMSPublisher
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +27,18 @@ class Command(BaseCommand):
                             dest='course_ids_file',
                             default=None,
                             help='Path to file to read courses from.')
+        parser.add_argument('--max-workers',
+                            action='store',
+                            dest='max_workers',
+                            type=int,
+                            default=8,
+                            help='Maximum number of courses published to LMS concurrently.')
+        parser.add_argument('--batch-size',
+                            action='store',
+                            dest='batch_size',
+                            type=int,
+                            default=100,
+                            help='Number of courses whose seats are loaded from the database at once.')
 
     def handle(self, *args, **options):
         failed = 0
@@ -34,26 +47,37 @@ class Command(BaseCommand):
             raise CommandError("Pass the correct absolute path to course ids file as --course_ids_file argument.")
 
         with open(course_ids_file, 'r') as file_handler:  # pylint: disable=unspecified-encoding
-            course_ids = file_handler.readlines()
-            total_courses = len(course_ids)
-            logger.info("Publishing %d courses.", total_courses)
-            for index, course_id in enumerate(course_ids, start=1):
-                try:
-                    course_id = course_id.strip()
-                    course = Course.objects.get(id=course_id)
-                    publishing_error = course.publish_to_lms()
-                    if publishing_error:
-                        failed += 1
-                        logger.error(
-                            u"(%d/%d) Failed to publish %s: %s", index, total_courses, course_id, publishing_error
-                        )
-                    else:
-                        logger.info(u"(%d/%d) Successfully published %s.", index, total_courses, course_id)
-                except Course.DoesNotExist:
-                    failed += 1
-                    logger.error(
-                        u"(%d/%d) Failed to publish %s: Course does not exist.", index, total_courses, course_id
-                    )
+            course_ids = [course_id.strip() for course_id in file_handler.readlines()]
+
+        total_courses = len(course_ids)
+        logger.info("Publishing %d courses.", total_courses)
+
+        courses_by_id = Course.objects.select_related('partner__default_site').in_bulk(course_ids)
+        positions = {}
+        courses = []
+        for index, course_id in enumerate(course_ids, start=1):
+            if course_id in courses_by_id:
+                positions[course_id] = index
+                courses.append(courses_by_id[course_id])
+            else:
+                failed += 1
+                logger.error(
+                    u"(%d/%d) Failed to publish %s: Course does not exist.", index, total_courses, course_id
+                )
+
+        def log_result(course_id, publishing_error):
+            if publishing_error:
+                logger.error(
+                    u"(%d/%d) Failed to publish %s: %s",
+                    positions[course_id], total_courses, course_id, publishing_error
+                )
+            else:
+                logger.info(u"(%d/%d) Successfully published %s.", positions[course_id], total_courses, course_id)
+
+        publisher = BatchLMSPublisher(max_workers=options['max_workers'], chunk_size=options['batch_size'])
+        report = publisher.publish_courses(courses, callback=log_result)
+        failed += len(report.failed)
+
         if failed:
             logger.error("Completed publishing courses. %d of %d failed.", failed, total_courses)
         else:
@@ -17,6 +17,7 @@ from ecommerce.core.constants import (
 )
 from ecommerce.courses.constants import CertificateType
 from ecommerce.courses.publishers import LMSPublisher
+from ecommerce.courses.utils import invalidate_course_run_seat_ids
 from ecommerce.extensions.catalogue.utils import generate_sku
 
 logger = logging.getLogger(__name__)
@@ -72,6 +73,7 @@ class Course(models.Model):
 
     def publish_to_lms(self):
         """ Publish Course and Products to LMS. """
+        invalidate_course_run_seat_ids(self.id)
         return LMSPublisher().publish(self)
 
     @classmethod
@@ -269,6 +271,7 @@ class Course(models.Model):
                 orders=0
             ).delete()
 
+        invalidate_course_run_seat_ids(course_id)
         return seat
 
     def get_enrollment_code(self):
@@ -2,23 +2,37 @@
 
 import json
 import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
 
 from django.db.models import Q
 from django.utils.translation import ugettext_lazy as _
-from oscar.core.loading import get_model
-from requests.exceptions import HTTPError
+from oscar.core.loading import get_class, get_model
+from requests.exceptions import ConnectionError as ReqConnectionError
+from requests.exceptions import HTTPError, Timeout
 
-from ecommerce.core.constants import ENROLLMENT_CODE_SEAT_TYPES
+from ecommerce.core.constants import (
+    ENROLLMENT_CODE_PRODUCT_CLASS_NAME,
+    ENROLLMENT_CODE_SEAT_TYPES,
+    SEAT_PRODUCT_CLASS_NAME
+)
 from ecommerce.courses.constants import CertificateType
-from ecommerce.courses.utils import mode_for_product
+from ecommerce.courses.utils import invalidate_course_run_seat_ids, mode_for_product
+from ecommerce.extensions.catalogue.utils import prime_product_attributes
 
 logger = logging.getLogger(__name__)
 Product = get_model('catalogue', 'Product')
+Selector = get_class('partner.strategy', 'Selector')
 StockRecord = get_model('partner', 'StockRecord')
 
 
 class LMSPublisher:
+    # Number of times a PUT to the LMS is attempted before giving up on transient errors.
+    max_attempts = 1
+    retry_delay = 1  # Value is in seconds.
+
     def get_seat_expiration(self, seat):
         if not seat.expires or 'professional' in getattr(seat.attr, 'certificate_type', ''):
             return None
@@ -50,6 +64,9 @@ class LMSPublisher:
             if ios_stock_record:
                 ios_sku = ios_stock_record.partner_sku
 
+        return self._serialize_mode(seat, stock_record, bulk_sku, android_sku, ios_sku)
+
+    def _serialize_mode(self, seat, stock_record, bulk_sku, android_sku, ios_sku):
         return {
             'name': mode_for_product(seat),
             'currency': stock_record.price_currency,
@@ -61,6 +78,82 @@ class LMSPublisher:
             'ios_sku': ios_sku,
         }
 
+    def build_commerce_payloads(self, courses):
+        """ Build the Commerce API payloads for several courses at once.
+
+        Seats, their attributes and stock records, and enrollment codes are loaded with a fixed number of
+        queries for all of the given courses, instead of the per-seat lookups done by
+        serialize_seat_for_commerce_api.
+
+        Arguments:
+            courses (list of Course): Courses to be serialized.
+
+        Returns:
+            OrderedDict: Commerce API payload for each course, keyed by course ID.
+        """
+        course_ids = [course.id for course in courses]
+        seats = Product.objects.filter(
+            parent__course_id__in=course_ids,
+            parent__structure=Product.PARENT,
+            parent__product_class__name=SEAT_PRODUCT_CLASS_NAME,
+        ).select_related('parent__product_class').prefetch_related(
+            'attribute_values__attribute', 'parent__attribute_values__attribute', 'stockrecords'
+        )
+
+        strategy = Selector().strategy()
+        bulk_skus = {}
+        enrollment_codes = Product.objects.filter(
+            product_class__name=ENROLLMENT_CODE_PRODUCT_CLASS_NAME,
+            course_id__in=course_ids,
+        ).prefetch_related('stockrecords')
+        for enrollment_code in enrollment_codes:
+            info = strategy.fetch_for_product(enrollment_code)
+            if info.availability.is_available_to_buy:
+                bulk_skus[enrollment_code.course_id] = info.stockrecord.partner_sku
+
+        web_seats = {course_id: [] for course_id in course_ids}
+        mobile_skus = {}
+        for seat in seats:
+            prime_product_attributes(seat)
+
+            stock_records = list(seat.stockrecords.all())
+            if not stock_records:
+                logger.warning('Seat [%s] of course [%s] has no stock record, and is not published.',
+                               seat.id, seat.parent.course_id)
+                continue
+
+            mobile_sku = next(
+                (record.partner_sku for record in stock_records if 'mobile' in record.partner_sku), None
+            )
+            if mobile_sku:
+                # Mobile seats are not published as course modes. Their SKUs are added to the verified mode.
+                for platform in ('android', 'ios'):
+                    if 'mobile.{}'.format(platform) in mobile_sku:
+                        mobile_skus.setdefault((seat.parent_id, platform), mobile_sku)
+            else:
+                web_seats[seat.parent.course_id].append((seat, stock_records[0]))
+
+        payloads = OrderedDict()
+        for course in courses:
+            modes = []
+            for seat, stock_record in web_seats[course.id]:
+                certificate_type = getattr(seat.attr, 'certificate_type', '')
+                bulk_sku = bulk_skus.get(course.id) if certificate_type in ENROLLMENT_CODE_SEAT_TYPES else None
+                android_sku = ios_sku = None
+                if certificate_type == CertificateType.VERIFIED:
+                    android_sku = mobile_skus.get((seat.parent_id, 'android'))
+                    ios_sku = mobile_skus.get((seat.parent_id, 'ios'))
+                modes.append(self._serialize_mode(seat, stock_record, bulk_sku, android_sku, ios_sku))
+
+            payloads[course.id] = {
+                'id': course.id,
+                'name': course.name,
+                'verification_deadline': self.get_course_verification_deadline(course),
+                'modes': modes,
+            }
+
+        return payloads
+
     def publish(self, course):
         """ Publish course commerce data to LMS.
 
@@ -73,29 +166,32 @@ class LMSPublisher:
         Returns:
             None, if publish operation succeeded; otherwise, error message.
         """
-        site = course.partner.default_site
-        course_id = course.id
-        error_message = _('Failed to publish commerce data for {course_id} to LMS.').format(course_id=course_id)
+        payload = self.build_commerce_payloads([course])[course.id]
+        return self.publish_payload(course.partner.default_site, payload)
+
+    def publish_payload(self, site, payload):
+        """ Publish a payload built by build_commerce_payloads to LMS.
 
-        name = course.name
-        verification_deadline = self.get_course_verification_deadline(course)
+        Arguments:
+            site (Site): Site whose configuration holds the LMS API settings.
+            payload (dict): Commerce API payload for a single course.
 
-        # Do not fetch mobile seats to create Course modes. Mobile skus are
-        # added to the verified course mode in serialize_seat_for_commerce_api()
-        seat_products = course.seat_products.filter(~Q(stockrecords__partner_sku__contains="mobile"))
-        modes = [self.serialize_seat_for_commerce_api(seat) for seat in seat_products]
+        Returns:
+            None, if publish operation succeeded; otherwise, error message.
+        """
+        course_id = payload['id']
+        error_message = _('Failed to publish commerce data for {course_id} to LMS.').format(course_id=course_id)
+        client = site.siteconfiguration.oauth_api_client
 
-        has_credit = 'credit' in [mode['name'] for mode in modes]
+        has_credit = 'credit' in [mode['name'] for mode in payload['modes']]
         if has_credit:
             try:
                 data = {
                     'course_key': course_id,
                     'enabled': True
                 }
-                client = site.siteconfiguration.oauth_api_client
                 courses_url = urljoin(f"{site.siteconfiguration.credit_api_url}/", f"courses/{course_id}/")
-                response = client.put(courses_url, json=data)
-                response.raise_for_status()
+                self._put(client, courses_url, data)
                 logger.info('Successfully published CreditCourse for [%s] to LMS.', course_id)
             except HTTPError as e:
                 logger.exception(
@@ -107,17 +203,8 @@ class LMSPublisher:
                 return error_message
 
         try:
-            data = {
-                'id': course_id,
-                'name': name,
-                'verification_deadline': verification_deadline,
-                'modes': modes,
-            }
-
-            api_client = site.siteconfiguration.oauth_api_client
             commerce_url = urljoin(f"{site.siteconfiguration.commerce_api_url}/", f"courses/{course_id}/")
-            response = api_client.put(commerce_url, json=data)
-            response.raise_for_status()
+            self._put(client, commerce_url, payload)
             logger.info('Successfully published commerce data for [%s].', course_id)
             return None
         except HTTPError as e:  # pylint: disable=bare-except
@@ -129,6 +216,22 @@ class LMSPublisher:
             logger.exception('Failed to publish commerce data for [%s] to LMS.', course_id)
             return error_message
 
+    def _put(self, client, url, data):
+        """ PUT data to the LMS, retrying connection errors, timeouts and server errors up to max_attempts times. """
+        attempt = 1
+        while True:
+            try:
+                response = client.put(url, json=data)
+                response.raise_for_status()
+                return response
+            except (ReqConnectionError, Timeout, HTTPError) as e:
+                server_error = not isinstance(e, HTTPError) or e.response.status_code >= 500
+                if not server_error or attempt >= self.max_attempts:
+                    raise
+                logger.warning('Attempt %d to PUT [%s] failed with %s. Retrying.', attempt, url, e)
+                time.sleep(self.retry_delay * attempt)
+                attempt += 1
+
     def _parse_error(self, response, default_error_message):
         """When validation errors occur during publication, the LMS is expected
          to return an error message.
@@ -159,3 +262,80 @@ class LMSPublisher:
             return ' '.join([default_error_message, message])
 
         return default_error_message
+
+
+class PublicationReport:
+    """ Summary of a batch publication to LMS. """
+
+    def __init__(self):
+        self.succeeded = []
+        self.failed = OrderedDict()
+        self.elapsed = 0
+
+    @property
+    def total(self):
+        return len(self.succeeded) + len(self.failed)
+
+    def __str__(self):
+        return '{succeeded} of {total} courses published to LMS in {elapsed:.1f}s, {failed} failed.'.format(
+            succeeded=len(self.succeeded), total=self.total, elapsed=self.elapsed, failed=len(self.failed)
+        )
+
+
+class BatchLMSPublisher(LMSPublisher):
+    """ Publishes many courses to LMS.
+
+    Payloads are built in memory for each chunk of courses from a fixed number of queries, and pushed to
+    the LMS through a bounded pool of worker threads. Transient errors are retried.
+    """
+
+    def __init__(self, max_workers=8, max_attempts=3, retry_delay=1, chunk_size=100):
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.chunk_size = chunk_size
+
+    def publish_courses(self, courses, callback=None):
+        """ Publish courses to LMS.
+
+        Arguments:
+            courses (iterable of Course): Courses to be published.
+            callback (callable): Optional; called with (course_id, error_message) as each course is published,
+                in the order the courses were given. error_message is None on success.
+
+        Returns:
+            PublicationReport
+        """
+        report = PublicationReport()
+        start = time.time()
+        courses = list(courses)
+        sites = {}
+        for course in courses:
+            if course.partner_id not in sites:
+                site = course.partner.default_site
+                # Load the site configuration up front so that worker threads do not query the database.
+                site.siteconfiguration  # pylint: disable=pointless-statement
+                sites[course.partner_id] = site
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for index in range(0, len(courses), self.chunk_size):
+                chunk = courses[index:index + self.chunk_size]
+                for course in chunk:
+                    invalidate_course_run_seat_ids(course.id)
+                payloads = self.build_commerce_payloads(chunk)
+                futures = [
+                    (course.id, executor.submit(self.publish_payload, sites[course.partner_id], payloads[course.id]))
+                    for course in chunk
+                ]
+                for course_id, future in futures:
+                    error_message = future.result()
+                    if error_message:
+                        report.failed[course_id] = error_message
+                    else:
+                        report.succeeded.append(course_id)
+                    if callback:
+                        callback(course_id, error_message)
+
+        report.elapsed = time.time() - start
+        logger.info(str(report))
+        return report
@@ -74,12 +74,27 @@ class BatchUpdateVerifiedSeatsTests(DiscoveryTestMixin, TransactionTestCase):
         updated_seats = self._get_seats_with_idv_title()
         self.assertEqual(len(updated_seats), 0)
 
-    def test_create_or_update_seat_error(self):
+    def test_update_seat_error(self):
         """
         Tests that errors are logged when failing to update seats.
         """
         self._create_courses_and_seats()
 
-        with patch.object(Course, 'create_or_update_seat', side_effect=Exception('test')):
+        with patch.object(Course, 'get_course_seat_name', side_effect=Exception('test')):
             with self.assertLogs(level='ERROR'):
                 call_command(self.command)
+
+        self.assertEqual(len(self._get_seats_with_idv_title()), 1)
+
+    def test_queries_do_not_grow_with_batch(self):
+        """
+        Test that a batch is updated with a fixed number of queries, however many seats it holds.
+        """
+        self._create_courses_and_seats(2)
+        with self.assertNumQueries(8):
+            call_command(self.command, batch_size=10, sleep_time=0)
+
+        self._create_courses_and_seats(6)
+        with self.assertNumQueries(8):
+            call_command(self.command, batch_size=10, sleep_time=0)
+        self.assertEqual(len(self._get_seats_with_idv_title()), 0)
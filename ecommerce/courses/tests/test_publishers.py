@@ -15,7 +15,7 @@ from testfixtures import LogCapture
 
 from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME
 from ecommerce.core.url_utils import get_lms_url
-from ecommerce.courses.publishers import LMSPublisher
+from ecommerce.courses.publishers import BatchLMSPublisher, LMSPublisher
 from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.extensions.catalogue.models import Product
 from ecommerce.extensions.catalogue.tests.mixins import DiscoveryTestMixin
@@ -308,3 +308,73 @@ class LMSPublisherTests(DiscoveryTestMixin, TestCase):
         actual = self.attempt_credit_publication(500)
         expected = 'Failed to publish commerce data for {} to LMS.'.format(self.course.id)
         self.assertEqual(actual, expected)
+
+    def test_build_commerce_payloads(self):
+        """ Verify payloads built in bulk match the per-seat serialization, including mobile and bulk SKUs. """
+        self.course.create_or_update_seat('verified', True, 50, create_enrollment_code=True)
+        self._create_mobile_seat_for_course(self.course, 'android')
+        self._create_mobile_seat_for_course(self.course, 'ios')
+        other_course = CourseFactory(partner=self.partner)
+        other_course.create_or_update_seat('professional', True, 100)
+
+        web_seats = {
+            course.id: course.seat_products.filter(~Q(stockrecords__partner_sku__contains='mobile'))
+            for course in (self.course, other_course)
+        }
+        expected = {
+            course_id: [self.publisher.serialize_seat_for_commerce_api(seat) for seat in seats]
+            for course_id, seats in web_seats.items()
+        }
+
+        with self.assertNumQueries(9):
+            payloads = self.publisher.build_commerce_payloads([self.course, other_course])
+
+        self.assertEqual(list(payloads), [self.course.id, other_course.id])
+        for course_id, payload in payloads.items():
+            self.assertEqual(payload['modes'], expected[course_id])
+        self.assertEqual(payloads[self.course.id]['verification_deadline'],
+                         self.course.verification_deadline.isoformat())
+
+    def test_build_commerce_payloads_without_stock_record(self):
+        """ Verify seats without a stock record are skipped, instead of failing the payloads of every course. """
+        honor_seat, verified_seat = (
+            self.course.seat_products.get(attributes__name='certificate_type', attribute_values__value_text=seat_type)
+            for seat_type in ('honor', 'verified')
+        )
+        honor_seat.stockrecords.all().delete()
+
+        with LogCapture(LOGGER_NAME) as log:
+            payloads = self.publisher.build_commerce_payloads([self.course])
+            log.check((
+                LOGGER_NAME,
+                'WARNING',
+                'Seat [{}] of course [{}] has no stock record, and is not published.'.format(
+                    honor_seat.id, self.course.id
+                ),
+            ))
+
+        self.assertEqual(
+            payloads[self.course.id]['modes'], [self.publisher.serialize_seat_for_commerce_api(verified_seat)]
+        )
+
+    @responses.activate
+    def test_batch_publish_courses(self):
+        """ Verify the batch publisher reports successes and failures, and retries server errors. """
+        other_course = CourseFactory(partner=self.partner)
+        other_course.create_or_update_seat('verified', True, 50)
+        self._mock_commerce_api()
+        url = self.site_configuration.build_lms_url('/api/commerce/v1/courses/{}/'.format(other_course.id))
+        responses.add(responses.PUT, url, status=503, json={}, content_type=JSON)
+        responses.add(responses.PUT, url, status=400, json={'error': 'Bad mode.'}, content_type=JSON)
+
+        results = []
+        publisher = BatchLMSPublisher(max_workers=2, retry_delay=0)
+        report = publisher.publish_courses(
+            [self.course, other_course], callback=lambda course_id, error: results.append((course_id, error))
+        )
+
+        error = 'Failed to publish commerce data for {} to LMS. Bad mode.'.format(other_course.id)
+        self.assertEqual(report.succeeded, [self.course.id])
+        self.assertEqual(dict(report.failed), {other_course.id: error})
+        self.assertEqual(results, [(self.course.id, None), (other_course.id, error)])
+        self.assertEqual(len([call for call in responses.calls if call.request.url == url]), 2)
@@ -14,6 +14,7 @@ from ecommerce.courses.utils import (
     get_certificate_type_display_value,
     get_course_catalogs,
     get_course_info_from_catalog,
+    get_course_run_seat_ids,
     mode_for_product
 )
 from ecommerce.entitlements.utils import create_or_update_course_entitlement
@@ -124,6 +125,25 @@ class UtilsTests(DiscoveryTestMixin, DiscoveryMockMixin, TestCase):
         """ Verify assertion for invalid cert type """
         self.assertRaises(ValueError, lambda: get_certificate_type_display_value('junk'))
 
+    def test_get_course_run_seat_ids(self):
+        """ Verify seat IDs are grouped by certificate type, cached, and invalidated when a seat changes. """
+        course = CourseFactory(partner=self.partner)
+        other_course = CourseFactory(partner=self.partner)
+        verified_seat = course.create_or_update_seat('verified', True, 100)
+        professional_seat = course.create_or_update_seat('professional', False, 100)
+        expected = {
+            course.id: {'verified': [verified_seat.id], 'professional': [professional_seat.id]},
+            other_course.id: {},
+        }
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_course_run_seat_ids([course.id, other_course.id]), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_course_run_seat_ids([course.id, other_course.id]), expected)
+
+        credit_seat = course.create_or_update_seat('credit', True, 100, credit_provider='ASU')
+        self.assertEqual(get_course_run_seat_ids([course.id])[course.id]['credit'], [credit_seat.id])
+
 
 @ddt.ddt
 class GetCourseCatalogUtilTests(DiscoveryMockMixin, TestCase):
@@ -1,13 +1,18 @@
 
+from collections import defaultdict
 from urllib.parse import urljoin
 
 from django.conf import settings
+from django.core.cache import cache
 from django.utils.translation import ugettext_lazy as _
 from edx_django_utils.cache import TieredCache
 from opaque_keys.edx.keys import CourseKey
+from oscar.core.loading import get_model
 
 from ecommerce.core.utils import deprecated_traverse_pagination, get_cache_key
 
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+
 
 def mode_for_product(product):
     """
@@ -151,3 +156,51 @@ def get_certificate_type_display_value(certificate_type):
         raise ValueError('Certificate Type [{}] not found.'.format(certificate_type))
 
     return display_values[certificate_type]
+
+
+def _course_run_seats_cache_key(course_id):
+    return get_cache_key(resource='course_run_seats', course_id=course_id)
+
+
+def get_course_run_seat_ids(course_ids):
+    """
+    Return the seat product IDs, grouped by certificate type, for each of the given course runs.
+
+    The lookup is cached per course run and read with a single cache round trip. Course runs which
+    are not cached are resolved together with one query against the certificate type attribute
+    values, instead of one EAV join per seat type.
+
+    Arguments:
+        course_ids (iterable): Course run keys.
+
+    Returns:
+        dict: Mapping of course run key to a dict of certificate type -> list of seat product IDs.
+    """
+    course_ids = set(course_ids)
+    cache_keys = {_course_run_seats_cache_key(course_id): course_id for course_id in course_ids}
+    cached = cache.get_many(list(cache_keys))
+    lookup = {cache_keys[key]: value for key, value in cached.items()}
+
+    missing = course_ids - set(lookup)
+    if missing:
+        resolved = {course_id: defaultdict(list) for course_id in missing}
+        attribute_values = ProductAttributeValue.objects.filter(
+            attribute__name='certificate_type',
+            product__course_id__in=missing,
+        ).values_list('product__course_id', 'product_id', 'value_text').order_by('-product__date_created')
+        for course_id, product_id, certificate_type in attribute_values:
+            resolved[course_id][certificate_type].append(product_id)
+
+        resolved = {course_id: dict(seats) for course_id, seats in resolved.items()}
+        cache.set_many(
+            {_course_run_seats_cache_key(course_id): seats for course_id, seats in resolved.items()},
+            settings.COURSE_RUN_SEATS_CACHE_TIMEOUT
+        )
+        lookup.update(resolved)
+
+    return lookup
+
+
+def invalidate_course_run_seat_ids(course_id):
+    """ Drop the cached seat lookup for a course run, e.g. after its seats are created, updated or published. """
+    cache.delete(_course_run_seats_cache_key(str(course_id)))
@@ -5,8 +5,9 @@ Send the enterprise offer limits emails.
 import logging
 from datetime import datetime
 
+from celery import group
 from django.core.management import BaseCommand
-from django.db.models import Sum
+from django.db.models import OuterRef, Subquery, Sum
 from ecommerce_worker.email.v1.api import send_offer_usage_email
 
 from ecommerce.extensions.fulfillment.status import ORDER
@@ -39,13 +40,17 @@ class Command(BaseCommand):
     def is_eligible_for_alert(enterprise_offer):
         """
         Return the bool whether given offer is eligible for sending the email.
+
+        The creation time of the latest usage email of the offer is read from its `last_usage_email_created`
+        annotation, see `_get_enterprise_offers`.
         """
-        offer_usage = OfferUsageEmail.objects.filter(offer=enterprise_offer).last()
-        diff_of_days = datetime.now().toordinal() - offer_usage.created.toordinal() if offer_usage else 0
+        last_usage_email_created = enterprise_offer.last_usage_email_created
+        diff_of_days = datetime.now().toordinal() - last_usage_email_created.toordinal() \
+            if last_usage_email_created else 0
 
         if not enterprise_offer.max_global_applications and not enterprise_offer.max_discount:
             is_eligible = False
-        elif not offer_usage:
+        elif not last_usage_email_created:
             is_eligible = True
         elif enterprise_offer.usage_email_frequency == ConditionalOffer.DAILY:
             is_eligible = diff_of_days >= 1
@@ -64,26 +69,34 @@ class Command(BaseCommand):
         return int(offer.max_global_applications), percentage_usage, int(offer.num_orders)
 
     @staticmethod
-    def get_booking_limits(offer):
+    def get_booking_limits(offer, total_used_discount_amount):
         """
         Return the total discount limit, percentage usage and current usage of booking limit.
         """
-        total_used_discount_amount = OrderDiscount.objects.filter(
-            offer_id=offer.id,
-            order__status=ORDER.COMPLETE
-        ).aggregate(Sum('amount'))['amount__sum']
         total_used_discount_amount = total_used_discount_amount if total_used_discount_amount else 0
 
         percentage_usage = int((total_used_discount_amount / offer.max_discount) * 100)
         return int(offer.max_discount), percentage_usage, int(total_used_discount_amount)
 
-    def get_email_content(self, offer):
+    @staticmethod
+    def get_used_discount_amounts(offers):
+        """
+        Return the total discount amount of the completed orders of each of the given offers, keyed by offer id.
+        """
+        return dict(
+            OrderDiscount.objects.filter(
+                offer_id__in=[offer.id for offer in offers],
+                order__status=ORDER.COMPLETE
+            ).order_by().values('offer_id').annotate(amount_sum=Sum('amount')).values_list('offer_id', 'amount_sum')
+        )
+
+    def get_email_content(self, offer, total_used_discount_amount=None):
         """
         Return the appropriate email body and subject of given offer.
         """
         is_enrollment_limit_offer = bool(offer.max_global_applications)
         total_limit, percentage_usage, current_usage = self.get_enrollment_limits(offer) if is_enrollment_limit_offer \
-            else self.get_booking_limits(offer)
+            else self.get_booking_limits(offer, total_used_discount_amount)
 
         email_body = EMAIL_BODY.format(
             percentage_usage=percentage_usage,
@@ -97,39 +110,57 @@ class Command(BaseCommand):
     @staticmethod
     def _get_enterprise_offers():
         """
-        Return the enterprise offers which have opted for email usage alert.
+        Return the enterprise offers which have opted for email usage alert, annotated with the creation time
+        of their latest usage email.
         """
+        last_usage_emails = OfferUsageEmail.objects.filter(offer=OuterRef('pk')).order_by('-pk')
         return ConditionalOffer.objects.filter(
             emails_for_usage_alert__isnull=False,
             condition__enterprise_customer_uuid__isnull=False
-        ).exclude(emails_for_usage_alert='')
+        ).exclude(emails_for_usage_alert='').annotate(
+            last_usage_email_created=Subquery(last_usage_emails.values('created')[:1])
+        )
 
     def handle(self, *args, **options):
-        send_enterprise_offer_count = 0
-        enterprise_offers = self._get_enterprise_offers()
-        total_enterprise_offers_count = enterprise_offers.count()
+        enterprise_offers = list(self._get_enterprise_offers())
+        total_enterprise_offers_count = len(enterprise_offers)
         logger.info('[Offer Usage Alert] Total count of enterprise offers is %s.', total_enterprise_offers_count)
-        for enterprise_offer in enterprise_offers:
-            if self.is_eligible_for_alert(enterprise_offer):
-                logger.info(
-                    '[Offer Usage Alert] Sending email for Offer with Name %s, ID %s',
-                    enterprise_offer.name,
-                    enterprise_offer.id
-                )
-                send_enterprise_offer_count += 1
-                email_body, email_subject = self.get_email_content(enterprise_offer)
-                OfferUsageEmail.create_record(
-                    offer=enterprise_offer,
-                    email_type=OfferUsageEmailTypes.DIGEST,
-                    meta_data={
-                        'email_body': email_body,
-                        'email_subject': email_subject,
-                        'email_addresses': enterprise_offer.emails_for_usage_alert,
-                    },
-                )
-                send_offer_usage_email.delay(enterprise_offer.emails_for_usage_alert, email_subject, email_body)
+
+        eligible_offers = [offer for offer in enterprise_offers if self.is_eligible_for_alert(offer)]
+        used_discount_amounts = self.get_used_discount_amounts(
+            [offer for offer in eligible_offers if not offer.max_global_applications]
+        )
+
+        offer_usage_emails = []
+        email_tasks = []
+        for enterprise_offer in eligible_offers:
+            logger.info(
+                '[Offer Usage Alert] Sending email for Offer with Name %s, ID %s',
+                enterprise_offer.name,
+                enterprise_offer.id
+            )
+            email_body, email_subject = self.get_email_content(
+                enterprise_offer, used_discount_amounts.get(enterprise_offer.id)
+            )
+            offer_usage_emails.append(OfferUsageEmail(
+                offer=enterprise_offer,
+                email_type=OfferUsageEmailTypes.DIGEST,
+                offer_email_metadata={
+                    'email_body': email_body,
+                    'email_subject': email_subject,
+                    'email_addresses': enterprise_offer.emails_for_usage_alert,
+                },
+            ))
+            email_tasks.append(
+                send_offer_usage_email.si(enterprise_offer.emails_for_usage_alert, email_subject, email_body)
+            )
+
+        OfferUsageEmail.objects.bulk_create(offer_usage_emails)
+        if email_tasks:
+            group(email_tasks).apply_async()
+
         logger.info(
             '[Offer Usage Alert] %s of %s added to the email sending queue.',
-            send_enterprise_offer_count,
+            len(eligible_offers),
             total_enterprise_offers_count,
         )
@@ -460,13 +460,15 @@ class SendEnterpriseOfferLimitEmailsTests(TestCase, SiteMixin, EnterpriseService
         ConditionalOffer.objects.all().delete()
         OfferUsageEmail.objects.all().delete()
 
-        EnterpriseOfferFactory(max_discount=100)
+        offer = EnterpriseOfferFactory(max_discount=100)
 
-        with mock.patch(DEPRECATED_PATH + '.send_offer_usage_email.delay') as mock_send_email:
+        with mock.patch(DEPRECATED_PATH + '.group') as mock_group:
             with LogCapture(level=logging.INFO) as log:
-                mock_send_email.return_value = mock.Mock()
                 call_command('send_enterprise_offer_limit_emails')
-                assert mock_send_email.call_count == 1
+                assert mock_group.return_value.apply_async.call_count == 1
+                email_tasks = mock_group.call_args[0][0]
+                assert len(email_tasks) == 1
+                assert email_tasks[0].args[0] == offer.emails_for_usage_alert
                 assert OfferUsageEmail.objects.all().count() == 1
         log.check_present(
             (
@@ -486,3 +488,25 @@ class SendEnterpriseOfferLimitEmailsTests(TestCase, SiteMixin, EnterpriseService
                 )
             )
         )
+
+    def test_deprecated_command_queries(self):
+        """
+        Test the deprecated version of the command computes the usage of all the offers in grouped queries.
+        """
+        ConditionalOffer.objects.all().delete()
+        OfferUsageEmail.objects.all().delete()
+
+        for __ in range(3):
+            EnterpriseOfferFactory(max_discount=100)
+            EnterpriseOfferFactory(max_global_applications=10)
+        offer_with_recent_email = EnterpriseOfferFactory(max_discount=100)
+        OfferUsageEmail.create_record(OfferUsageEmailTypes.DIGEST, offer_with_recent_email)
+
+        with mock.patch(DEPRECATED_PATH + '.group') as mock_group:
+            # Offers with their latest usage email, summed discounts, and bulk creation of the usage emails.
+            with self.assertNumQueries(3):
+                call_command('send_enterprise_offer_limit_emails')
+
+        assert len(mock_group.call_args[0][0]) == 6
+        assert OfferUsageEmail.objects.filter(offer=offer_with_recent_email).count() == 1
+        assert OfferUsageEmail.objects.count() == 7
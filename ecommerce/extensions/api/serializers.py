@@ -12,7 +12,7 @@ from dateutil.parser import parse
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import models, transaction
 from django.db.models import Count, Q, Sum, prefetch_related_objects
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
@@ -54,7 +54,12 @@ from ecommerce.extensions.api.v2.constants import (
     REFUND_ORDER_EMAIL_GREETING,
     REFUND_ORDER_EMAIL_SUBJECT
 )
-from ecommerce.extensions.catalogue.utils import attach_vouchers_to_coupon_product
+from ecommerce.extensions.catalogue.utils import (
+    attach_vouchers_to_coupon_product,
+    get_prefetched_attribute_values,
+    prime_product_attributes
+)
+from ecommerce.extensions.checkout.receipt import ReceiptContext
 from ecommerce.extensions.checkout.views import ReceiptResponseView
 from ecommerce.extensions.offer.constants import (
     ASSIGN,
@@ -351,8 +356,9 @@ class ProductSerializer(ProductPaymentInfoMixin, serializers.HyperlinkedModelSer
 
     def get_attribute_values(self, product):
         request = self.context.get('request')
+        attribute_values = get_prefetched_attribute_values(product)
         serializer = ProductAttributeValueSerializer(
-            product.attr,
+            product.attr if attribute_values is None else attribute_values,
             many=True,
             read_only=True,
             context={'request': request}
@@ -404,8 +410,23 @@ class LineSerializer(serializers.ModelSerializer):
         )
 
 
+class OrderListSerializer(serializers.ListSerializer):  # pylint: disable=abstract-method
+    """ Serializes a list of orders, resolving the offers and vouchers of all their discounts at once. """
+
+    def to_representation(self, data):
+        orders = list(data.all() if isinstance(data, models.Manager) else data)
+        self.child.resolve_discount_relations(orders)
+        return super(OrderListSerializer, self).to_representation(orders)
+
+
 class OrderSerializer(serializers.ModelSerializer):
-    """Serializer for parsing order data."""
+    """
+    Serializer for parsing order data.
+
+    Relations are read through `.all()`, so they are served from the cache when the orders were fetched with
+    the prefetches used by OrderViewSet. Per-request values (waffle flags, enterprise learner data) are looked
+    up once and shared by every order serialized with the same context.
+    """
     basket_discounts = serializers.SerializerMethodField()
     billing_address = BillingAddressSerializer(allow_null=True)
     contains_credit_seat = serializers.SerializerMethodField()
@@ -423,24 +444,79 @@ class OrderSerializer(serializers.ModelSerializer):
     total_before_discounts_incl_tax = serializers.SerializerMethodField()
     order_product_ids = serializers.SerializerMethodField()
 
+    def _get_request_value(self, key, compute):
+        """ Returns the value stored under `key` in the serializer context, computing it on first use. """
+        if key not in self.context:
+            self.context[key] = compute()
+        return self.context[key]
+
+    def resolve_discount_relations(self, orders):
+        """
+        Loads the offers and vouchers applied to the discounts of the given orders, with one query each.
+
+        OrderDiscount only stores the IDs of its offer and voucher, and looks each of them up again every time
+        they are accessed. The resolved objects are kept in the serializer context, keyed by ID.
+        """
+        offers = self.context.setdefault('discount_offers', {})
+        vouchers = self.context.setdefault('discount_vouchers', {})
+        offer_ids = set()
+        voucher_ids = set()
+        for order in orders:
+            for discount in order.discounts.all():
+                if discount.offer_id and discount.offer_id not in offers:
+                    offer_ids.add(discount.offer_id)
+                if discount.voucher_id and discount.voucher_id not in vouchers:
+                    voucher_ids.add(discount.voucher_id)
+
+        if offer_ids:
+            resolved_offers = ConditionalOffer.objects.select_related('condition__range').in_bulk(offer_ids)
+            for offer in resolved_offers.values():
+                # Condition.name builds a new proxy instance, which would fetch the range again. Use the proxy
+                # condition itself, with the range that has already been loaded.
+                condition = offer.condition.proxy()
+                condition.range = offer.condition.range
+                offer.condition = condition
+            offers.update(resolved_offers)
+        if voucher_ids:
+            vouchers.update(Voucher.objects.prefetch_related('offers__benefit').in_bulk(voucher_ids))
+
+        # Offers and vouchers that have since been deleted resolve to None, as they do on OrderDiscount.
+        offers.update({offer_id: None for offer_id in offer_ids if offer_id not in offers})
+        vouchers.update({voucher_id: None for voucher_id in voucher_ids if voucher_id not in vouchers})
+        return offers, vouchers
+
+    def get_receipt_context(self, order):
+        """ Returns the ReceiptContext of the given order, shared by all of the receipt fields. """
+        receipt_contexts = self.context.setdefault('receipt_contexts', {})
+        if order.id not in receipt_contexts:
+            receipt_contexts[order.id] = ReceiptContext(ReceiptResponseView(), order, self.context['request'])
+        return receipt_contexts[order.id]
+
+    def to_representation(self, instance):
+        for line in instance.lines.all():
+            if line.product:
+                prime_product_attributes(line.product)
+        return super(OrderSerializer, self).to_representation(instance)
+
     def get_basket_discounts(self, obj):
         basket_discounts = []
         try:
-            discounts = obj.basket_discounts
-            if discounts:
-                for discount in discounts:
-                    basket_discount = {
-                        'amount': discount.amount,
-                        'benefit_value': discount.voucher.benefit.value if discount.voucher else None,
-                        'code': discount.voucher_code,
-                        'condition_name': discount.offer.condition.name if discount.offer else None,
-                        'contains_offer': bool(discount.offer),
-                        'currency': obj.currency,
-                        'enterprise_customer_name':
-                            discount.offer.condition.enterprise_customer_name if discount.offer else None,
-                        'offer_type': discount.offer.offer_type if discount.offer else None,
-                    }
-                    basket_discounts.append(basket_discount)
+            offers, vouchers = self.resolve_discount_relations([obj])
+            discounts = [discount for discount in obj.discounts.all() if discount.category == discount.BASKET]
+            for discount in discounts:
+                offer = offers.get(discount.offer_id)
+                voucher = vouchers.get(discount.voucher_id)
+                basket_discount = {
+                    'amount': discount.amount,
+                    'benefit_value': voucher.benefit.value if voucher else None,
+                    'code': discount.voucher_code,
+                    'condition_name': offer.condition.name if offer else None,
+                    'contains_offer': bool(offer),
+                    'currency': obj.currency,
+                    'enterprise_customer_name': offer.condition.enterprise_customer_name if offer else None,
+                    'offer_type': offer.offer_type if offer else None,
+                }
+                basket_discounts.append(basket_discount)
         except (AttributeError, TypeError, ValueError):
             logger.exception(
                 '[Receipt MFE] Failed to retrieve basket discounts for [%s]',
@@ -465,7 +541,7 @@ class OrderSerializer(serializers.ModelSerializer):
 
     def get_dashboard_url(self, obj):
         try:
-            return ReceiptResponseView.get_order_dashboard_url(self, obj)
+            return self.get_receipt_context(obj).dashboard_url
         except ValueError:
             logger.exception(
                 '[Receipt MFE] Failed to retrieve dashboard URL for [%s]',
@@ -482,7 +558,7 @@ class OrderSerializer(serializers.ModelSerializer):
 
     def get_contains_credit_seat(self, obj):
         try:
-            return ReceiptResponseView().order_contains_credit_seat(obj)
+            return self.get_receipt_context(obj).contains_credit_seat
         except ValueError:
             logger.exception(
                 '[Receipt MFE] Failed to retrieve credit seat value for [%s]',
@@ -493,7 +569,9 @@ class OrderSerializer(serializers.ModelSerializer):
     def get_enable_hoist_order_history(self, obj):
         try:
             request = self.context.get('request')
-            return waffle.flag_is_active(request, ENABLE_HOIST_ORDER_HISTORY)
+            return self._get_request_value(
+                'enable_hoist_order_history', lambda: waffle.flag_is_active(request, ENABLE_HOIST_ORDER_HISTORY)
+            )
         except ValueError:
             logger.exception(
                 'An error occurred while attempting to get ENABLE_HOIST_ORDER_HISTORY flag for order [%s]',
@@ -504,7 +582,7 @@ class OrderSerializer(serializers.ModelSerializer):
     def get_payment_method(self, obj):
         payment_method = None
         try:
-            payment_method = ReceiptResponseView().get_payment_method(obj)
+            payment_method = self.get_receipt_context(obj).payment_method
         except ValueError:
             logger.exception(
                 '[Receipt MFE] Failed to retrieve payment method for order [%s]',
@@ -514,15 +592,7 @@ class OrderSerializer(serializers.ModelSerializer):
 
     def get_enterprise_learner_portal_url(self, obj):
         try:
-            request = self.context['request']
-            enterprise_customer_user = ReceiptResponseView().get_metadata_for_enterprise_user(request)
-            if not enterprise_customer_user:
-                return None
-            enterprise_customer = enterprise_customer_user['enterprise_customer']
-            learner_portal_url = ReceiptResponseView().get_enterprise_learner_portal_url(
-                request, enterprise_customer
-            )
-            return learner_portal_url
+            return self.get_receipt_context(obj).enterprise_learner_portal_url
         except (AttributeError, ValueError):
             logger.exception(
                 '[Receipt MFE] Failed to retrieve enterprise learner portal URL for order [%s]',
@@ -532,13 +602,14 @@ class OrderSerializer(serializers.ModelSerializer):
 
     def get_total_before_discounts_incl_tax(self, obj):
         try:
-            return str(obj.total_before_discounts_incl_tax)
+            total = sum((line.line_price_before_discounts_incl_tax for line in obj.lines.all()), Decimal('0.00'))
+            return str(total + obj.shipping_incl_tax)
         except ValueError:
             return None
 
     def get_order_product_ids(self, obj):
         try:
-            return ','.join(map(str, obj.lines.values_list('product_id', flat=True)))
+            return self.get_receipt_context(obj).order_product_ids
         except (AttributeError, ValueError):
             logger.exception(
                 '[Receipt MFE] Failed to retrieve order product IDs for order [%s]',
@@ -548,8 +619,7 @@ class OrderSerializer(serializers.ModelSerializer):
 
     def get_product_tracking(self, obj):
         try:
-            if settings.AWIN_ADVERTISER_ID and obj.lines:
-                return ReceiptResponseView.add_product_tracking(self, obj)
+            return self.get_receipt_context(obj).product_tracking
         except (AttributeError, ValueError):
             logger.exception(
                 '[Receipt MFE] Failed to retrieve AWIN product tracking for order [%s]',
@@ -581,6 +651,7 @@ class OrderSerializer(serializers.ModelSerializer):
             'user',
             'vouchers',
         )
+        list_serializer_class = OrderListSerializer
 
 
 class BasketSerializer(serializers.ModelSerializer):
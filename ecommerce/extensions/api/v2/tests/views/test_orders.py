@@ -10,7 +10,9 @@ import pytz
 import responses
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
+from django.db import IntegrityError, connection
 from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from opaque_keys.edx.keys import CourseKey
 from oscar.core.loading import get_class, get_model
@@ -25,6 +27,7 @@ from ecommerce.extensions.api.serializers import OrderSerializer
 from ecommerce.extensions.api.tests.test_authentication import AccessTokenMixin
 from ecommerce.extensions.api.v2.constants import ENABLE_HOIST_ORDER_HISTORY
 from ecommerce.extensions.api.v2.tests.views import OrderDetailViewTestMixin
+from ecommerce.extensions.api.v2.views.orders import ManualCourseEnrollmentOrderViewSet
 from ecommerce.extensions.checkout.exceptions import BasketNotFreeError
 from ecommerce.extensions.checkout.views import ReceiptResponseView
 from ecommerce.extensions.fulfillment.signals import SHIPPING_EVENT_NAME
@@ -36,6 +39,8 @@ from ecommerce.tests.testcases import TestCase
 
 Basket = get_model('basket', 'Basket')
 Benefit = get_model('offer', 'Benefit')
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+OfferUserSpend = get_model('offer', 'OfferUserSpend')
 Order = get_model('order', 'Order')
 Product = get_model('catalogue', 'Product')
 ShippingEventType = get_model('order', 'ShippingEventType')
@@ -240,6 +245,42 @@ class OrderListViewTests(AccessTokenMixin, ThrottlingMixin, TestCase):
         self.assertIn('course_organization', content['results'][0]['lines'][0])
         self.assertEqual(CourseKey.from_string(course_id).org, content['results'][0]['lines'][0]['course_organization'])
 
+    def _create_discounted_seat_order(self, index):
+        """ Create an order for a verified seat purchased with a percentage voucher. """
+        course = CourseFactory(id='course-v1:org+course{}+run'.format(index), partner=self.partner)
+        seat = course.create_or_update_seat('verified', True, 100)
+        voucher, seat = prepare_voucher(
+            code='CODE{}'.format(index),
+            _range=factories.RangeFactory(products=[seat]),
+            benefit_value=10,
+            benefit_type=Benefit.PERCENTAGE
+        )
+        basket = factories.BasketFactory(owner=self.user, site=self.site)
+        basket.vouchers.add(voucher)
+        basket.add_product(seat)
+        Applicator().apply(basket, user=basket.owner, request=self.request)
+        return factories.create_order(basket=basket, user=self.user)
+
+    @mock.patch('ecommerce.extensions.checkout.views.ReceiptResponseView.get_metadata_for_enterprise_user')
+    def test_list_query_count_is_constant(self, mock_get_metadata_for_enterprise_user):
+        """ The number of queries made to list orders should not depend on the number of orders. """
+        mock_get_metadata_for_enterprise_user.return_value = None
+
+        for index in range(4):
+            self._create_discounted_seat_order(index)
+
+        def count_queries(page_size):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.path, {'page_size': page_size}, HTTP_AUTHORIZATION=self.token)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['results']), page_size)
+            return len(queries)
+
+        # Warm up the site configuration caches, so that both requests below start from the same state.
+        count_queries(1)
+        self.assertEqual(count_queries(4), count_queries(1))
+        self.assertEqual(mock_get_metadata_for_enterprise_user.call_count, 3)
+
     def test_with_other_users_orders(self):
         """ The view should only return orders for the authenticated users. """
         other_user = self.create_user()
@@ -1052,3 +1093,131 @@ class ManualCourseEnrollmentOrderViewSetTests(TestCase, DiscoveryMockMixin):
                 for count in range(enrollment_count)
             ]
         }
+
+
+class BulkManualCourseEnrollmentOrderViewSetTests(ManualCourseEnrollmentOrderViewSetTests):
+    """
+    Test the bulk mode of `ManualCourseEnrollmentOrderViewSet`, which must behave like the default mode.
+    """
+
+    def post_order(self, data, user):
+        return super(BulkManualCourseEnrollmentOrderViewSetTests, self).post_order(dict(data, bulk=True), user)
+
+    @mock.patch(
+        'ecommerce.extensions.api.v2.views.orders.BulkFreeOrderCreator.place_orders',
+        side_effect=BasketNotFreeError
+    )
+    def test_create_manual_order_exception(self, __):
+        """"
+        Test that the enrollments of a chunk are failures if an error occurred while placing their orders.
+        """
+        post_data = self.generate_post_data(2)
+        _, response_data = self.post_order(post_data, self.user)
+        for order in response_data["orders"]:
+            self.assertEqual(order["status"], "failure")
+            self.assertEqual(order["detail"], "Failed to create free order")
+        self.assertFalse(Order.objects.exists())
+
+    def test_bulk_invalid_date_placed(self):
+        """
+        Test that an enrollment with an invalid date placed fails alone.
+        """
+        post_data = self.generate_post_data(2)
+        post_data["enrollments"][0]["date_placed"] = "not-a-date"
+        _, response_data = self.post_order(post_data, self.user)
+
+        orders = response_data["orders"]
+        self.assertEqual(orders[0]["status"], "failure")
+        self.assertEqual(orders[0]["detail"], "Date placed should be an ISO 8601 datetime.")
+        self.assertEqual(orders[1]["status"], "success")
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_bulk_chunk_failure(self):
+        """
+        Test that an error while creating the orders of a chunk fails the enrollments of that chunk only.
+        """
+        post_data = self.generate_post_data(3)
+        get_learner_users = ManualCourseEnrollmentOrderViewSet._get_learner_users  # pylint: disable=protected-access
+
+        def get_learner_users_racing(view, chunk):
+            # Another request creates the learner of the first chunk at the same time.
+            if chunk[0][0] == 0:
+                raise IntegrityError
+            return get_learner_users(view, chunk)
+
+        with mock.patch.object(ManualCourseEnrollmentOrderViewSet, 'bulk_chunk_size', 2):
+            with mock.patch.object(
+                ManualCourseEnrollmentOrderViewSet, '_get_learner_users', autospec=True,
+                side_effect=get_learner_users_racing
+            ):
+                _, response_data = self.post_order(post_data, self.user)
+
+        orders = response_data["orders"]
+        self.assertEqual([order["status"] for order in orders], ["failure", "failure", "success"])
+        self.assertEqual(orders[0]["detail"], "Failed to create free order")
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_bulk_orders_recorded(self):
+        """
+        Test that the orders placed in bulk record their discounts, status changes, history and offer usage.
+        """
+        post_data = self.generate_post_data(3)
+        _, response_data = self.post_order(post_data, self.user)
+
+        orders = Order.objects.filter(number__in=[order["detail"] for order in response_data["orders"]])
+        self.assertEqual(orders.count(), 3)
+        offer = ConditionalOffer.objects.get(name__endswith=post_data["enrollments"][0]["enterprise_customer_uuid"])
+        self.assertEqual(offer.num_orders, 3)
+        self.assertEqual(offer.num_applications, 3)
+        self.assertEqual(offer.total_discount, 3 * self.course_price)
+
+        for order in orders:
+            self.assertEqual(order.basket.status, Basket.SUBMITTED)
+            self.assertEqual(order.basket.lines.count(), 1)
+            self.assertEqual(order.history.count(), 1)
+            self.assertEqual(order.lines.first().history.count(), 1)
+            self.assertEqual(order.lines.first().prices.get().price_excl_tax, 0)
+            self.assertEqual(order.status_changes.get().new_status, ORDER.COMPLETE)
+            discount = order.discounts.get()
+            self.assertEqual((discount.offer, discount.amount), (offer, self.course_price))
+            self.assertEqual(OfferUserSpend.objects.get(offer=offer, user=order.user).total_discount, self.course_price)
+
+    def test_bulk_chunks(self):
+        """
+        Test that enrollments spread over several chunks, including repeated enrollments, get one order per learner.
+        """
+        post_data = self.generate_post_data(4)
+        post_data["enrollments"].append(post_data["enrollments"][0])
+        post_data["enrollments"].insert(1, post_data["enrollments"][0])
+
+        with mock.patch.object(ManualCourseEnrollmentOrderViewSet, 'bulk_chunk_size', 2):
+            _, response_data = self.post_order(post_data, self.user)
+
+        orders = response_data["orders"]
+        self.assertEqual([order["status"] for order in orders], ["success"] * 6)
+        self.assertEqual([order["new_order_created"] for order in orders], [True, False, True, True, True, False])
+        self.assertEqual(orders[0]["detail"], orders[1]["detail"])
+        self.assertEqual(orders[0]["detail"], orders[5]["detail"])
+        self.assertEqual(Order.objects.count(), 4)
+
+    def test_bulk_query_count(self):
+        """
+        Test that the number of queries made does not grow with the number of enrollments placed together.
+        """
+        # Create the discount offer, which later requests only read.
+        self.post_order(self.generate_post_data(1), self.user)
+
+        query_counts = []
+        for offset, enrollment_count in ((100, 2), (200, 20)):
+            post_data = self.generate_post_data(enrollment_count)
+            for enrollment in post_data["enrollments"]:
+                enrollment["username"] += str(offset)
+                enrollment["lms_user_id"] += offset
+
+            with CaptureQueriesContext(connection) as queries:
+                _, response_data = self.post_order(post_data, self.user)
+            self.assertEqual([order["new_order_created"] for order in response_data["orders"]],
+                             [True] * enrollment_count)
+            query_counts.append(len(queries))
+
+        self.assertEqual(query_counts[0], query_counts[1])
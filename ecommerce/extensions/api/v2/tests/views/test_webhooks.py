@@ -4,14 +4,18 @@ import logging
 
 import ddt
 import mock
+import stripe
 from django.test import Client
 from django.urls import reverse
+from oscar.core.loading import get_model
 from stripe.error import SignatureVerificationError
 from testfixtures import LogCapture
 
 from ecommerce.extensions.api.v2.tests.views import JSON_CONTENT_TYPE
 from ecommerce.tests.testcases import TestCase
 
+StripeWebhookEvent = get_model('payment', 'StripeWebhookEvent')
+
 log = logging.getLogger(__name__)
 log_name = 'ecommerce.extensions.api.v2.views.webhooks'
 
@@ -37,14 +41,13 @@ class StripeWebhooksViewTests(TestCase):
         self.mock_header = {
             'HTTP_STRIPE_SIGNATURE': 't=1674755157,v1=a5e6655d0f41076ca300150ed98b125ab0203f8672ced6f7cc9c8856517727e8',
         }
-        self.mock_stripe_event = mock.Mock()
 
     def _build_request_data(self, **kwargs):
         event_type = kwargs.get('event_type', None)
         amount = kwargs.get('amount', None)
         payment_intent_id = kwargs.get('payment_intent_id', None)
         return {
-            'id': 'evt_123dummy',
+            'id': kwargs.get('event_id', 'evt_123dummy'),
             'object': 'event',
             'api_version': '2022-08-01',
             'created': 1673630016,
@@ -131,15 +134,35 @@ class StripeWebhooksViewTests(TestCase):
             ),
         ]
         with self.settings(**self.mock_settings):
-            self.mock_stripe_event.type = event_type
-            self.mock_stripe_event.data.object.amount = amount
-            self.mock_stripe_event.data.object.id = payment_intent_id
-            mock_construct_event.return_value = self.mock_stripe_event
+            mock_construct_event.return_value = stripe.Event.construct_from(post_data, 'sk_test_123')
             with LogCapture(log_name) as log_capture:
                 response = self.client.post(self.url, post_data, content_type=JSON_CONTENT_TYPE, **self.mock_header)
                 self.assertEqual(response.status_code, 200)
                 log_capture.check_present(*expected_logs)
 
+        webhook_event = StripeWebhookEvent.objects.get(event_id=post_data['id'])
+        self.assertEqual(webhook_event.event_type, event_type)
+        self.assertEqual(webhook_event.amount, amount)
+        self.assertEqual(webhook_event.payment_intent_id, payment_intent_id)
+        self.assertEqual(webhook_event.order_number, 'EDX-10001')
+        self.assertEqual(webhook_event.status, StripeWebhookEvent.NEW)
+
+    @mock.patch('stripe.Webhook.construct_event')
+    def test_duplicate_webhook_event(self, mock_construct_event):
+        """
+        Verify an event delivered more than once is only stored once, and is still acknowledged.
+        """
+        post_data = self._build_request_data(
+            event_type='payment_intent.succeeded', amount=299, payment_intent_id='pi_123dummy'
+        )
+        with self.settings(**self.mock_settings):
+            mock_construct_event.return_value = stripe.Event.construct_from(post_data, 'sk_test_123')
+            for __ in range(2):
+                response = self.client.post(self.url, post_data, content_type=JSON_CONTENT_TYPE, **self.mock_header)
+                self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(StripeWebhookEvent.objects.filter(event_id=post_data['id']).count(), 1)
+
     @mock.patch('stripe.Webhook.construct_event')
     def test_unhandled_webhook_event(self, mock_construct_event):
         """
@@ -155,9 +178,12 @@ class StripeWebhooksViewTests(TestCase):
             ),
         ]
         with self.settings(**self.mock_settings):
-            self.mock_stripe_event.type = event_type
-            mock_construct_event.return_value = self.mock_stripe_event
+            mock_construct_event.return_value = stripe.Event.construct_from(post_data, 'sk_test_123')
             with LogCapture(log_name) as log_capture:
                 response = self.client.post(self.url, post_data, content_type=JSON_CONTENT_TYPE, **self.mock_header)
                 self.assertEqual(response.status_code, 200)
                 log_capture.check_present(*expected_logs)
+
+        webhook_event = StripeWebhookEvent.objects.get(event_id=post_data['id'])
+        self.assertEqual(webhook_event.status, StripeWebhookEvent.IGNORED)
+        self.assertIsNone(webhook_event.payment_intent_id)
@@ -2,6 +2,8 @@
 
 
 import logging
+from bisect import bisect_left
+from collections import defaultdict
 from decimal import Decimal
 
 import dateutil
@@ -9,7 +11,7 @@ import django_filters
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import F, Prefetch, Q
 from django.utils.decorators import method_decorator
 from edx_rest_framework_extensions.auth.jwt.authentication import JwtAuthentication
 from oscar.core.loading import get_class, get_model
@@ -22,6 +24,7 @@ from rest_framework.permissions import DjangoModelPermissions, IsAdminUser, IsAu
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
+from ecommerce.core.constants import SEAT_PRODUCT_CLASS_NAME
 from ecommerce.courses.models import Course
 from ecommerce.courses.utils import get_course_run_detail
 from ecommerce.enterprise.mixins import EnterpriseDiscountMixin
@@ -35,6 +38,7 @@ from ecommerce.extensions.fulfillment.status import LINE, ORDER
 from ecommerce.extensions.offer.models import OFFER_PRIORITY_MANUAL_ORDER
 from ecommerce.extensions.order.benefits import ManualEnrollmentOrderDiscountBenefit
 from ecommerce.extensions.order.conditions import ManualEnrollmentOrderDiscountCondition
+from ecommerce.extensions.order.utils import BulkFreeOrderCreator, FreeOrderPlacement
 from ecommerce.programs.custom import class_path
 
 logger = logging.getLogger(__name__)
@@ -48,13 +52,39 @@ Applicator = get_class('offer.applicator', 'Applicator')
 ConditionalOffer = get_model('offer', 'ConditionalOffer')
 Condition = get_model('offer', 'Condition')
 Benefit = get_model('offer', 'Benefit')
+StockRecord = get_model('partner', 'StockRecord')
 
 
 @method_decorator(transaction.non_atomic_requests, name='dispatch')
 class OrderViewSet(viewsets.ReadOnlyModelViewSet):
     lookup_field = 'number'
     permission_classes = (IsAuthenticated, IsStaffOrOwner, DjangoModelPermissions,)
-    queryset = Order.objects.all()
+    # Load everything OrderSerializer reads up front, so that the number of queries made to serialize
+    # a page of orders does not grow with the number of orders (or lines) on the page.
+    queryset = Order.objects.select_related(
+        'basket', 'billing_address', 'user',
+    ).prefetch_related(
+        'discounts',
+        'sources__source_type',
+        Prefetch(
+            'lines',
+            queryset=OrderLine.objects.select_related(
+                'product__course',
+                'product__product_class',
+                'product__parent__course',
+                'product__parent__product_class',
+            ).prefetch_related(
+                'attributes',
+                'product__attribute_values__attribute',
+                'product__parent__attribute_values__attribute',
+                'product__stockrecords',
+            )
+        ),
+        'basket__basketattribute_set__attribute_type',
+        'basket__vouchers__applications',
+        'basket__vouchers__offers__benefit',
+        'basket__vouchers__offers__condition__range',
+    )
     serializer_class = serializers.OrderSerializer
     throttle_classes = (ServiceUserThrottle,)
     filter_backends = (django_filters.rest_framework.DjangoFilterBackend,)
@@ -142,6 +172,9 @@ class ManualCourseEnrollmentOrderViewSet(EdxOrderPlacementMixin, EnterpriseDisco
             >>>     ]
             >>> }
 
+            Backfills of many enrollments should set `"bulk": true` alongside `enrollments`, to place the orders
+            with bulk inserts, `bulk_chunk_size` enrollments at a time. The response is the same.
+
             Response
             >>> {
             >>>     "orders": [
@@ -183,6 +216,9 @@ class ManualCourseEnrollmentOrderViewSet(EdxOrderPlacementMixin, EnterpriseDisco
 
     SUCCESS, FAILURE = "success", "failure"
 
+    # Number of enrollments whose orders are placed together by a bulk request.
+    bulk_chunk_size = 500
+
     @staticmethod
     def existing_purchased_line(seat_product, user, site):
         """ Returns existing OrderLine object purchased by user whether in the form of course entitlement
@@ -217,12 +253,376 @@ class ManualCourseEnrollmentOrderViewSet(EdxOrderPlacementMixin, EnterpriseDisco
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        orders = []
-        for enrollment in enrollments:
-            orders.append(self._create_single_order(enrollment, request.user, request.site))
+        if request.data.get("bulk"):
+            orders = self._create_orders_in_bulk(enrollments, request.user, request.site)
+        else:
+            orders = [self._create_single_order(enrollment, request.user, request.site) for enrollment in enrollments]
 
         return Response({"orders": orders}, status=status.HTTP_200_OK)
 
+    def _create_orders_in_bulk(self, enrollments, request_user, request_site):
+        """
+            Creates the orders of the given enrollments, `bulk_chunk_size` enrollments at a time.
+
+            Users, courses, seats and offers are resolved once per distinct key, and the orders of a chunk are placed
+            with bulk inserts, so the number of queries grows with the number of chunks rather than of enrollments.
+            Returns the same per-enrollment results as `_create_single_order`. An error while creating the orders of
+            a chunk rolls the chunk back, and fails its enrollments only.
+        """
+        results = [None] * len(enrollments)
+        valid_enrollments = []
+        dates_placed = {}
+        for index, enrollment in enumerate(enrollments):
+            try:
+                enrollment_data = self._get_enrollment_data(enrollment)
+                dates_placed[index] = self._get_date_placed(enrollment)
+            except ValidationError as ex:
+                results[index] = dict(enrollment, status=self.FAILURE, detail=ex.message, new_order_created=None)
+                continue
+
+            lms_user_id, learner_username, learner_email, course_run_key, __, discount_percentage, sales_force_id, \
+                salesforce_opportunity_line_item = enrollment_data
+            logger.info(
+                '[Manual Order Creation] Request received. User: %s, Email: %s, Course: %s, RequestUser: %s, '
+                'Discount Percentage: %s, Salesforce Opportunity Id: %s, Salesforce Opportunity Line Item Id: %s',
+                learner_username,
+                learner_email,
+                course_run_key,
+                request_user.username,
+                discount_percentage,
+                sales_force_id,
+                salesforce_opportunity_line_item,
+            )
+            valid_enrollments.append((index, enrollment, enrollment_data))
+
+        context = {
+            'site': request_site,
+            'courses': {},
+            'seats': {},
+            'course_uuids': {},
+            'uuid_products': {},
+            'offers': {},
+            'dates_placed': dates_placed,
+        }
+        for start in range(0, len(valid_enrollments), self.bulk_chunk_size):
+            chunk = valid_enrollments[start:start + self.bulk_chunk_size]
+            try:
+                with transaction.atomic():
+                    chunk_results = list(self._create_chunk_of_orders(chunk, context))
+            except:  # pylint: disable=bare-except
+                logger.exception(
+                    '[Manual Order Creation Failure] Failed to create the orders of a chunk of enrollments. Users: %s',
+                    [enrollment_data[1] for __, __, enrollment_data in chunk],
+                )
+                # Offers created for the chunk were rolled back with it.
+                context['offers'].clear()
+                chunk_results = [
+                    (index, dict(
+                        enrollment, status=self.FAILURE, detail="Failed to create free order", new_order_created=None
+                    ))
+                    for index, enrollment, __ in chunk
+                ]
+
+            for index, result in chunk_results:
+                results[index] = result
+
+        return results
+
+    @staticmethod
+    def _get_date_placed(enrollment):
+        """
+        Return the date placed of an enrollment, if any, parsed from its ISO 8601 representation.
+
+        Raises:
+            ValidationError: If the date placed is not an ISO 8601 datetime.
+        """
+        date_placed = enrollment.get('date_placed')
+        if not date_placed:
+            return None
+
+        try:
+            return dateutil.parser.isoparse(date_placed)
+        except (TypeError, ValueError):
+            raise ValidationError('Date placed should be an ISO 8601 datetime.')
+
+    def _create_chunk_of_orders(self, chunk, context):
+        """
+        Creates the orders of a chunk of validated enrollments, and yields the index and result of each enrollment.
+
+        `context` memoizes the courses, seats, course UUIDs and offers resolved for earlier chunks.
+        """
+        site = context['site']
+        users = self._get_learner_users(chunk)
+        self._resolve_seats({data[3] for __, __, data in chunk}, context)
+
+        pending = []
+        for index, enrollment, enrollment_data in chunk:
+            learner_username, course_run_key, mode = enrollment_data[1], enrollment_data[3], enrollment_data[4]
+            if context['courses'].get(course_run_key) is None:
+                yield index, dict(enrollment, status=self.FAILURE, detail="Course not found", new_order_created=None)
+                continue
+
+            seat_product = context['seats'].get((course_run_key, mode))
+            course_uuid = self._get_course_uuid(course_run_key, context) if seat_product else None
+            if course_uuid is None:
+                logger.error(
+                    "Could not access existing purchased line. User: %s, Site: %s, course_run_key: %s",
+                    learner_username,
+                    site,
+                    course_run_key,
+                )
+                yield index, dict(
+                    enrollment, status=self.FAILURE, detail="Failed to create free order", new_order_created=None
+                )
+                continue
+
+            pending.append((index, enrollment, enrollment_data, users[learner_username], seat_product, course_uuid))
+
+        existing_lines = self._get_existing_purchased_lines(pending, context)
+        placements = {}
+        for index, enrollment, enrollment_data, user, seat_product, course_uuid in pending:
+            discount_percentage = enrollment_data[5]
+            order_line = existing_lines.get((user.id, seat_product.id, course_uuid))
+            if order_line:
+                self._update_all_orderline_with_enterprise_discount(order_line.order, discount_percentage)
+                yield index, dict(enrollment, status=self.SUCCESS, detail=order_line.order.number,
+                                  new_order_created=False)
+                continue
+
+            # Enrollments repeated within the chunk are fulfilled by the order placed for the first of them.
+            placement = placements.setdefault((user.id, seat_product.id), {'enrollment': None, 'repeats': []})
+            if placement['enrollment'] is None:
+                placement['enrollment'] = (index, enrollment, enrollment_data, user, seat_product)
+            else:
+                placement['repeats'].append((index, enrollment, discount_percentage))
+
+        yield from self._place_orders_in_bulk(list(placements.values()), context)
+
+    def _place_orders_in_bulk(self, placements, context):
+        """
+        Places the orders of the given enrollments in bulk, and yields the index and result of each enrollment.
+        """
+        if not placements:
+            return
+
+        order_placements = []
+        for placement in placements:
+            index, enrollment, enrollment_data, user, seat_product = placement['enrollment']
+            stockrecord = seat_product.stockrecords.all()[0]
+            order_placements.append(FreeOrderPlacement(
+                user=user,
+                product=seat_product,
+                stockrecord=stockrecord,
+                offer=self._get_or_create_discount_offer_once(
+                    enrollment.get('enterprise_customer_name'),
+                    enrollment.get('enterprise_customer_uuid'),
+                    enrollment_data[6],
+                    enrollment_data[7],
+                    context,
+                ),
+                unit_price=stockrecord.price or Decimal('0'),
+                date_placed=context['dates_placed'][index],
+                line_fields={},
+            ))
+
+        order_placements = [
+            order_placement._replace(line_fields=self._get_enterprise_discount_line_fields(
+                order_placement.unit_price, placement['enrollment'][2][5]
+            ))
+            for order_placement, placement in zip(self._apply_prices_at_date_placed(order_placements), placements)
+        ]
+
+        orders = BulkFreeOrderCreator().place_orders(context['site'], order_placements)
+
+        for order, order_placement, placement in zip(orders, order_placements, placements):
+            index, enrollment = placement['enrollment'][:2]
+            self.handle_bulk_successful_order(order, order_placement)
+            logger.info(
+                '[Manual Order Creation] Order completed. User: %s, Course: %s, Basket: %s, Order: %s, Product: %s',
+                order_placement.user.username,
+                order_placement.product.course_id,
+                order.basket_id,
+                order_placement.product.id,
+                order.number,
+            )
+            yield index, dict(enrollment, status=self.SUCCESS, detail=order.number, new_order_created=True)
+
+            for repeat_index, repeat_enrollment, discount_percentage in placement['repeats']:
+                self._update_all_orderline_with_enterprise_discount(order, discount_percentage)
+                yield repeat_index, dict(
+                    repeat_enrollment, status=self.SUCCESS, detail=order.number, new_order_created=False
+                )
+
+    def _get_learner_users(self, chunk):
+        """
+        Bulk version of `_get_learner_user`, returning the users of the given enrollments keyed by username.
+        """
+        user_model = get_user_model()
+        learners = {data[1]: (data[0], data[2]) for __, __, data in chunk}
+        users = user_model.objects.in_bulk(list(learners), field_name='username')
+
+        updated_users = []
+        for username, user in users.items():
+            lms_user_id, email = learners[username]
+            if user.lms_user_id != lms_user_id or user.email != email:
+                user.lms_user_id, user.email = lms_user_id, email
+                updated_users.append(user)
+        if updated_users:
+            user_model.objects.bulk_update(updated_users, ['email', 'lms_user_id'])
+
+        new_usernames = [username for username in learners if username not in users]
+        if new_usernames:
+            user_model.objects.bulk_create([
+                user_model(username=username, email=learners[username][1], lms_user_id=learners[username][0])
+                for username in new_usernames
+            ])
+            users.update(user_model.objects.in_bulk(new_usernames, field_name='username'))
+
+        return users
+
+    @staticmethod
+    def _resolve_seats(course_run_keys, context):
+        """
+        Fetches the courses, and their paid seats, that were not resolved for an earlier chunk.
+        """
+        course_run_keys = [key for key in course_run_keys if key not in context['courses']]
+        if not course_run_keys:
+            return
+
+        courses = Course.objects.in_bulk(course_run_keys)
+        for course_run_key in course_run_keys:
+            context['courses'][course_run_key] = courses.get(course_run_key)
+
+        seats = Product.objects.filter(
+            structure=Product.CHILD,
+            parent__course_id__in=courses,
+            parent__product_class__name=SEAT_PRODUCT_CLASS_NAME,
+            attribute_values__attribute__name='certificate_type',
+        ).annotate(
+            certificate_type=F('attribute_values__value_text'),
+        ).select_related(
+            'parent__product_class',
+        ).prefetch_related(
+            Prefetch('stockrecords', queryset=StockRecord.objects.select_related('partner')),
+        ).order_by('-date_created')
+
+        for seat in seats:
+            if seat.stockrecords.all():
+                context['seats'].setdefault((seat.parent.course_id, seat.certificate_type), seat)
+
+    def _get_course_uuid(self, course_run_key, context):
+        """
+        Returns the UUID of the course of the given course run, or None if it could not be retrieved.
+        """
+        if course_run_key not in context['course_uuids']:
+            try:
+                course_uuid = get_course_run_detail(context['site'], course_run_key)['course_uuid']
+            except (RequestException, ConnectionError, Timeout, HTTPError, AttributeError):
+                logger.exception('Could not retrieve the course run [%s] from the Discovery service.', course_run_key)
+                course_uuid = None
+            context['course_uuids'][course_run_key] = course_uuid
+        return context['course_uuids'][course_run_key]
+
+    @staticmethod
+    def _get_existing_purchased_lines(pending, context):
+        """
+        Bulk version of `existing_purchased_line`, returning the lines already purchased by the users of the given
+        enrollments keyed by user id, seat id and course UUID.
+        """
+        if not pending:
+            return {}
+
+        uuid_products = context['uuid_products']
+        new_course_uuids = {course_uuid for *__, course_uuid in pending if course_uuid not in uuid_products}
+        if new_course_uuids:
+            for course_uuid in new_course_uuids:
+                uuid_products[course_uuid] = set()
+            for course_uuid, product_id in Product.objects.filter(
+                    attribute_values__attribute__code='UUID',
+                    attribute_values__value_text__in=new_course_uuids,
+            ).annotate(
+                course_uuid=F('attribute_values__value_text'),
+            ).values_list('course_uuid', 'id'):
+                uuid_products[course_uuid].add(product_id)
+
+        product_ids = set()
+        for *__, seat_product, course_uuid in pending:
+            product_ids.add(seat_product.id)
+            product_ids.update(uuid_products[course_uuid])
+
+        user_lines = {}
+        for line in OrderLine.objects.filter(
+                product_id__in=product_ids,
+                order__user_id__in={user.id for *__, user, __, __ in pending},
+                status=LINE.COMPLETE,
+        ).select_related('order').order_by('pk'):
+            user_lines.setdefault((line.order.user_id, line.product_id), line)
+
+        existing_lines = {}
+        for *__, user, seat_product, course_uuid in pending:
+            lines = [
+                user_lines[(user.id, product_id)]
+                for product_id in {seat_product.id} | uuid_products[course_uuid]
+                if (user.id, product_id) in user_lines
+            ]
+            if lines:
+                existing_lines[(user.id, seat_product.id, course_uuid)] = min(lines, key=lambda line: line.pk)
+        return existing_lines
+
+    def _get_or_create_discount_offer_once(
+            self, enterprise_customer_name, enterprise_customer_uuid, sales_force_id, salesforce_opportunity_line_item,
+            context):
+        """
+        Memoized version of `_get_or_create_discount_offer`, getting each distinct offer once per request.
+        """
+        key = (enterprise_customer_name, enterprise_customer_uuid, sales_force_id, salesforce_opportunity_line_item)
+        if key not in context['offers']:
+            context['offers'][key] = self._get_or_create_discount_offer(*key)
+        return context['offers'][key]
+
+    @staticmethod
+    def _apply_prices_at_date_placed(order_placements):
+        """
+        Bulk version of `_update_order_according_to_date_place`, pricing the placements with a date placed at the
+        price their stock record had at that date.
+        """
+        dated_placements = [placement for placement in order_placements if placement.date_placed]
+        if not dated_placements:
+            return order_placements
+
+        price_history = defaultdict(list)
+        for stockrecord_id, history_date, price in StockRecord.history.filter(
+                id__in={placement.stockrecord.id for placement in dated_placements},
+                history_date__lt=max(placement.date_placed for placement in dated_placements),
+        ).order_by('history_date').values_list('id', 'history_date', 'price'):
+            price_history[stockrecord_id].append((history_date, price))
+
+        priced_placements = []
+        for placement in order_placements:
+            if placement.date_placed:
+                history = price_history[placement.stockrecord.id]
+                position = bisect_left([history_date for history_date, __ in history], placement.date_placed)
+                price = history[position - 1][1] if position else placement.stockrecord.price
+                placement = placement._replace(unit_price=price or Decimal('0'))
+            priced_placements.append(placement)
+        return priced_placements
+
+    def _get_enterprise_discount_line_fields(self, unit_price, discount_percentage):
+        """
+        Returns the enterprise discount fields `_update_all_orderline_with_enterprise_discount` would set on a line.
+        """
+        if discount_percentage is None:
+            return {}
+
+        contract_metadata = self._get_contract_metadata_for_manual_order(Decimal(discount_percentage))
+        effective_discount_percentage = self._calculate_effective_discount_percentage(contract_metadata)
+        return {
+            'effective_contract_discount_percentage': effective_discount_percentage,
+            'effective_contract_discounted_price': self._get_enterprise_customer_cost_for_line(
+                unit_price, effective_discount_percentage
+            ),
+        }
+
     def _create_single_order(self, enrollment, request_user, request_site):
         """
             Creates an order from a single enrollment.
@@ -518,3 +918,18 @@ class ManualCourseEnrollmentOrderViewSet(EdxOrderPlacementMixin, EnterpriseDisco
         )
 
         return order
+
+    @staticmethod
+    def handle_bulk_successful_order(order, order_placement):
+        """
+        Audit an order placed in bulk, which `BulkFreeOrderCreator` placed fulfilled already.
+        """
+        audit_log(
+            'manual_order_fulfilled',
+            amount=order.total_excl_tax,
+            basket_id=order.basket_id,
+            currency=order.currency,
+            order_number=order.number,
+            user_id=order_placement.user.id,
+            contains_coupon=order_placement.product.is_coupon_product
+        )
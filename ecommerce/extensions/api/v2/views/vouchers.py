@@ -2,6 +2,7 @@
 
 
 import logging
+from functools import lru_cache
 from urllib.parse import urlparse
 
 import django_filters
@@ -21,7 +22,7 @@ from rest_framework.response import Response
 from ecommerce.core.constants import DEFAULT_CATALOG_PAGE_SIZE
 from ecommerce.coupons.utils import fetch_course_catalog, get_catalog_course_runs
 from ecommerce.courses.models import Course
-from ecommerce.courses.utils import get_course_info_from_catalog
+from ecommerce.courses.utils import get_course_info_from_catalog, get_course_run_seat_ids
 from ecommerce.enterprise.utils import get_enterprise_catalog
 from ecommerce.extensions.api import serializers
 from ecommerce.extensions.api.permissions import IsOffersOrIsAuthenticatedAndStaff
@@ -34,6 +35,12 @@ StockRecord = get_model('partner', 'StockRecord')
 Voucher = get_model('voucher', 'Voucher')
 
 
+@lru_cache(maxsize=4096)
+def _parse_catalog_datetime(value):
+    """ Parse a Discovery datetime string, memoized since the same course run dates are seen on every request. """
+    return default_tzinfo(parse(value), pytz.UTC)
+
+
 class VoucherFilter(django_filters.rest_framework.FilterSet):
     """
     Filter for vouchers via query string parameters.
@@ -118,11 +125,11 @@ class VoucherViewSet(NonDestroyableModelViewSet):
             #   if end date is not set or is in the future
             #   if enrollment start is not set or is in the past
             #   if enrollment end is not set or is in the future
-            end = course_run.get('end') and default_tzinfo(parse(course_run['end']), pytz.UTC)
+            end = course_run.get('end') and _parse_catalog_datetime(course_run['end'])
             enrollment_start = (course_run.get('enrollment_start') and
-                                default_tzinfo(parse(course_run['enrollment_start']), pytz.UTC))
+                                _parse_catalog_datetime(course_run['enrollment_start']))
             enrollment_end = (course_run.get('enrollment_end') and
-                              default_tzinfo(parse(course_run['enrollment_end']), pytz.UTC))
+                              _parse_catalog_datetime(course_run['enrollment_end']))
             current_time = now()
 
             return (
@@ -143,13 +150,21 @@ class VoucherViewSet(NonDestroyableModelViewSet):
             elif is_course_run_enrollable(result):
                 course_run_metadata[result['key']] = result
 
-        products = []
-        for seat_type in course_seat_types.split(','):
-            products.extend(Product.objects.filter(
-                course_id__in=list(course_run_metadata.keys()),
-                attributes__name='certificate_type',
-                attribute_values__value_text=seat_type
-            ))
+        seat_ids = get_course_run_seat_ids(course_run_metadata.keys())
+        product_ids = [
+            product_id
+            for seat_type in course_seat_types.split(',')
+            for seats in seat_ids.values()
+            for product_id in seats.get(seat_type, [])
+        ]
+        products_by_id = {
+            product.id: product
+            for product in Product.objects.filter(id__in=product_ids).select_related(
+                'parent', 'product_class'
+            ).prefetch_related('attribute_values__attribute')
+        }
+        # Keep the products grouped by seat type, in the order the seat types were requested.
+        products = [products_by_id[product_id] for product_id in product_ids if product_id in products_by_id]
         stock_records = StockRecord.objects.filter(product__in=products)
         return products, stock_records, course_run_metadata
 
@@ -169,6 +184,10 @@ class VoucherViewSet(NonDestroyableModelViewSet):
             response['results'], course_seat_types
         )
         contains_verified_course = ('verified' in course_seat_types)
+        stock_records_by_product = {}
+        for stock_record in stock_records:
+            stock_records_by_product.setdefault(stock_record.product_id, stock_record)
+        courses = Course.objects.in_bulk({product.course_id for product in products})
         for product in products:
             logger.info('[Voucher Offers] Constructing offer data. Product: [%s]', product.id)
             # Omit unavailable seats from the offer results so that one seat does not cause an
@@ -195,16 +214,12 @@ class VoucherViewSet(NonDestroyableModelViewSet):
                     multiple_credit_providers = False
                     credit_provider_price = StockRecord.objects.get(product=product).price
 
-            try:
-                stock_record = stock_records.get(product__id=product.id)
-            except StockRecord.DoesNotExist:
-                stock_record = None
+            stock_record = stock_records_by_product.get(product.id)
+            if not stock_record:
                 logger.error('Stock Record for product %s not found.', product.id)
 
-            try:
-                course = Course.objects.get(id=course_id)
-            except Course.DoesNotExist:  # pragma: no cover
-                course = None
+            course = courses.get(course_id)
+            if not course:  # pragma: no cover
                 logger.error('Course %s not found.', course_id)
 
             if course_catalog_data and course and stock_record:
@@ -6,6 +6,7 @@ import logging
 import stripe
 from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
+from oscar.core.loading import get_model
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
@@ -14,6 +15,8 @@ from stripe.error import SignatureVerificationError
 
 logger = logging.getLogger(__name__)
 
+StripeWebhookEvent = get_model('payment', 'StripeWebhookEvent')
+
 stripe.api_key = settings.PAYMENT_PROCESSOR_CONFIG['edx']['stripe']['secret_key']
 endpoint_secret = settings.PAYMENT_PROCESSOR_CONFIG['edx']['stripe']['webhook_endpoint_secret']
 
@@ -21,7 +24,8 @@ endpoint_secret = settings.PAYMENT_PROCESSOR_CONFIG['edx']['stripe']['webhook_en
 class StripeWebhooksView(APIView):
     """
     Endpoint for Stripe webhook events. A 200 response should be returned as soon as possible
-    since Stripe will retry the event if no response is received.
+    since Stripe will retry the event if no response is received. Events are therefore only
+    verified and stored here, and handled asynchronously.
 
     Django's default cross-site request forgery (CSRF) protection is disabled,
     request are verified instead by the presence of request headers STRIPE_SIGNATURE.
@@ -48,34 +52,20 @@ class StripeWebhooksView(APIView):
             logger.exception('StripeWebhooksView SignatureVerificationError: %s', e)
             return Response('Invalid signature', status=400)
 
-        # TODO REV-3296: save webhooks event data in webhooks data model. Possibly move the handling of the event
-        # to another function, and return response asap if we're listening to many events.
-
-        # Handle the event
-        payment_intent = event.data.object
-        if event.type == 'payment_intent.succeeded':
-            logger.info(
-                '[Stripe webhooks] event payment_intent.succeeded with amount %d and payment intent ID [%s].',
-                payment_intent.amount,
-                payment_intent.id,
-            )
-            # TODO: define and call a method to handle the successful payment intent.
-            # handle_payment_intent_succeeded(payment_intent)
-        elif event.type == 'payment_intent.payment_failed':
-            logger.info(
-                '[Stripe webhooks] event payment_intent.payment_failed with amount %d and payment intent ID [%s].',
-                payment_intent.amount,
-                payment_intent.id,
-            )
-            # TODO: define and call a method to handle failed payment intent.
-        elif event.type == 'payment_intent.requires_action':
+        # Store the event and acknowledge it right away. Stripe retries deliveries that are not acknowledged
+        # quickly, and the same event may be delivered more than once, so events are deduplicated by their ID.
+        # Stored events are handled by the process_stripe_webhook_events management command.
+        webhook_event, created = StripeWebhookEvent.record(event)
+        if not created:
+            logger.info('[Stripe webhooks] event [%s] has already been received.', webhook_event.event_id)
+        elif webhook_event.status == StripeWebhookEvent.IGNORED:
+            logger.warning('[Stripe webhooks] unhandled event with type [%s].', event.type)
+        else:
             logger.info(
-                '[Stripe webhooks] event payment_intent.requires_action with amount %d and payment intent ID [%s].',
-                payment_intent.amount,
-                payment_intent.id,
+                '[Stripe webhooks] event %s with amount %d and payment intent ID [%s].',
+                event.type,
+                webhook_event.amount,
+                webhook_event.payment_intent_id,
             )
-            # TODO: define and call a method to handle requires_action for 3DS.
-        else:
-            logger.warning('[Stripe webhooks] unhandled event with type [%s].', event.type)
 
         return Response(status=status.HTTP_200_OK)
@@ -47,15 +47,7 @@ class BasketMiddleware(OscarBasketMiddleware):
             # Signed-in user: if they have a cookie basket too, it means
             # that they have just signed in and we need to merge their cookie
             # basket into their user basket, then delete the cookie.
-            try:
-                basket, __ = manager.get_or_create(owner=request.user, site=request.site)
-            except Basket.MultipleObjectsReturned:
-                # Not sure quite how we end up here with multiple baskets.
-                # We merge them and create a fresh one
-                old_baskets = list(manager.filter(owner=request.user, site=request.site))
-                basket = old_baskets[0]
-                for other_basket in old_baskets[1:]:
-                    self.merge_baskets(basket, other_basket)
+            basket = Basket.get_basket(request.user, request.site, session=getattr(request, 'session', None))
 
             # Assign user onto basket to prevent further SQL queries when
             # basket.owner is accessed.
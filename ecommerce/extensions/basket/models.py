@@ -1,6 +1,7 @@
 
 
-from django.db import models
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
 from django.utils.translation import ugettext_lazy as _
 from edx_django_utils.cache import DEFAULT_REQUEST_CACHE
 from oscar.apps.basket.abstract_models import AbstractBasket
@@ -32,27 +33,61 @@ class Basket(AbstractBasket):
         return basket
 
     @classmethod
-    def get_basket(cls, user, site):
+    def get_basket(cls, user, site, session=None):
         """ Retrieve the basket belonging to the indicated user.
 
         If no such basket exists, create a new one. If multiple such baskets exist,
         merge them into one.
+
+        If a session is given, the id of the basket is stored in it, so that the basket
+        of later requests is retrieved by a primary key lookup.
         """
-        editable_baskets = cls.objects.filter(site=site, owner=user, status__in=cls.editable_statuses)
-        if not editable_baskets:
-            basket = cls.create_basket(site, user)
-        else:
-            stale_baskets = list(editable_baskets)
-            basket = stale_baskets.pop(0)
-            for stale_basket in stale_baskets:
-                # Don't add line quantities when merging baskets
-                basket.merge(stale_basket, add_quantities=False)
+        basket = None
+        session_key = cls.get_session_key(site)
+        basket_id = session.get(session_key) if session is not None else None
+        if basket_id:
+            basket = cls.objects.filter(
+                id=basket_id, site=site, owner=user, status__in=cls.editable_statuses
+            ).first()
+
+        if basket is None:
+            basket = cls._get_or_create_editable_basket(user, site)
+            if session is not None:
+                session[session_key] = basket.id
 
         # Assign the appropriate strategy class to the basket
         basket.strategy = Selector().strategy(user=user)
 
         return basket
 
+    @classmethod
+    def _get_or_create_editable_basket(cls, user, site):
+        """ Return the editable basket of the user, merging or creating baskets as needed. """
+        with transaction.atomic():
+            # Lock the user, so that concurrent requests of the same user wait for the basket created by
+            # the first one instead of creating duplicate baskets. The baskets are read with a locking read
+            # as well: inside the request transaction a plain read would return the snapshot taken before
+            # the lock was acquired, which does not include a basket committed by the concurrent request.
+            list(get_user_model().objects.select_for_update().filter(pk=user.pk).values_list('pk'))
+            stale_baskets = list(
+                cls.objects.select_for_update().filter(
+                    site=site, owner=user, status__in=cls.editable_statuses
+                ).order_by('id')
+            )
+            if not stale_baskets:
+                return cls.create_basket(site, user)
+
+            basket = stale_baskets.pop(0)
+            for stale_basket in stale_baskets:
+                # Don't add line quantities when merging baskets
+                basket.merge(stale_basket, add_quantities=False)
+        return basket
+
+    @staticmethod
+    def get_session_key(site):
+        """ Return the session key storing the id of the basket of the user for the given site. """
+        return 'basket_id_{site_id}'.format(site_id=site.id)
+
     def flush(self):
         """Remove all products in basket and fire Segment 'Product Removed' Analytic event for each"""
         cached_response = DEFAULT_REQUEST_CACHE.get_cached_response(TEMPORARY_BASKET_CACHE_KEY)
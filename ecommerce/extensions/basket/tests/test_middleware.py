@@ -67,6 +67,18 @@ class BasketMiddlewareTests(TestCase):
         basket2 = Basket.objects.get(id=basket2.id)
         self.assertEqual(basket2.status, Basket.MERGED)
 
+    def test_get_basket_from_session(self):
+        """ Verify the basket of authenticated users is retrieved by the id stored in their session. """
+        self.request.user = self.create_user()
+        self.request.session = {}
+        basket = BasketFactory(owner=self.request.user, site=self.site)
+        self.assertEqual(basket, self.middleware.get_basket(self.request))
+        self.assertEqual(self.request.session[Basket.get_session_key(self.site)], basket.id)
+
+        self.request._basket_cache = None  # pylint: disable=protected-access
+        with self.assertNumQueries(1):
+            self.assertEqual(basket, self.middleware.get_basket(self.request))
+
     def test_get_basket_with_siteless_basket(self):
         """ Verify the method should ignores baskets without a site. """
         self.request.user = self.create_user()
@@ -4,6 +4,8 @@ import itertools
 
 import mock
 from analytics import Client
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
 from edx_django_utils.cache import DEFAULT_REQUEST_CACHE
 from oscar.core.loading import get_class, get_model
 
@@ -66,6 +68,42 @@ class BasketTests(CatalogMixin, BasketMixin, TransactionTestCase):
         self.assertEqual(len(basket.all_lines()), 0, 'The new basket should be empty')
         self.assertEqual(user.baskets.count(), 2, 'A new basket was not created for the second site.')
 
+    def test_get_basket_with_session(self):
+        """ Verify the id of the basket is stored in the session, and used to retrieve the basket later. """
+        user = UserFactory()
+        session = {}
+        basket = Basket.get_basket(user, self.site, session=session)
+        self.assertEqual(session, {Basket.get_session_key(self.site): basket.id})
+
+        with self.assertNumQueries(1):
+            self.assertEqual(Basket.get_basket(user, self.site, session=session), basket)
+
+        # Baskets that are no longer editable are replaced.
+        basket.status = Basket.SUBMITTED
+        basket.save()
+        new_basket = Basket.get_basket(user, self.site, session=session)
+        self.assertNotEqual(new_basket, basket)
+        self.assertEqual(session, {Basket.get_session_key(self.site): new_basket.id})
+
+        # Baskets of other users are ignored.
+        self.assertNotEqual(Basket.get_basket(UserFactory(), self.site, session=session), new_basket)
+
+    def test_get_basket_locks_user_before_reading_baskets(self):
+        """ Verify the editable baskets are only read, with a locking read, after the user row is locked. """
+        user = UserFactory()
+        basket = self.create_basket(user, self.site)
+        select_for_update = QuerySet.select_for_update
+        locked_models = []
+
+        def record_select_for_update(queryset, *args, **kwargs):
+            locked_models.append(queryset.model)
+            return select_for_update(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True, side_effect=record_select_for_update):
+            self.assertEqual(Basket.get_basket(user, self.site), basket)
+
+        self.assertEqual(locked_models, [get_user_model(), Basket])
+
     def test_get_basket_with_existing_baskets(self):
         """ If the user has existing baskets in editable states, the method should return a single merged basket. """
         user = UserFactory()
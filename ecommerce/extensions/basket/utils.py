@@ -138,7 +138,7 @@ def prepare_basket(request, products, voucher=None):
     Returns:
         basket (Basket): Contains the product to be redeemed and the Voucher applied.
     """
-    basket = Basket.get_basket(request.user, request.site)
+    basket = Basket.get_basket(request.user, request.site, session=getattr(request, 'session', None))
     basket_add_enterprise_catalog_attribute(basket, request.GET)
     basket.flush()
     basket.save()
@@ -6,12 +6,19 @@ This command change priority of conditional offers.
 import logging
 
 from django.core.management import BaseCommand
+from django.db.models import OuterRef, Subquery
 from oscar.core.loading import get_model
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
 
 from ecommerce.core.constants import COUPON_PRODUCT_CLASS_NAME
+from ecommerce.extensions.catalogue.management.utils import BatchProgress, iterate_pk_batches
 
 ConditionalOffer = get_model('offer', 'ConditionalOffer')
+CouponVouchers = get_model('voucher', 'CouponVouchers')
 Product = get_model('catalogue', 'Product')
+ProductAttribute = get_model('catalogue', 'ProductAttribute')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+Voucher = get_model('voucher', 'Voucher')
 logger = logging.getLogger(__name__)
 
 
@@ -55,18 +62,67 @@ class Command(BaseCommand):
             count = coupon_products.count()
             logger.info('Found %d coupon products to update.', count)
 
-            while offset < count:
-                coupon_product_batch = coupon_products[offset:offset + limit]
-                logger.info('Processing batch from index %d to %d', offset, offset + limit)
-                for coupon in coupon_product_batch:
-                    vouchers = coupon.attr.coupon_vouchers.vouchers
-                    enterprise_id = vouchers.first().enterprise_offer.condition.enterprise_customer_uuid
-                    coupon.attr.enterprise_customer_uuid = str(enterprise_id)
-                    coupon.save()
-                    logger.info('Setting enterprise id product attribute for Product %d to value %s',
-                                coupon.id, enterprise_id)
+            # Translate the offset into a primary key, so that batches are selected with keyset pagination.
+            start_after = coupon_products.values_list('id', flat=True)[offset - 1] if offset else None
+            attribute = ProductAttribute.objects.get(
+                product_class__name=COUPON_PRODUCT_CLASS_NAME, code='enterprise_customer_uuid'
+            )
+            progress = BatchProgress('populate_enterprise_id_product_attribute', total=count - offset)
 
+            for coupon_product_batch in iterate_pk_batches(coupon_products.only('id'), limit, start_after):
+                logger.info('Processing batch from index %d to %d', offset, offset + limit)
+                progress.record(*self._update_batch(coupon_product_batch, attribute))
                 offset += limit
 
         except Exception as exc:  # pylint: disable=broad-except
             logger.exception('Command execution failed while executing batch %d,%d\n%s', offset, limit, exc)
+
+    def _update_batch(self, coupons, attribute):
+        """
+        Set the enterprise_customer_uuid attribute of a batch of coupons.
+
+        Only the first voucher of each coupon is loaded, with its offers and conditions, and the attribute values
+        are written with one bulk update and one bulk insert.
+        """
+        coupon_ids = [coupon.id for coupon in coupons]
+        first_vouchers = Voucher.objects.filter(coupon_vouchers=OuterRef('pk')).order_by('-date_created', 'id')
+        first_voucher_ids = dict(
+            CouponVouchers.objects.filter(coupon_id__in=coupon_ids).annotate(
+                first_voucher_id=Subquery(first_vouchers.values('id')[:1])
+            ).values_list('first_voucher_id', 'coupon_id')
+        )
+        vouchers = Voucher.objects.filter(id__in=first_voucher_ids).prefetch_related('offers__condition')
+        enterprise_ids = {}
+        for voucher in vouchers:
+            enterprise_offer = voucher.enterprise_offer
+            if enterprise_offer:
+                enterprise_ids[first_voucher_ids[voucher.id]] = str(enterprise_offer.condition.enterprise_customer_uuid)
+
+        existing_values = {
+            value.product_id: value
+            for value in ProductAttributeValue.objects.filter(attribute=attribute, product_id__in=coupon_ids)
+        }
+        values_to_update = []
+        values_to_create = []
+        failed = 0
+        for coupon_id in coupon_ids:
+            enterprise_id = enterprise_ids.get(coupon_id)
+            if not enterprise_id:
+                logger.error('Could not find an enterprise offer for Product %d', coupon_id)
+                failed += 1
+                continue
+
+            if coupon_id in existing_values:
+                value = existing_values[coupon_id]
+                value.value_text = enterprise_id
+                values_to_update.append(value)
+            else:
+                values_to_create.append(
+                    ProductAttributeValue(attribute=attribute, product_id=coupon_id, value_text=enterprise_id)
+                )
+            logger.info('Setting enterprise id product attribute for Product %d to value %s',
+                        coupon_id, enterprise_id)
+
+        bulk_update_with_history(values_to_update, ProductAttributeValue, ['value_text'])
+        bulk_create_with_history(values_to_create, ProductAttributeValue)
+        return len(values_to_update) + len(values_to_create), failed
@@ -2,6 +2,7 @@
 
 import uuid
 
+import mock
 from django.core.management import call_command
 from oscar.core.loading import get_model
 from testfixtures import LogCapture
@@ -10,6 +11,7 @@ from ecommerce.coupons.tests.mixins import CouponMixin
 from ecommerce.tests.testcases import TestCase
 
 Product = get_model('catalogue', 'Product')
+Voucher = get_model('voucher', 'Voucher')
 LOGGER_NAME = 'ecommerce.extensions.catalogue.management.commands.populate_enterprise_id_product_attribute'
 
 
@@ -107,6 +109,22 @@ class PopulateEnterpriseIDProductAttributeTests(TestCase, CouponMixin):
             coupon = Product.objects.get(id=coupon_ids[idx])
             assert coupon.attr.enterprise_customer_uuid == enterprise_ids[idx]
 
+    def test_populate_enterprise_id_product_attribute_loads_one_voucher_per_coupon(self):
+        """Test that command only loads the first voucher of every coupon."""
+        enterprise_id = str(uuid.uuid4())
+        coupons = [
+            self.create_coupon(title='Test Coupon {}'.format(idx), enterprise_customer=enterprise_id, quantity=5)
+            for idx in range(2)
+        ]
+
+        with mock.patch.object(Voucher, 'from_db', wraps=Voucher.from_db) as voucher_from_db:
+            call_command('populate_enterprise_id_product_attribute')
+
+        assert voucher_from_db.call_count == len(coupons)
+        for coupon in coupons:
+            coupon = Product.objects.get(id=coupon.id)
+            assert coupon.attr.enterprise_customer_uuid == enterprise_id
+
     def test_populate_enterprise_id_product_attribute_with_exception(self):
         """Test that command with exception."""
         self.create_coupon(enterprise_customer=str(uuid.uuid4()))
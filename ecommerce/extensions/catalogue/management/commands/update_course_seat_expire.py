@@ -8,8 +8,10 @@ import dateutil
 import requests
 from django.core.management import BaseCommand, CommandError
 
+from ecommerce.core.constants import SEAT_PRODUCT_CLASS_NAME
 from ecommerce.core.url_utils import get_lms_url
-from ecommerce.courses.models import Course
+from ecommerce.courses.models import Course, Product
+from ecommerce.extensions.catalogue.management.utils import BatchProgress, iterate_pk_batches
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +37,13 @@ class Command(BaseCommand):
             help='Save the data to the database. If this is not set, '
                  'expires date will not be updated'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            dest='batch_size',
+            help='Number of courses whose seats are updated in one batch.'
+        )
 
     def handle(self, *args, **options):
         seats_to_update = ['honor', 'audit', 'no-id-professional', 'professional']
@@ -46,29 +55,57 @@ class Command(BaseCommand):
             logger.error(msg)
             raise CommandError(msg)
 
-        courses = Course.objects.all().order_by('id')
-        logger.info('[%d] courses found for update.', courses.count())
+        courses = Course.objects.all()
+        total_courses = courses.count()
+        logger.info('[%d] courses found for update.', total_courses)
 
-        for course in courses:
-            enrollment_end_date = courses_enrollment_info.get(course.id)
+        progress = BatchProgress('update_course_seat_expire', total=total_courses)
+        for batch in iterate_pk_batches(courses.only('id'), options['batch_size']):
+            course_expires = {}
+            for course in batch:
+                enrollment_end_date = courses_enrollment_info.get(course.id)
 
-            # Only proceed if course enrollment information is present
-            if not enrollment_end_date:
-                logger.error('Enrollment missing for course [%s]', course.id)
-                continue
+                # Only proceed if course enrollment information is present
+                if not enrollment_end_date:
+                    logger.error('Enrollment missing for course [%s]', course.id)
+                    continue
+
+                course_expires[course.id] = dateutil.parser.parse(enrollment_end_date)
 
             if save_to_db:
-                course_seats = course.seat_products.filter(
-                    attributes__name='certificate_type',
-                    attribute_values__value_text__in=seats_to_update
-                )
-                expires = dateutil.parser.parse(enrollment_end_date)
-                course_seats.update(expires=expires)
-                logger.info(
-                    'Updated expiration date for [%s] seats: [%s]',
-                    course.id,
-                    ', '.join([str(seat.id) for seat in course_seats]),
-                )
+                self._update_seats(course_expires, seats_to_update)
+            progress.record(succeeded=len(course_expires), failed=len(batch) - len(course_expires))
+
+    def _update_seats(self, course_expires, seats_to_update):
+        """
+        Set the expiration date of the seats of several courses with a single query.
+
+        Arguments:
+            course_expires (dict): Mapping of course ID to the expiration date of its seats.
+            seats_to_update (list): Certificate types of the seats to be updated.
+        """
+        seats = Product.objects.filter(
+            parent__course_id__in=list(course_expires),
+            parent__structure=Product.PARENT,
+            parent__product_class__name=SEAT_PRODUCT_CLASS_NAME,
+            attributes__name='certificate_type',
+            attribute_values__value_text__in=seats_to_update
+        ).select_related('parent').only('id', 'expires', 'parent__course_id')
+
+        seats_by_course = {}
+        for seat in seats:
+            seat.expires = course_expires[seat.parent.course_id]
+            seats_by_course.setdefault(seat.parent.course_id, []).append(seat)
+
+        Product.objects.bulk_update(
+            [seat for course_seats in seats_by_course.values() for seat in course_seats], ['expires']
+        )
+        for course_id in course_expires:
+            logger.info(
+                'Updated expiration date for [%s] seats: [%s]',
+                course_id,
+                ', '.join([str(seat.id) for seat in seats_by_course.get(course_id, [])]),
+            )
 
     def _get_courses_enrollment_info(self):
         """
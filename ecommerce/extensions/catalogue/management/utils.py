@@ -0,0 +1,71 @@
+"""Helpers for catalogue maintenance commands which update rows in batches."""
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def iterate_pk_batches(queryset, batch_size, start_after=None):
+    """
+    Yield the rows of a queryset in primary key order, batch_size rows at a time.
+
+    Batches are selected with keyset pagination (pk greater than the last pk of the previous batch), so each
+    batch costs the same regardless of how deep into the table it is, and only one batch is held in memory.
+
+    Arguments:
+        queryset (QuerySet): Rows to iterate over. Any ordering is replaced by primary key ordering.
+        batch_size (int): Maximum number of rows in each batch.
+        start_after: Optional primary key; only rows after it are returned.
+
+    Yields:
+        list: Model instances of the next batch.
+    """
+    queryset = queryset.order_by('pk')
+    last_pk = start_after
+    while True:
+        batch_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        batch = list(batch_queryset[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1].pk
+
+
+class BatchProgress:
+    """
+    Tracks the progress and throughput of a batched maintenance command.
+    """
+
+    def __init__(self, name, total=None):
+        self.name = name
+        self.total = total
+        self.processed = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.start = time.time()
+
+    @property
+    def rate(self):
+        elapsed = time.time() - self.start
+        return self.processed / elapsed if elapsed else 0
+
+    def record(self, succeeded=0, failed=0):
+        """ Record the outcome of a batch and log the progress so far. """
+        self.succeeded += succeeded
+        self.failed += failed
+        self.processed += succeeded + failed
+        logger.info(
+            '[%s] Processed %d%s rows (%d succeeded, %d failed) at %.1f rows/s.',
+            self.name,
+            self.processed,
+            '/{}'.format(self.total) if self.total is not None else '',
+            self.succeeded,
+            self.failed,
+            self.rate,
+        )
+
+    def log_summary(self):
+        logger.info(
+            '[%s] Completed in %.1fs. %d succeeded, %d failed.',
+            self.name, time.time() - self.start, self.succeeded, self.failed
+        )
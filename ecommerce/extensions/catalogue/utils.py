@@ -303,3 +303,43 @@ def create_subcategories(model, parent_category_name, categories):
 
     parent_category.numchild = parent_category.numchild + actual_created_count
     parent_category.save()
+
+
+def get_prefetched_attribute_values(product):
+    """
+    Returns the attribute values of a product, including those inherited from its parent, from the values
+    prefetched with `attribute_values__attribute`.
+
+    Arguments:
+        product (Product): Product whose attribute values (and those of its parent) have been prefetched.
+
+    Returns:
+        list: ProductAttributeValue objects, or None if the attribute values were not prefetched.
+    """
+    products = [product, product.parent] if product.is_child else [product]
+    if any('attribute_values' not in getattr(item, '_prefetched_objects_cache', {}) for item in products):
+        return None
+
+    attribute_values = list(product.attribute_values.all())
+    if product.is_child:
+        codes = {attribute_value.attribute.code for attribute_value in attribute_values}
+        attribute_values += [
+            attribute_value for attribute_value in product.parent.attribute_values.all()
+            if attribute_value.attribute.code not in codes
+        ]
+    return attribute_values
+
+
+def prime_product_attributes(product):
+    """
+    Populates `product.attr` from prefetched attribute values, so that reading attributes makes no queries.
+    Products whose attribute values were not prefetched are left untouched.
+    """
+    if product.attr.initialized:
+        return
+
+    attribute_values = get_prefetched_attribute_values(product)
+    if attribute_values is not None:
+        for attribute_value in attribute_values:
+            product.attr.__dict__.setdefault(attribute_value.attribute.code, attribute_value.value)
+        product.attr.initialized = True
@@ -0,0 +1,94 @@
+""" Receipt page data shared by the receipt view and the receipt MFE serializer. """
+
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from edx_django_utils.cache import DEFAULT_REQUEST_CACHE
+
+from ecommerce.core.utils import get_cache_key
+from ecommerce.extensions.catalogue.utils import prime_product_attributes
+
+# Relations read while building a receipt context. Orders fetched with these prefetches are rendered without
+# any further queries for their lines, products, payment sources or bundle attributes.
+RECEIPT_ORDER_SELECT_RELATED = ('basket', 'billing_address', 'user')
+RECEIPT_ORDER_PREFETCH_RELATED = (
+    'basket__basketattribute_set__attribute_type',
+    'lines__product__attribute_values__attribute',
+    'lines__product__course',
+    'lines__product__parent__attribute_values__attribute',
+    'lines__product__product_class',
+    'sources__source_type',
+)
+
+
+class ReceiptContext:
+    """
+    Facts about an order displayed on its receipt.
+
+    Each fact is computed at most once, on first access, from the order's (ideally prefetched) relations. The
+    computations themselves are delegated to ReceiptResponseView, so the HTML receipt and the receipt MFE
+    serializer display the same values. The enterprise learner data of the requesting user is fetched once per
+    request, however many orders are rendered.
+    """
+
+    def __init__(self, view, order, request):
+        self.view = view
+        self.order = order
+        self.request = request
+
+    @cached_property
+    def lines(self):
+        lines = list(self.order.lines.all())
+        for line in lines:
+            if line.product:
+                prime_product_attributes(line.product)
+        return lines
+
+    @cached_property
+    def order_product_ids(self):
+        return ','.join(str(line.product_id) for line in self.lines)
+
+    @cached_property
+    def payment_method(self):
+        return self.view.get_payment_method(self.order)
+
+    @cached_property
+    def contains_credit_seat(self):
+        return self.view.order_contains_credit_seat(self.order)
+
+    @cached_property
+    def contains_executive_education_2u_product(self):
+        return self.view.order_contains_executive_education_2u_product(self.order)
+
+    @cached_property
+    def dashboard_url(self):
+        return self.view.get_order_dashboard_url(self.order)
+
+    @cached_property
+    def product_tracking(self):
+        if settings.AWIN_ADVERTISER_ID and self.lines:
+            return self.view.add_product_tracking(self.order)
+        return None
+
+    @cached_property
+    def enterprise_customer_user(self):
+        cache_key = get_cache_key(resource='receipt_enterprise_customer_user', user_id=self.request.user.id)
+        cached_response = DEFAULT_REQUEST_CACHE.get_cached_response(cache_key)
+        if cached_response.is_found:
+            return cached_response.value
+
+        enterprise_customer_user = self.view.get_metadata_for_enterprise_user(self.request)
+        DEFAULT_REQUEST_CACHE.set(cache_key, enterprise_customer_user)
+        return enterprise_customer_user
+
+    @cached_property
+    def enterprise_customer(self):
+        if not self.enterprise_customer_user:
+            return None
+        return self.enterprise_customer_user['enterprise_customer']
+
+    @cached_property
+    def enterprise_learner_portal_url(self):
+        if not self.enterprise_customer:
+            return None
+        return self.view.get_enterprise_learner_portal_url(self.request, self.enterprise_customer)
@@ -0,0 +1,72 @@
+
+
+import mock
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from oscar.core.loading import get_model
+from oscar.test.factories import create_order
+
+from ecommerce.extensions.checkout.receipt import (
+    RECEIPT_ORDER_PREFETCH_RELATED,
+    RECEIPT_ORDER_SELECT_RELATED,
+    ReceiptContext
+)
+from ecommerce.extensions.checkout.views import ReceiptResponseView
+from ecommerce.tests.testcases import TestCase
+
+Order = get_model('order', 'Order')
+
+
+class ReceiptContextTests(TestCase):
+    """ Tests for ReceiptContext. """
+
+    def setUp(self):
+        super(ReceiptContextTests, self).setUp()
+        self.user = self.create_user()
+        self.request = RequestFactory(SERVER_NAME=self.site.domain).get('/')
+        self.request.user = self.user
+        self.request.site = self.site
+
+    def get_receipt_context(self, order):
+        return ReceiptContext(ReceiptResponseView(), order, self.request)
+
+    @mock.patch('ecommerce.extensions.checkout.views.ReceiptResponseView.get_enterprise_learner_portal_url')
+    @mock.patch('ecommerce.extensions.checkout.views.ReceiptResponseView.get_metadata_for_enterprise_user')
+    def test_enterprise_data_fetched_once_per_request(self, mock_enterprise_user, mock_learner_portal_url):
+        """ Verify the enterprise learner data is shared by the receipt contexts of every order in a request. """
+        mock_enterprise_user.return_value = {'enterprise_customer': {'slug': 'fake-enterprise'}}
+        mock_learner_portal_url.return_value = 'http://fake-learner-portal-url.org'
+        orders = [create_order(site=self.site, user=self.user) for __ in range(2)]
+
+        for order in orders:
+            receipt_context = self.get_receipt_context(order)
+            self.assertEqual(receipt_context.enterprise_learner_portal_url, 'http://fake-learner-portal-url.org')
+            self.assertEqual(receipt_context.enterprise_learner_portal_url, 'http://fake-learner-portal-url.org')
+
+        self.assertEqual(mock_enterprise_user.call_count, 1)
+        self.assertEqual(mock_learner_portal_url.call_count, 2)
+
+    @mock.patch('ecommerce.extensions.checkout.views.ReceiptResponseView.get_metadata_for_enterprise_user')
+    def test_non_enterprise_user(self, mock_enterprise_user):
+        mock_enterprise_user.return_value = None
+        receipt_context = self.get_receipt_context(create_order(site=self.site, user=self.user))
+        self.assertIsNone(receipt_context.enterprise_customer)
+        self.assertIsNone(receipt_context.enterprise_learner_portal_url)
+
+    def test_prefetched_order(self):
+        """ Verify the receipt facts of an order fetched with the receipt prefetches are computed without queries. """
+        order = create_order(site=self.site, user=self.user)
+        order = Order.objects.select_related(*RECEIPT_ORDER_SELECT_RELATED).prefetch_related(
+            *RECEIPT_ORDER_PREFETCH_RELATED
+        ).get(id=order.id)
+        receipt_context = self.get_receipt_context(order)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(
+                receipt_context.order_product_ids, ','.join(str(line.product_id) for line in order.lines.all())
+            )
+            self.assertIsNone(receipt_context.payment_method)
+            self.assertFalse(receipt_context.contains_credit_seat)
+            self.assertFalse(receipt_context.contains_executive_education_2u_product)
+        self.assertEqual(len(queries), 0)
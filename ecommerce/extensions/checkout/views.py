@@ -27,6 +27,11 @@ from ecommerce.enterprise.api import fetch_enterprise_learner_data
 from ecommerce.enterprise.utils import find_active_enterprise_customer_user, has_enterprise_offer
 from ecommerce.extensions.checkout.exceptions import BasketNotFreeError
 from ecommerce.extensions.checkout.mixins import EdxOrderPlacementMixin
+from ecommerce.extensions.checkout.receipt import (
+    RECEIPT_ORDER_PREFETCH_RELATED,
+    RECEIPT_ORDER_SELECT_RELATED,
+    ReceiptContext
+)
 from ecommerce.extensions.checkout.utils import get_receipt_page_url
 from ecommerce.extensions.payment.utils import get_program_uuid
 
@@ -152,6 +157,7 @@ class CheckoutErrorView(TemplateView):
 class ReceiptResponseView(ThankYouView):
     """ Handles behavior needed to display an order receipt. """
     template_name = 'edx/checkout/receipt.html'
+    _receipt_context = None
 
     @method_decorator(csrf_exempt)
     @method_decorator(login_required)
@@ -168,10 +174,10 @@ class ReceiptResponseView(ThankYouView):
                 'order_history_url': request.site.siteconfiguration.build_lms_url('account/settings'),
             }
             return self.render_to_response(context=context, status=404)
-        enterprise_customer_user = self.get_metadata_for_enterprise_user(request)
-        if enterprise_customer_user:
-            enterprise_customer = enterprise_customer_user['enterprise_customer']
-            learner_portal_url = self.get_enterprise_learner_portal_url(request, enterprise_customer)
+        receipt_context = self.get_receipt_context(self.object)
+        if receipt_context.enterprise_customer_user:
+            enterprise_customer = receipt_context.enterprise_customer
+            learner_portal_url = receipt_context.enterprise_learner_portal_url
             if learner_portal_url:
                 self.add_message_if_enterprise_user(request, enterprise_customer, learner_portal_url)
                 response.context_data['order_dashboard_url'] = learner_portal_url
@@ -182,7 +188,8 @@ class ReceiptResponseView(ThankYouView):
     def get_context_data(self, **kwargs):  # pylint: disable=arguments-differ
         context = super(ReceiptResponseView, self).get_context_data(**kwargs)
         order = context[self.context_object_name]
-        context['order_product_ids'] = ','.join(map(str, order.lines.values_list('product_id', flat=True)))
+        receipt_context = self.get_receipt_context(order)
+        context['order_product_ids'] = receipt_context.order_product_ids
         has_enrollment_code_product = False
         if order.basket:
             has_enrollment_code_product = any(
@@ -190,23 +197,29 @@ class ReceiptResponseView(ThankYouView):
             )
 
         context.update({
-            'payment_method': self.get_payment_method(order),
-            'display_credit_messaging': self.order_contains_credit_seat(order),
+            'payment_method': receipt_context.payment_method,
+            'display_credit_messaging': receipt_context.contains_credit_seat,
         })
         context.update({
-            'order_dashboard_url': self.get_order_dashboard_url(order),
+            'order_dashboard_url': receipt_context.dashboard_url,
             'explore_courses_url': get_lms_explore_courses_url(),
             'show_receipt_cta_links': True,
-            'show_get_smarter_msg': self.order_contains_executive_education_2u_product(order),
+            'show_get_smarter_msg': receipt_context.contains_executive_education_2u_product,
             'has_enrollment_code_product': has_enrollment_code_product,
             'disable_back_button': self.request.GET.get('disable_back_button', 0),
         })
         if settings.AWIN_ADVERTISER_ID:
             context.update({
-                'product_tracking': self.add_product_tracking(order),
+                'product_tracking': receipt_context.product_tracking,
             })
         return context
 
+    def get_receipt_context(self, order):
+        """ Returns the ReceiptContext of the given order, building it on first use. """
+        if self._receipt_context is None or self._receipt_context.order is not order:
+            self._receipt_context = ReceiptContext(self, order, self.request)
+        return self._receipt_context
+
     def add_product_tracking(self, order):
         products_for_tracking = []
         for line in order.lines.all():
@@ -233,10 +246,14 @@ class ReceiptResponseView(ThankYouView):
         if not user.is_staff:
             kwargs['user'] = user
 
-        return get_object_or_404(Order, **kwargs)
+        queryset = Order.objects.select_related(*RECEIPT_ORDER_SELECT_RELATED).prefetch_related(
+            *RECEIPT_ORDER_PREFETCH_RELATED
+        )
+        return get_object_or_404(queryset, **kwargs)
 
     def get_payment_method(self, order):
-        source = order.sources.first()
+        # Read the sources through all(), so that prefetched sources are used.
+        source = next(iter(order.sources.all()), None)
         if source:
             if source.card_type:
                 return '{type} {number}'.format(
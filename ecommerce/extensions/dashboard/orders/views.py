@@ -8,6 +8,7 @@ from oscar.apps.dashboard.orders.views import OrderDetailView as CoreOrderDetail
 from oscar.apps.dashboard.orders.views import OrderListView as CoreOrderListView
 from oscar.core.loading import get_model
 
+from ecommerce.extensions.dashboard.pagination import KeysetPaginationMixin
 from ecommerce.extensions.dashboard.views import FilterFieldsMixin
 
 Order = get_model('order', 'Order')
@@ -28,7 +29,7 @@ def queryset_orders_for_user(user):  # pylint: disable=unused-argument
     return Order._default_manager.select_related('user').prefetch_related('lines')  # pylint: disable=protected-access
 
 
-class OrderListView(FilterFieldsMixin, CoreOrderListView):
+class OrderListView(KeysetPaginationMixin, FilterFieldsMixin, CoreOrderListView):
     base_queryset = None
     form = None
 
@@ -57,6 +58,12 @@ class OrderListView(FilterFieldsMixin, CoreOrderListView):
 
         return queryset
 
+    def get_keyset_ordering(self):
+        # Orders sorted by one of the columns of the list are paginated by offset.
+        if self.request.GET.get('sort') in ('number', 'total_incl_tax'):
+            return ()
+        return ('-date_placed', '-id')
+
 
 class OrderDetailView(CoreOrderDetailView):
     line_actions = ('change_line_statuses', 'create_shipping_event', 'create_payment_event', 'create_refund')
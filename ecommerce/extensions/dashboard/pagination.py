@@ -0,0 +1,220 @@
+"""
+Keyset pagination of the dashboard lists of large tables.
+
+Offset pagination makes the database read, and discard, every row preceding the requested page, and counts all the
+rows of the list to number its pages. Keyset pagination instead seeks, through an index on the ordering fields, past
+the last row of the previous page, whose key is carried by the cursor of the next page. Lists that are not filtered
+display the number of rows estimated from the table statistics of the database rather than counting them.
+"""
+
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+from django.utils.translation import ugettext_lazy as _
+
+NEXT = 'next'
+PREVIOUS = 'previous'
+
+
+def estimate_row_count(model, using='default'):
+    """
+    Returns the number of rows in the table of the given model, estimated from the table statistics of MySQL or
+    PostgreSQL, or None if the database keeps no such statistics.
+    """
+    connection = connections[using]
+    if connection.vendor == 'mysql':
+        sql = 'SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s'
+    elif connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples FROM pg_class WHERE relname = %s'
+    else:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [model._meta.db_table])  # pylint: disable=protected-access
+        row = cursor.fetchone()
+
+    # PostgreSQL reports -1 for tables that have never been analyzed.
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class KeysetPage(Sequence):
+    """ A page of a KeysetPaginator, exposing the parts of the Page interface that apply to keyset pagination. """
+
+    def __init__(self, object_list, paginator, has_previous, has_next):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __repr__(self):
+        return '<KeysetPage of {} objects>'.format(len(self.object_list))
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_previous or self._has_next
+
+    @property
+    def next_cursor(self):
+        """ Cursor of the page following this one, or None if this is the last page. """
+        if not (self._has_next and self.object_list):
+            return None
+        return self.paginator.encode_cursor(NEXT, self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        """ Cursor of the page preceding this one, or None if this is the first page. """
+        if not (self._has_previous and self.object_list):
+            return None
+        return self.paginator.encode_cursor(PREVIOUS, self.object_list[0])
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset by the values of its ordering fields.
+
+    Arguments:
+        queryset (QuerySet): Rows to paginate.
+        per_page (int): Number of rows per page.
+        ordering (tuple): Names of the fields to order the rows by, prefixed with '-' for descending order. The
+            fields must identify rows uniquely, so the last one is usually the primary key.
+    """
+
+    is_keyset = True
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        opts = queryset.model._meta  # pylint: disable=protected-access
+        self.fields = [(opts.get_field(name.lstrip('-')), name.startswith('-')) for name in self.ordering]
+
+    @cached_property
+    def estimated_count(self):
+        """
+        Number of rows estimated from the table statistics, or None if the rows are filtered, the database keeps
+        no statistics, or the table is small enough to be counted.
+        """
+        if self.queryset.query.has_filters():
+            return None
+
+        estimate = estimate_row_count(self.queryset.model, using=self.queryset.db)
+        if estimate is None or estimate < settings.DASHBOARD_EXACT_COUNT_THRESHOLD:
+            return None
+        return estimate
+
+    @property
+    def is_count_estimated(self):
+        return self.estimated_count is not None
+
+    @cached_property
+    def count(self):
+        """ Number of rows of all the pages. """
+        if self.is_count_estimated:
+            return self.estimated_count
+        return self.queryset.count()
+
+    def encode_cursor(self, direction, obj):
+        """ Returns the cursor of the page in the given direction from the given row. """
+        key = [field.value_to_string(obj) for field, __ in self.fields]
+        return base64.urlsafe_b64encode(json.dumps([direction] + key).encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, cursor):
+        """
+        Returns the direction and the key of the row encoded in the given cursor.
+
+        Raises:
+            InvalidPage: If the cursor is not a cursor of this paginator.
+        """
+        try:
+            direction, *key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+            if direction not in (NEXT, PREVIOUS) or len(key) != len(self.fields):
+                raise ValueError(cursor)
+            return direction, [field.to_python(value) for (field, __), value in zip(self.fields, key)]
+        except (binascii.Error, TypeError, ValueError, ValidationError):
+            raise InvalidPage(_('The cursor is invalid.'))
+
+    def _get_seek_filter(self, key, backwards):
+        """ Returns the filter selecting the rows after, or before if backwards, the row with the given key. """
+        seek_filter = Q()
+        preceding_fields = {}
+        for (field, descending), value in zip(self.fields, key):
+            lookup = 'lt' if descending != backwards else 'gt'
+            seek_filter |= Q(**preceding_fields, **{'{}__{}'.format(field.name, lookup): value})
+            preceding_fields[field.name] = value
+        return seek_filter
+
+    def page(self, cursor=None):
+        """
+        Returns the page the given cursor points to, or the first page if there is no cursor.
+
+        Raises:
+            InvalidPage: If the cursor is invalid.
+        """
+        direction, key = self.decode_cursor(cursor) if cursor else (NEXT, None)
+        backwards = direction == PREVIOUS
+
+        queryset = self.queryset
+        if key is not None:
+            queryset = queryset.filter(self._get_seek_filter(key, backwards))
+
+        ordering = self.ordering
+        if backwards:
+            ordering = [name[1:] if name.startswith('-') else '-' + name for name in ordering]
+
+        # Fetching one more row than fits on the page tells whether there is a page after it.
+        object_list = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+
+        if backwards:
+            object_list.reverse()
+            return KeysetPage(object_list, self, has_previous=has_more, has_next=True)
+        return KeysetPage(object_list, self, has_previous=key is not None, has_next=has_more)
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin paginating the list with a KeysetPaginator, whenever it is sorted by a keyset ordering.
+    """
+
+    cursor_kwarg = 'cursor'
+    keyset_ordering = ()
+
+    def get_keyset_ordering(self):
+        """ Returns the fields to order and paginate the list by, or an empty tuple to paginate it by offset. """
+        return self.keyset_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = self.get_keyset_ordering()
+        if not ordering:
+            return super(KeysetPaginationMixin, self).paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(queryset, page_size, ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as exc:
+            raise Http404(str(exc))
+        return paginator, page, page.object_list, page.has_other_pages()
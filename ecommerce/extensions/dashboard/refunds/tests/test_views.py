@@ -1,7 +1,9 @@
 
 
+import mock
 from django.urls import reverse
 
+from ecommerce.extensions.dashboard.refunds.views import RefundListView
 from ecommerce.extensions.refund.status import REFUND
 from ecommerce.extensions.refund.tests.factories import RefundFactory
 from ecommerce.tests.testcases import TestCase
@@ -102,6 +104,33 @@ class RefundListViewTests(RefundViewTestMixin, TestCase):
         response = self.client.get('{path}?sort=id&dir=desc'.format(path=self.path))
         self.assert_successful_response(response, list(reversed(refunds)))
 
+    def test_cursor_pagination(self):
+        """ The view should paginate the refunds with the cursors of the pagination links. """
+        refunds = [RefundFactory(), RefundFactory(), RefundFactory()]
+        self.client.login(username=self.user.username, password=self.password)
+
+        with mock.patch.object(RefundListView, 'paginate_by', 2):
+            response = self.client.get('{path}?sort=id&dir=asc'.format(path=self.path))
+            self.assert_successful_response(response, refunds[:2])
+            next_cursor = response.context['page_obj'].next_cursor
+            self.assertContains(response, 'cursor={}'.format(next_cursor))
+
+            response = self.client.get('{path}?sort=id&dir=asc&cursor={cursor}'.format(
+                path=self.path, cursor=next_cursor
+            ))
+            self.assert_successful_response(response, refunds[2:])
+            self.assertIsNone(response.context['page_obj'].next_cursor)
+            previous_cursor = response.context['page_obj'].previous_cursor
+            self.assertContains(response, 'cursor={}'.format(previous_cursor))
+
+            response = self.client.get('{path}?sort=id&dir=asc&cursor={cursor}'.format(
+                path=self.path, cursor=previous_cursor
+            ))
+            self.assert_successful_response(response, refunds[:2])
+
+            response = self.client.get('{path}?cursor=invalid'.format(path=self.path))
+            self.assertEqual(response.status_code, 404)
+
 
 class RefundDetailViewTests(RefundViewTestMixin, TestCase):
     def setUp(self):
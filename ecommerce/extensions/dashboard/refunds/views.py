@@ -4,13 +4,14 @@ from django.views.generic import DetailView, ListView
 from oscar.core.loading import get_class, get_model
 from oscar.views import sort_queryset
 
+from ecommerce.extensions.dashboard.pagination import KeysetPaginationMixin
 from ecommerce.extensions.dashboard.views import FilterFieldsMixin
 
 Refund = get_model('refund', 'Refund')
 RefundSearchForm = get_class('dashboard.refunds.forms', 'RefundSearchForm')
 
 
-class RefundListView(FilterFieldsMixin, ListView):
+class RefundListView(KeysetPaginationMixin, FilterFieldsMixin, ListView):
     """ Dashboard view to list refunds. """
     model = Refund
     context_object_name = 'refunds'
@@ -45,6 +46,13 @@ class RefundListView(FilterFieldsMixin, ListView):
 
         return queryset
 
+    def get_keyset_ordering(self):
+        sort = self.request.GET.get('sort')
+        ordering = ('id',) if sort == 'id' else ('created', 'id')
+        if sort in ('id', 'created') and self.request.GET.get('dir') == 'desc':
+            ordering = tuple('-' + field for field in ordering)
+        return ordering
+
     def get_context_data(self, **kwargs):
         context = super(RefundListView, self).get_context_data(**kwargs)
         context['form'] = self.form
@@ -1,8 +1,13 @@
 
 
+import mock
+from django.core.paginator import InvalidPage
+from django.test import override_settings
 from django.urls import reverse
 from oscar.test.factories import OrderFactory
 
+from ecommerce.core.models import User
+from ecommerce.extensions.dashboard.pagination import KeysetPaginator, estimate_row_count
 from ecommerce.tests.factories import UserFactory
 from ecommerce.tests.testcases import TestCase
 
@@ -33,3 +38,63 @@ class ExtendedIndexViewTests(TestCase):
         order = OrderFactory()
         actual = response.context['average_paid_order_costs']
         self.assertEqual(actual, order.total_incl_tax)
+
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        super(KeysetPaginatorTests, self).setUp()
+        users = UserFactory.create_batch(5)
+        # Users sharing the date they joined are ordered by id.
+        User.objects.filter(id__in=[users[1].id, users[2].id]).update(date_joined=users[1].date_joined)
+        self.queryset = User.objects.filter(id__in=[user.id for user in users])
+        self.users = list(self.queryset.order_by('-date_joined', '-id'))
+
+    def test_pages(self):
+        """ Verify the pages are followed, forwards and backwards, through their cursors. """
+        paginator = KeysetPaginator(self.queryset, 2, ('-date_joined', '-id'))
+
+        with self.assertNumQueries(1):
+            page = paginator.page()
+        self.assertEqual(list(page), self.users[:2])
+        self.assertFalse(page.has_previous())
+        self.assertIsNone(page.previous_cursor)
+
+        page = paginator.page(page.next_cursor)
+        self.assertEqual(list(page), self.users[2:4])
+        self.assertTrue(page.has_previous())
+
+        page = paginator.page(page.next_cursor)
+        self.assertEqual(list(page), self.users[4:])
+        self.assertFalse(page.has_next())
+        self.assertIsNone(page.next_cursor)
+
+        page = paginator.page(page.previous_cursor)
+        self.assertEqual(list(page), self.users[2:4])
+        page = paginator.page(page.previous_cursor)
+        self.assertEqual(list(page), self.users[:2])
+        self.assertFalse(page.has_previous())
+
+    def test_invalid_cursor(self):
+        paginator = KeysetPaginator(self.queryset, 2, ('-date_joined', '-id'))
+        for cursor in ('not-a-cursor', 'WyJuZXh0Il0=', 'WyJuZXh0IiwgIm5vdC1hLWRhdGUiLCAiMSJd'):
+            with self.assertRaises(InvalidPage):
+                paginator.page(cursor)
+
+    def test_count(self):
+        """ Verify only the rows of unfiltered, large, tables are counted from the table statistics. """
+        self.assertIsNone(estimate_row_count(User))
+
+        with mock.patch('ecommerce.extensions.dashboard.pagination.estimate_row_count', return_value=20000):
+            paginator = KeysetPaginator(User.objects.all(), 2, ('-id',))
+            with self.assertNumQueries(0):
+                self.assertEqual(paginator.count, 20000)
+            self.assertTrue(paginator.is_count_estimated)
+
+            paginator = KeysetPaginator(self.queryset, 2, ('-id',))
+            self.assertEqual(paginator.count, 5)
+            self.assertFalse(paginator.is_count_estimated)
+
+            with override_settings(DASHBOARD_EXACT_COUNT_THRESHOLD=50000):
+                paginator = KeysetPaginator(User.objects.all(), 2, ('-id',))
+                self.assertEqual(paginator.count, User.objects.count())
+                self.assertFalse(paginator.is_count_estimated)
@@ -0,0 +1,152 @@
+"""
+Pooled App Store and Google Play API clients, used to validate and refund in-app purchases.
+
+Building these clients reads and parses the service account key, authorizes new OAuth credentials and, for
+Google Play, builds the androidpublisher discovery service. That is slow enough to dominate the latency of mobile
+purchases, so clients are built once per configuration and reused by later requests, along with their persistent
+HTTP connections. The OAuth credentials refresh their access token when it expires.
+
+Clients are pooled per thread, since neither httplib2 connections nor the sandbox state of AppStoreValidator can be
+shared between threads.
+"""
+
+
+import hashlib
+import json
+import threading
+
+import httplib2
+import requests
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from inapppy import AppStoreValidator, InAppPyValidationError, errors
+from oauth2client.service_account import ServiceAccountCredentials
+from requests.exceptions import RequestException
+
+from ecommerce.extensions.iap.api.v1.constants import GOOGLE_PUBLISHER_API_SCOPE
+
+GOOGLE_PLAY_TIMEOUT = 15
+
+_local = threading.local()
+
+
+def _get_pooled_client(key, factory):
+    """ Returns the client of the current thread for the given key, creating it with `factory` if needed. """
+    clients = getattr(_local, 'clients', None)
+    if clients is None:
+        clients = _local.clients = {}
+
+    client = clients.get(key)
+    if client is None:
+        client = clients[key] = factory()
+    return client
+
+
+def clear_client_pool():
+    """ Discards the clients pooled for the current thread. """
+    _local.clients = {}
+
+
+class GooglePlayClient:
+    """
+    Client of the Google Play Developer API, for a single app.
+
+    Arguments:
+        bundle_id (str): Package name of the app.
+        service_account_key (str|dict): Path or parsed contents of the Google service account key.
+        timeout (int): HTTP timeout, in seconds.
+    """
+
+    def __init__(self, bundle_id, service_account_key, timeout=GOOGLE_PLAY_TIMEOUT):
+        self.bundle_id = bundle_id
+        if isinstance(service_account_key, dict):
+            credentials = ServiceAccountCredentials.from_json_keyfile_dict(
+                service_account_key, GOOGLE_PUBLISHER_API_SCOPE
+            )
+        else:
+            credentials = ServiceAccountCredentials.from_json_keyfile_name(
+                service_account_key, GOOGLE_PUBLISHER_API_SCOPE
+            )
+        self.http = credentials.authorize(httplib2.Http(timeout=timeout))
+        self.service = build('androidpublisher', 'v3', http=self.http)
+
+    def get_product_purchase(self, purchase_token, product_sku):
+        """
+        Returns the Google Play purchase of a one-time product.
+
+        Raises:
+            GoogleError: If Google rejected the purchase token or product.
+        """
+        try:
+            return self.service.purchases().products().get(
+                packageName=self.bundle_id, productId=product_sku, token=purchase_token
+            ).execute()
+        except HttpError as exc:
+            if exc.resp.status == 400:
+                raise errors.GoogleError(exc.resp.reason, repr(exc))
+            raise
+
+    def list_voided_purchases(self, start_time, token=None):
+        """
+        Returns a page of the purchases voided since the given time, in milliseconds since the epoch.
+
+        The token of the next page, if any, is in the `tokenPagination` of the returned page.
+        """
+        parameters = {'packageName': self.bundle_id, 'startTime': start_time}
+        if token:
+            parameters['token'] = token
+        return self.service.purchases().voidedpurchases().list(**parameters).execute()
+
+
+class PooledAppStoreValidator(AppStoreValidator):
+    """
+    AppStoreValidator reusing a single HTTP session, and so its connections, for all its receipts.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(PooledAppStoreValidator, self).__init__(*args, **kwargs)
+        self.session = requests.Session()
+
+    def post_json(self, request_json):
+        self._change_url_by_sandbox()
+
+        try:
+            return self.session.post(self.url, json=request_json, timeout=self.http_timeout).json()
+        except (ValueError, RequestException):
+            raise InAppPyValidationError('HTTP error')
+
+    def validate(self, receipt, shared_secret=None, exclude_old_transactions=False):
+        # Retrying a sandbox receipt switches the validator to the sandbox, so every receipt must start with
+        # the production environment again.
+        self.sandbox = False
+        return super(PooledAppStoreValidator, self).validate(
+            receipt, shared_secret=shared_secret, exclude_old_transactions=exclude_old_transactions
+        )
+
+
+def get_google_play_client(configuration, timeout=GOOGLE_PLAY_TIMEOUT):
+    """
+    Returns the pooled GooglePlayClient for the given Android IAP processor configuration.
+    """
+    bundle_id = configuration.get('google_bundle_id')
+    service_account_key = configuration.get('google_service_account_key_file')
+    key_fingerprint = hashlib.sha256(json.dumps(service_account_key, sort_keys=True).encode('utf-8')).hexdigest()
+
+    return _get_pooled_client(
+        ('google-play', bundle_id, key_fingerprint, timeout),
+        lambda: GooglePlayClient(bundle_id, service_account_key, timeout=timeout),
+    )
+
+
+def get_app_store_validator(configuration):
+    """
+    Returns the pooled App Store receipt validator for the given iOS IAP processor configuration.
+    """
+    bundle_id = configuration.get('ios_bundle_id')
+
+    # auto_retry_wrong_env_request = True automatically queries sandbox endpoint if
+    # validation fails on production endpoint
+    return _get_pooled_client(
+        ('app-store', bundle_id),
+        lambda: PooledAppStoreValidator(bundle_id, auto_retry_wrong_env_request=True),
+    )
@@ -33,6 +33,7 @@ LOGGER_EXECUTE_REDUNDANT_PAYMENT = "Execute payment failed for user [%s] and bas
 LOGGER_EXECUTE_STARTED = "Beginning Payment execution for user [%s], basket [%s], processor [%s]"
 LOGGER_EXECUTE_SUCCESSFUL = "Payment execution successful for user [%s], basket [%s], processor [%s]"
 LOGGER_PAYMENT_FAILED_FOR_BASKET = "Attempts to handle payment for basket [%s] failed with error [%s]."
+LOGGER_REFUND_ALREADY_PROCESSED = "Refund already processed. OrderId: [%s] Processor: [%s]"
 LOGGER_REFUND_SUCCESSFUL = "Refund successful. OrderId: [%s] Processor: [%s] "
 LOGGER_STARTING_PAYMENT_FLOW = "Starting payment flow for user [%s] for products [%s]."
 NO_PRODUCT_AVAILABLE = "No product is available to buy."
@@ -1,6 +1,10 @@
 import logging
+import time
 
-from inapppy import GooglePlayVerifier, errors
+from edx_django_utils import monitoring as monitoring_utils
+from inapppy import errors
+
+from ecommerce.extensions.iap.api.v1.clients import get_google_play_client
 
 logger = logging.getLogger(__name__)
 
@@ -13,16 +17,14 @@ class GooglePlayValidator:
         """
         purchase_token = receipt['purchaseToken']
         product_sku = receipt['productId']
-        verifier = GooglePlayVerifier(
-            configuration.get('google_bundle_id'),
-            configuration.get('google_service_account_key_file'),
-        )
+        client = get_google_play_client(configuration)
+        start = time.perf_counter()
         try:
-            response = verifier.verify_with_result(purchase_token, product_sku, is_subscription=False)
+            response = client.get_product_purchase(purchase_token, product_sku)
             result = {
-                'raw_response': response.raw_response,
-                'is_canceled': response.is_canceled,
-                'is_expired': response.is_expired
+                'raw_response': response,
+                'is_canceled': int(response.get('purchaseState', 1)) != 0,
+                'is_expired': False
             }
         except errors.GoogleError as exc:
             logger.error('Purchase validation failed %s', exc)
@@ -30,4 +32,8 @@ class GooglePlayValidator:
                 'error': exc.raw_response,
                 'message': exc.message
             }
+        finally:
+            monitoring_utils.set_custom_attribute(
+                'iap_google_validation_time_ms', round((time.perf_counter() - start) * 1000, 2)
+            )
         return result
@@ -1,6 +1,10 @@
 import logging
+import time
 
-from inapppy import AppStoreValidator, InAppPyValidationError
+from edx_django_utils import monitoring as monitoring_utils
+from inapppy import InAppPyValidationError
+
+from ecommerce.extensions.iap.api.v1.clients import get_app_store_validator
 
 logger = logging.getLogger(__name__)
 
@@ -11,11 +15,8 @@ class IOSValidator:
         Accepts receipt, validates that the purchase has already been completed in
         Apple for the mentioned productId.
         """
-        bundle_id = configuration.get('ios_bundle_id')
-        # auto_retry_wrong_env_request = True automatically queries sandbox endpoint if
-        # validation fails on production endpoint
-        validator = AppStoreValidator(bundle_id, auto_retry_wrong_env_request=True)
-
+        validator = get_app_store_validator(configuration)
+        start = time.perf_counter()
         try:
             validation_result = validator.validate(
                 receipt['purchaseToken'],
@@ -25,5 +26,9 @@ class IOSValidator:
             # handle validation error
             logger.error('Purchase validation failed %s', ex.raw_response)
             validation_result = {'error': ex.raw_response}
+        finally:
+            monitoring_utils.set_custom_attribute(
+                'iap_ios_validation_time_ms', round((time.perf_counter() - start) * 1000, 2)
+            )
 
         return validation_result
@@ -0,0 +1,92 @@
+import mock
+from googleapiclient.errors import HttpError
+from inapppy import errors
+
+from ecommerce.extensions.iap.api.v1.clients import (
+    PooledAppStoreValidator,
+    clear_client_pool,
+    get_app_store_validator,
+    get_google_play_client
+)
+from ecommerce.tests.testcases import TestCase
+
+GOOGLE_CONFIGURATION = {
+    'google_bundle_id': 'test.google.bundle.id',
+    'google_service_account_key_file': {'client_email': 'test@example.com', 'private_key': 'test-key'},
+}
+IOS_CONFIGURATION = {
+    'ios_bundle_id': 'test.ios.bundle.id',
+}
+
+
+class GooglePlayClientTests(TestCase):
+    """ Tests for the pooled Google Play clients. """
+
+    def setUp(self):
+        super(GooglePlayClientTests, self).setUp()
+        clear_client_pool()
+        self.addCleanup(clear_client_pool)
+
+        credentials_patcher = mock.patch(
+            'ecommerce.extensions.iap.api.v1.clients.ServiceAccountCredentials.from_json_keyfile_dict'
+        )
+        build_patcher = mock.patch('ecommerce.extensions.iap.api.v1.clients.build')
+        self.mock_credentials = credentials_patcher.start()
+        self.mock_build = build_patcher.start()
+        self.addCleanup(credentials_patcher.stop)
+        self.addCleanup(build_patcher.stop)
+
+    def test_client_reused(self):
+        """ Verify clients are built once per configuration. """
+        client = get_google_play_client(GOOGLE_CONFIGURATION)
+
+        self.assertIs(get_google_play_client(GOOGLE_CONFIGURATION), client)
+        self.assertEqual(self.mock_credentials.call_count, 1)
+        self.assertEqual(self.mock_build.call_count, 1)
+
+        other_configuration = dict(GOOGLE_CONFIGURATION, google_bundle_id='other.google.bundle.id')
+        self.assertIsNot(get_google_play_client(other_configuration), client)
+        self.assertIsNot(get_google_play_client(GOOGLE_CONFIGURATION, timeout=30), client)
+
+    def test_get_product_purchase_rejected(self):
+        """ Verify purchases rejected by Google raise a GoogleError. """
+        self.mock_build.return_value.purchases.return_value.products.return_value.get.return_value.execute\
+            .side_effect = HttpError(mock.Mock(status=400, reason='Invalid token'), b'')
+
+        with self.assertRaises(errors.GoogleError):
+            get_google_play_client(GOOGLE_CONFIGURATION).get_product_purchase('token', 'sku')
+
+
+class AppStoreValidatorTests(TestCase):
+    """ Tests for the pooled App Store receipt validators. """
+
+    def setUp(self):
+        super(AppStoreValidatorTests, self).setUp()
+        clear_client_pool()
+        self.addCleanup(clear_client_pool)
+
+    def test_validator_reused(self):
+        validator = get_app_store_validator(IOS_CONFIGURATION)
+
+        self.assertIsInstance(validator, PooledAppStoreValidator)
+        self.assertIs(get_app_store_validator(IOS_CONFIGURATION), validator)
+
+    def test_validate_starts_in_production(self):
+        """ Verify a sandbox receipt does not switch the validator to the sandbox for the next receipts. """
+        validator = get_app_store_validator(IOS_CONFIGURATION)
+        urls = []
+
+        def post(url, **kwargs):  # pylint: disable=unused-argument
+            urls.append(url)
+            status = 21007 if len(urls) == 1 else 0
+            return mock.Mock(json=mock.Mock(return_value={'status': status}))
+
+        with mock.patch.object(validator.session, 'post', side_effect=post):
+            validator.validate('sandbox-receipt')
+            validator.validate('production-receipt')
+
+        self.assertEqual(urls, [
+            'https://buy.itunes.apple.com/verifyReceipt',
+            'https://sandbox.itunes.apple.com/verifyReceipt',
+            'https://buy.itunes.apple.com/verifyReceipt',
+        ])
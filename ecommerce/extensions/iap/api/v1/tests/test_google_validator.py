@@ -9,26 +9,17 @@ VALID_PURCHASE_TOKEN = "test.purchase.token"
 INVALID_PURCHASE_TOKEN = "test.purchase.invalid_token"
 
 
-class GooglePlayVerifierResponse:
-    """ Class to create response object """
-
-    def __init__(self):
-        self.raw_response = '{}'
-        self.is_canceled = False
-        self.is_expired = False
-
-
-class GooglePlayVerifierProxy:
-    """ Proxy for inapppy.GooglePlayVerifier """
+class GooglePlayClientProxy:
+    """ Proxy for ecommerce.extensions.iap.api.v1.clients.GooglePlayClient """
 
     def __init__(self):
         pass
 
-    def verify_with_result(self, purchase_token, product_sku, is_subscription=False):  # pylint: disable=unused-argument
+    def get_product_purchase(self, purchase_token, product_sku):  # pylint: disable=unused-argument
         if purchase_token == INVALID_PURCHASE_TOKEN:
             raise errors.GoogleError()
 
-        return GooglePlayVerifierResponse()
+        return {'purchaseState': 0}
 
 
 class GoogleValidatorTests(TestCase):
@@ -48,7 +39,7 @@ class GoogleValidatorTests(TestCase):
         "google_service_account_key_file": "test.key.file"
     }
     VALIDATED_RESPONSE = {
-        "raw_response": "{}",
+        "raw_response": {"purchaseState": 0},
         "is_canceled": False,
         "is_expired": False,
     }
@@ -56,15 +47,22 @@ class GoogleValidatorTests(TestCase):
     def setUp(self):
         self.validator = GooglePlayValidator()
 
-    @mock.patch('ecommerce.extensions.iap.api.v1.google_validator.GooglePlayVerifier')
-    def test_validate_successful(self, mock_google_verifier):
-        mock_google_verifier.return_value = GooglePlayVerifierProxy()
+    @mock.patch('ecommerce.extensions.iap.api.v1.google_validator.get_google_play_client')
+    def test_validate_successful(self, mock_google_play_client):
+        mock_google_play_client.return_value = GooglePlayClientProxy()
         response = self.validator.validate(self.VALID_RECEIPT, self.CONFIGURATION)
         self.assertEqual(response, self.VALIDATED_RESPONSE)
+        mock_google_play_client.assert_called_once_with(self.CONFIGURATION)
+
+    @mock.patch('ecommerce.extensions.iap.api.v1.google_validator.get_google_play_client')
+    def test_validate_canceled(self, mock_google_play_client):
+        mock_google_play_client.return_value.get_product_purchase.return_value = {'purchaseState': 1}
+        response = self.validator.validate(self.VALID_RECEIPT, self.CONFIGURATION)
+        self.assertTrue(response['is_canceled'])
 
-    @mock.patch('ecommerce.extensions.iap.api.v1.google_validator.GooglePlayVerifier')
-    def test_validate_failure(self, mock_google_verifier):
-        mock_google_verifier.return_value = GooglePlayVerifierProxy()
+    @mock.patch('ecommerce.extensions.iap.api.v1.google_validator.get_google_play_client')
+    def test_validate_failure(self, mock_google_play_client):
+        mock_google_play_client.return_value = GooglePlayClientProxy()
         logger_name = 'ecommerce.extensions.iap.api.v1.google_validator'
         with LogCapture(logger_name) as google_validator_log_capture:
             response = self.validator.validate(self.INVALID_RECEIPT, self.CONFIGURATION)
@@ -37,13 +37,13 @@ class IOSValidatorTests(TestCase):
     def setUp(self):
         self.validator = IOSValidator()
 
-    @mock.patch('ecommerce.extensions.iap.api.v1.ios_validator.AppStoreValidator')
+    @mock.patch('ecommerce.extensions.iap.api.v1.ios_validator.get_app_store_validator')
     def test_validate_successful(self, mock_appstore_validator):
         mock_appstore_validator.return_value = AppStoreValidatorProxy()
         response = self.validator.validate(self.VALID_RECEIPT, {})
         self.assertEqual(response, SAMPLE_VALID_RESPONSE)
 
-    @mock.patch('ecommerce.extensions.iap.api.v1.ios_validator.AppStoreValidator')
+    @mock.patch('ecommerce.extensions.iap.api.v1.ios_validator.get_app_store_validator')
     def test_validate_failed(self, mock_appstore_validator):
         mock_appstore_validator.return_value = AppStoreValidatorProxy()
         logger_name = 'ecommerce.extensions.iap.api.v1.ios_validator'
@@ -10,7 +10,6 @@ import pytz
 from django.conf import settings
 from django.test import override_settings
 from django.urls import reverse
-from oauth2client.service_account import ServiceAccountCredentials
 from oscar.apps.order.exceptions import UnableToPlaceOrder
 from oscar.apps.payment.exceptions import GatewayError, PaymentError
 from oscar.core.loading import get_class, get_model
@@ -52,6 +51,7 @@ from ecommerce.extensions.iap.api.v1.constants import (
     LOGGER_EXECUTE_STARTED,
     LOGGER_EXECUTE_SUCCESSFUL,
     LOGGER_PAYMENT_FAILED_FOR_BASKET,
+    LOGGER_REFUND_ALREADY_PROCESSED,
     LOGGER_REFUND_SUCCESSFUL,
     LOGGER_STARTING_PAYMENT_FLOW,
     NO_PRODUCT_AVAILABLE,
@@ -62,6 +62,7 @@ from ecommerce.extensions.iap.api.v1.google_validator import GooglePlayValidator
 from ecommerce.extensions.iap.api.v1.ios_validator import IOSValidator
 from ecommerce.extensions.iap.api.v1.serializers import MobileOrderSerializer
 from ecommerce.extensions.iap.api.v1.views import AndroidRefundView, MobileCoursePurchaseExecutionView
+from ecommerce.extensions.iap.models import IAPProcessorConfiguration
 from ecommerce.extensions.iap.processors.android_iap import AndroidIAP
 from ecommerce.extensions.iap.processors.ios_iap import IOSIAP
 from ecommerce.extensions.order.utils import UserAlreadyPlacedOrder
@@ -831,14 +832,10 @@ class AndroidRefundTests(BaseRefundTests):
     def test_transaction_id_not_found(self):
         """ If the transaction id doesn't match, no refund IDs should be created. """
 
-        with mock.patch.object(ServiceAccountCredentials, 'from_json_keyfile_dict') as mock_credential_method, \
-                mock.patch('ecommerce.extensions.iap.api.v1.views.build') as mock_build, \
-                LogCapture(self.logger_name) as logger, \
-                mock.patch('httplib2.Http'):
+        with mock.patch('ecommerce.extensions.iap.api.v1.views.get_google_play_client') as mock_client, \
+                LogCapture(self.logger_name) as logger:
 
-            mock_credential_method.return_value.authorize.return_value = None
-            mock_build.return_value.purchases.return_value.voidedpurchases.return_value\
-                .list.return_value.execute.return_value = self.mock_processor_response
+            mock_client.return_value.list_voided_purchases.return_value = self.mock_processor_response
             self.check_record_not_found_log(logger, ERROR_TRANSACTION_NOT_FOUND_FOR_REFUND)
 
     def test_valid_orders(self):
@@ -868,14 +865,10 @@ class AndroidRefundTests(BaseRefundTests):
                                                         response=json.dumps({'state': 'approved'})))
 
         with mock.patch.object(Refund, '_revoke_lines', side_effect=BaseRefundTests._revoke_lines, autospec=True), \
-             mock.patch.object(ServiceAccountCredentials, 'from_json_keyfile_dict') as mock_credential_method, \
-                mock.patch('ecommerce.extensions.iap.api.v1.views.build') as mock_build, \
-                mock.patch('httplib2.Http'), \
+                mock.patch('ecommerce.extensions.iap.api.v1.views.get_google_play_client') as mock_client, \
                 LogCapture(self.logger_name) as logger:
 
-            mock_credential_method.return_value.authorize.return_value = None
-            mock_build.return_value.purchases.return_value.voidedpurchases.return_value.\
-                list.return_value.execute.return_value = self.mock_processor_response
+            mock_client.return_value.list_voided_purchases.return_value = self.mock_processor_response
 
             response = self.client.get(self.path)
             self.assert_ok_response(response)
@@ -899,9 +892,82 @@ class AndroidRefundTests(BaseRefundTests):
                 self.assert_refund_and_order(refunds[index], orders[index], baskets[index],
                                              payment_processor_responses[index], refund_responses[index])
 
-            # A second call should result in no additional refunds being created
+            # A second call should skip the refund already processed, and create no additional refunds
             with LogCapture(self.logger_name) as logger:
-                self.check_record_not_found_log(logger, ERROR_ORDER_NOT_FOUND_FOR_REFUND)
+                response = self.client.get(self.path)
+                self.assert_ok_response(response)
+                logger.check(
+                    (
+                        self.logger_name,
+                        'INFO',
+                        LOGGER_REFUND_ALREADY_PROCESSED % (self.order_id_one, self.processor_name)
+                    ),
+                    (
+                        self.logger_name,
+                        'ERROR',
+                        ERROR_ORDER_NOT_FOUND_FOR_REFUND % (self.order_id_two, self.processor_name)
+                    )
+                )
+            self.assertEqual(Refund.objects.count(), 1)
+
+    def test_watermark(self):
+        """ Each run should only fetch the refunds voided since the latest refund of the previous run. """
+        refunds_age = IAPProcessorConfiguration.get_solo().android_refunds_age_in_days
+        oldest_start_time = round(
+            (datetime.datetime.now() - datetime.timedelta(days=refunds_age)).timestamp() * 1000
+        )
+        latest_voided_time = oldest_start_time + 1000
+        voided_purchase = dict(self.mock_processor_response['voidedPurchases'][0], voidedTimeMillis=latest_voided_time)
+
+        with mock.patch('ecommerce.extensions.iap.api.v1.views.get_google_play_client') as mock_client:
+            mock_list = mock_client.return_value.list_voided_purchases
+            mock_list.return_value = {'voidedPurchases': [voided_purchase]}
+            self.client.get(self.path)
+            self.assertGreaterEqual(mock_list.call_args[0][0], oldest_start_time)
+            self.assertLess(mock_list.call_args[0][0], latest_voided_time)
+
+            mock_list.return_value = {}
+            self.client.get(self.path)
+            mock_list.assert_called_with(latest_voided_time, token=None)
+
+        self.assertEqual(IAPProcessorConfiguration.get_solo().android_refunds_watermark, latest_voided_time)
+
+    def test_watermark_kept_before_incomplete_refunds(self):
+        """ Refunds that could not be completed should be fetched again by the next run. """
+        order = self.create_order()
+        PaymentProcessorResponse.objects.create(basket=order.basket, transaction_id=self.order_id_one,
+                                                processor_name=AndroidRefundView.processor_name,
+                                                response=json.dumps({'state': 'approved'}))
+        voided_purchases = self.mock_processor_response['voidedPurchases']
+
+        def _revoke_lines(refund):
+            refund.set_status(REFUND.REVOCATION_ERROR)
+
+        with mock.patch.object(Refund, '_revoke_lines', side_effect=_revoke_lines, autospec=True), \
+                mock.patch('ecommerce.extensions.iap.api.v1.views.get_google_play_client') as mock_client:
+            mock_client.return_value.list_voided_purchases.return_value = self.mock_processor_response
+            self.client.get(self.path)
+
+        self.assertEqual(
+            IAPProcessorConfiguration.get_solo().android_refunds_watermark,
+            int(voided_purchases[0]['voidedTimeMillis'])
+        )
+
+    def test_pagination(self):
+        """ Every page of voided purchases should be processed, with one lookup of the responses per page. """
+        first_page = {
+            'voidedPurchases': self.mock_processor_response['voidedPurchases'][:1],
+            'tokenPagination': {'nextPageToken': 'next-page'},
+        }
+        second_page = {'voidedPurchases': self.mock_processor_response['voidedPurchases'][1:]}
+
+        with mock.patch('ecommerce.extensions.iap.api.v1.views.get_google_play_client') as mock_client, \
+                LogCapture(self.logger_name) as logger:
+            mock_list = mock_client.return_value.list_voided_purchases
+            mock_list.side_effect = [first_page, second_page]
+            self.check_record_not_found_log(logger, ERROR_TRANSACTION_NOT_FOUND_FOR_REFUND)
+
+        self.assertEqual(mock_list.call_args_list[1][1], {'token': 'next-page'})
 
 
 class IOSRefundTests(BaseRefundTests):
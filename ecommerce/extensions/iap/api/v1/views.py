@@ -3,7 +3,6 @@ import logging
 import time
 
 import app_store_notifications_v2_validator as asn2
-import httplib2
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
@@ -13,8 +12,6 @@ from django.utils.html import escape
 from django.utils.translation import ugettext as _
 from edx_django_utils import monitoring as monitoring_utils
 from edx_rest_framework_extensions.permissions import LoginRedirectIfUnauthenticated
-from googleapiclient.discovery import build
-from oauth2client.service_account import ServiceAccountCredentials
 from oscar.apps.basket.views import *  # pylint: disable=wildcard-import, unused-wildcard-import
 from oscar.apps.payment.exceptions import GatewayError, PaymentError
 from oscar.core.loading import get_class, get_model
@@ -33,6 +30,7 @@ from ecommerce.extensions.basket.utils import (
 )
 from ecommerce.extensions.basket.views import BasketLogicMixin
 from ecommerce.extensions.checkout.mixins import EdxOrderPlacementMixin
+from ecommerce.extensions.iap.api.v1.clients import get_google_play_client
 from ecommerce.extensions.iap.api.v1.constants import (
     COURSE_ADDED_TO_BASKET,
     COURSE_ALREADY_PAID_ON_DEVICE,
@@ -46,7 +44,6 @@ from ecommerce.extensions.iap.api.v1.constants import (
     ERROR_ORDER_NOT_FOUND_FOR_REFUND,
     ERROR_REFUND_NOT_COMPLETED,
     ERROR_TRANSACTION_NOT_FOUND_FOR_REFUND,
-    GOOGLE_PUBLISHER_API_SCOPE,
     IGNORE_NON_REFUND_NOTIFICATION_FROM_APPLE,
     LOGGER_BASKET_ALREADY_PURCHASED,
     LOGGER_BASKET_CREATED,
@@ -61,6 +58,7 @@ from ecommerce.extensions.iap.api.v1.constants import (
     LOGGER_EXECUTE_STARTED,
     LOGGER_EXECUTE_SUCCESSFUL,
     LOGGER_PAYMENT_FAILED_FOR_BASKET,
+    LOGGER_REFUND_ALREADY_PROCESSED,
     LOGGER_REFUND_SUCCESSFUL,
     LOGGER_STARTING_PAYMENT_FLOW,
     NO_PRODUCT_AVAILABLE,
@@ -260,11 +258,21 @@ class BaseRefund(APIView):
     """ Base refund class for iOS and Android refunds """
     authentication_classes = ()
 
-    def refund(self, transaction_id, processor_response):
-        """ Get a transaction id and create a refund against that transaction. """
+    def __init__(self, **kwargs):
+        super(BaseRefund, self).__init__(**kwargs)
+        # Transaction ids of the refunds that could not be completed, and should be retried.
+        self.incomplete_refunds = set()
+
+    def refund(self, transaction_id, processor_response, original_purchase=None):
+        """
+        Get a transaction id and create a refund against that transaction.
+
+        Callers that have already looked up the original purchase response of the transaction can pass it as
+        `original_purchase`.
+        """
         is_refunded = False
-        original_purchase = PaymentProcessorResponse.objects.filter(transaction_id=transaction_id,
-                                                                    processor_name=self.processor_name).first()
+        if original_purchase is None:
+            original_purchase = PaymentProcessorResponse.get_for_transaction(self.processor_name, transaction_id)
         if not original_purchase:
             logger.error(ERROR_TRANSACTION_NOT_FOUND_FOR_REFUND, transaction_id, self.processor_name)
             return is_refunded
@@ -294,6 +302,7 @@ class BaseRefund(APIView):
                 is_refunded = True
 
         except RefundCompletionException:
+            self.incomplete_refunds.add(transaction_id)
             logger.exception(ERROR_REFUND_NOT_COMPLETED, user.username, course_key, self.processor_name)
 
         return is_refunded
@@ -308,35 +317,80 @@ class AndroidRefundView(BaseRefund):
 
     def get(self, request):
         """
-        Get all refunds in last 3 days from voidedpurchases api
-        and call refund method on every refund.
+        Get the refunds voided since the last run from the voidedpurchases api,
+        and call refund method on every new refund.
+
+        The voided time of the latest refund processed is stored as a watermark, so that each run only fetches
+        the refunds voided since. Refunds older than `android_refunds_age_in_days` are never fetched. Refunds
+        that could not be completed are fetched again by the next run.
         """
 
         partner_short_code = request.site.siteconfiguration.partner.short_code
         configuration = settings.PAYMENT_PROCESSOR_CONFIG[partner_short_code.lower()][self.processor_name.lower()]
-        service = self._get_service(configuration)
-
-        refunds_age = IAPProcessorConfiguration.get_solo().android_refunds_age_in_days
-        refunds_time = datetime.datetime.now() - datetime.timedelta(days=refunds_age)
-        refunds_time_in_ms = round(refunds_time.timestamp() * 1000)
-        refund_list = service.purchases().voidedpurchases()
-        refunds = refund_list.list(packageName=configuration['google_bundle_id'],
-                                   startTime=refunds_time_in_ms).execute()
-        for refund in refunds.get('voidedPurchases', []):
-            self.refund(refund['orderId'], refund)
+        client = get_google_play_client(configuration, timeout=self.timeout)
+
+        iap_configuration = IAPProcessorConfiguration.get_solo()
+        refunds_time = datetime.datetime.now() - datetime.timedelta(days=iap_configuration.android_refunds_age_in_days)
+        start_time = round(refunds_time.timestamp() * 1000)
+        if iap_configuration.android_refunds_watermark:
+            start_time = max(start_time, iap_configuration.android_refunds_watermark)
+
+        voided_times = []
+        retry_times = []
+        token = None
+        start = time.perf_counter()
+        while True:
+            page = client.list_voided_purchases(start_time, token=token)
+            refunds = page.get('voidedPurchases', [])
+            self.refund_page(refunds)
+
+            for refund in refunds:
+                voided_time = int(refund['voidedTimeMillis'])
+                voided_times.append(voided_time)
+                if refund['orderId'] in self.incomplete_refunds:
+                    retry_times.append(voided_time)
+
+            token = page.get('tokenPagination', {}).get('nextPageToken')
+            if not token:
+                break
+
+        monitoring_utils.set_custom_attribute(
+            'iap_google_voided_purchases_time_ms', round((time.perf_counter() - start) * 1000, 2)
+        )
+        monitoring_utils.set_custom_attribute('iap_google_voided_purchases_count', len(voided_times))
+
+        # The voidedpurchases api includes purchases voided at the start time, so the watermark is the voided
+        # time of the latest refund, or of the earliest refund to retry.
+        watermark = min(retry_times) if retry_times else max(voided_times, default=None)
+        if watermark and watermark != iap_configuration.android_refunds_watermark:
+            iap_configuration.android_refunds_watermark = watermark
+            iap_configuration.save()
 
         return Response()
 
-    def _get_service(self, configuration):
-        """ Create a service to interact with google api. """
-        play_console_credentials = configuration.get('google_service_account_key_file')
-        credentials = ServiceAccountCredentials.from_json_keyfile_dict(play_console_credentials,
-                                                                       GOOGLE_PUBLISHER_API_SCOPE)
-        http = httplib2.Http(timeout=self.timeout)
-        http = credentials.authorize(http)
+    def refund_page(self, refunds):
+        """
+        Refund a page of voided purchases.
 
-        service = build("androidpublisher", "v3", http=http)
-        return service
+        The original purchase responses of the whole page are looked up in a single query. Refunds for which the
+        same voided purchase was already recorded, by an earlier run, are skipped.
+        """
+        responses = PaymentProcessorResponse.objects.filter(
+            processor_name=self.processor_name,
+            transaction_id__in=[refund['orderId'] for refund in refunds],
+        ).order_by('id')
+        responses_by_transaction = {}
+        for response in responses:
+            responses_by_transaction.setdefault(response.transaction_id, []).append(response)
+
+        for refund in refunds:
+            transaction_responses = responses_by_transaction.get(refund['orderId'], [])
+            if any(response.response == refund for response in transaction_responses[1:]):
+                logger.info(LOGGER_REFUND_ALREADY_PROCESSED, refund['orderId'], self.processor_name)
+                continue
+
+            original_purchase = transaction_responses[0] if transaction_responses else None
+            self.refund(refund['orderId'], refund, original_purchase=original_purchase)
 
 
 class IOSRefundView(BaseRefund):
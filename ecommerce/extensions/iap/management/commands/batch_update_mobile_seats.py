@@ -10,12 +10,15 @@ from django.core.management import BaseCommand
 from django.db.models import Q
 from django.utils.timezone import now, timedelta
 from oscar.core.loading import get_class
+from oscar.core.utils import slugify
+from simple_history.utils import bulk_create_with_history
 
 from ecommerce.core.constants import SEAT_PRODUCT_CLASS_NAME
 from ecommerce.courses.constants import CertificateType
 from ecommerce.courses.models import Course
+from ecommerce.courses.publishers import BatchLMSPublisher
 from ecommerce.courses.utils import get_course_detail, get_course_run_detail
-from ecommerce.extensions.catalogue.models import Product
+from ecommerce.extensions.catalogue.models import Product, ProductAttributeValue
 from ecommerce.extensions.iap.constants import ANDROID_SKU_PREFIX, IOS_SKU_PREFIX
 from ecommerce.extensions.iap.models import IAPProcessorConfiguration
 from ecommerce.extensions.partner.models import StockRecord
@@ -23,6 +26,9 @@ from ecommerce.extensions.partner.models import StockRecord
 Dispatcher = get_class('communication.utils', 'Dispatcher')
 logger = logging.getLogger(__name__)
 
+MOBILE_SKU_PREFIXES = (ANDROID_SKU_PREFIX, IOS_SKU_PREFIX)
+MOBILE_SEAT_ATTRIBUTES = ('certificate_type', 'course_key', 'id_verification_required')
+
 
 class Command(BaseCommand):
     """
@@ -43,10 +49,16 @@ class Command(BaseCommand):
             type=int,
             default=10,
             help='Sleep time in seconds between update of batches')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=100,
+            help='Number of parent products whose mobile seats are created at once')
 
     def handle(self, *args, **options):
         batch_size = options['batch_size']
         sleep_time = options['sleep_time']
+        chunk_size = options['chunk_size']
         default_site = Site.objects.filter(id=settings.SITE_ID).first()
         batch_counter = 0
 
@@ -64,37 +76,51 @@ class Command(BaseCommand):
         expired_courses = Course.objects.filter(products__in=expired_products).distinct()
         if expired_courses:
             self._send_email_about_expired_courses(expired_courses=expired_courses)
-        for expired_course in expired_courses:
-            # Get parent course key from discovery for the current course run
-            course_run_detail_response = get_course_run_detail(default_site, expired_course.id)
-            try:
-                parent_course_key = course_run_detail_response.get('course')
-            except AttributeError:
-                message = "Error while fetching parent course for {} from discovery".format(expired_course.id)
-                logger.ERROR(message)
-                continue  # pragma: no cover
-
-            # Get all course run keys for parent course from discovery. Then filter those
-            # courses/course runs on Ecommerce using Course.verification_deadline and
-            # Product.expires to determine products to create course runs for.
-            parent_course = get_course_detail(default_site, parent_course_key)
-            try:
-                all_course_run_keys = parent_course.get('course_run_keys')
-            except AttributeError:
-                message = "Error while fetching course runs for {} from discovery".format(parent_course_key)
-                logger.ERROR(message)
-                continue  # pragma: no cover
-
-            all_course_runs = Course.objects.filter(id__in=all_course_run_keys)
-            parent_products = self._get_parent_products_to_create_mobile_skus_for(all_course_runs)
-            for parent_product in parent_products:
-                self._create_child_products_for_mobile(parent_product)
-
-            expired_course.publish_to_lms()
-            batch_counter += 1
-            if batch_counter >= batch_size:
-                time.sleep(sleep_time)
-                batch_counter = 0
+
+        # Mobile seats are created in bulk for chunks of parent products, and all the courses are published
+        # to LMS in one batch at the end.
+        pending_parent_products = {}
+        courses_to_publish = {}
+        try:
+            for expired_course in expired_courses:
+                # Get parent course key from discovery for the current course run
+                course_run_detail_response = get_course_run_detail(default_site, expired_course.id)
+                try:
+                    parent_course_key = course_run_detail_response.get('course')
+                except AttributeError:
+                    message = "Error while fetching parent course for {} from discovery".format(expired_course.id)
+                    logger.ERROR(message)
+                    continue  # pragma: no cover
+
+                # Get all course run keys for parent course from discovery. Then filter those
+                # courses/course runs on Ecommerce using Course.verification_deadline and
+                # Product.expires to determine products to create course runs for.
+                parent_course = get_course_detail(default_site, parent_course_key)
+                try:
+                    all_course_run_keys = parent_course.get('course_run_keys')
+                except AttributeError:
+                    message = "Error while fetching course runs for {} from discovery".format(parent_course_key)
+                    logger.ERROR(message)
+                    continue  # pragma: no cover
+
+                all_course_runs = Course.objects.filter(id__in=all_course_run_keys)
+                parent_products = self._get_parent_products_to_create_mobile_skus_for(all_course_runs)
+                for parent_product in parent_products:
+                    pending_parent_products[parent_product.id] = parent_product
+                if len(pending_parent_products) >= chunk_size:
+                    courses_to_publish.update(self._create_mobile_seats(list(pending_parent_products.values())))
+                    pending_parent_products = {}
+
+                courses_to_publish[expired_course.id] = expired_course
+                batch_counter += 1
+                if batch_counter >= batch_size:
+                    time.sleep(sleep_time)
+                    batch_counter = 0
+        finally:
+            if pending_parent_products:
+                courses_to_publish.update(self._create_mobile_seats(list(pending_parent_products.values())))
+            if courses_to_publish:
+                self._publish_to_lms(list(courses_to_publish.values()))
 
     def _get_parent_products_to_create_mobile_skus_for(self, courses):
         """
@@ -113,24 +139,97 @@ class Command(BaseCommand):
             product_class__name=SEAT_PRODUCT_CLASS_NAME,
             children__expires__gt=now(),
             course__in=courses,
-        )
+        ).distinct()
         return products_to_create_mobile_skus_for
 
-    def _create_child_products_for_mobile(self, product):
+    def _create_mobile_seats(self, parent_products):
         """
-        Create child products/seats for IOS and Android.
-        Child product is also called a variant in the UI
+        Create the seats/child products for IOS and Android of the given parent products, with their attributes
+        and stock records, in bulk.
+
+        Returns:
+            dict: The courses mobile seats were created for, by course id.
         """
-        existing_web_seat = Product.objects.filter(
+        web_seats = {}
+        for seat in Product.objects.filter(
             ~Q(stockrecords__partner_sku__icontains="mobile"),
-            parent=product,
+            parent__in=parent_products,
             attribute_values__attribute__name="certificate_type",
             attribute_values__value_text=CertificateType.VERIFIED,
             parent__product_class__name=SEAT_PRODUCT_CLASS_NAME,
-        ).first()
-        if existing_web_seat:
-            self._create_mobile_seat(ANDROID_SKU_PREFIX, existing_web_seat)
-            self._create_mobile_seat(IOS_SKU_PREFIX, existing_web_seat)
+        ).select_related('course').prefetch_related('stockrecords', 'attribute_values__attribute').order_by('id'):
+            web_seats.setdefault(seat.parent_id, seat)
+
+        existing_seats = set(Product.objects.filter(parent__in=web_seats).values_list('parent_id', 'title'))
+        courses = {}
+        new_seats = []
+        for web_seat in web_seats.values():
+            courses[web_seat.course_id] = web_seat.course
+            for sku_prefix in MOBILE_SKU_PREFIXES:
+                title = self._get_mobile_seat_title(sku_prefix, web_seat)
+                if (web_seat.parent_id, title) in existing_seats:
+                    # Complete the mobile seats left over by an interrupted run one at a time.
+                    self._create_mobile_seat(sku_prefix, web_seat)
+                    continue
+
+                new_seats.append(Product(
+                    title=title,
+                    slug=slugify(title),
+                    course=web_seat.course,
+                    parent_id=web_seat.parent_id,
+                    product_class_id=web_seat.product_class_id,
+                    structure=web_seat.structure,
+                    expires=web_seat.expires,
+                    is_public=web_seat.is_public,
+                ))
+
+        if new_seats:
+            new_seats = bulk_create_with_history(new_seats, Product)
+            web_seats_by_title = {
+                (web_seat.parent_id, self._get_mobile_seat_title(sku_prefix, web_seat)): (sku_prefix, web_seat)
+                for web_seat in web_seats.values() for sku_prefix in MOBILE_SKU_PREFIXES
+            }
+            attribute_values = []
+            stock_records = []
+            for new_seat in new_seats:
+                sku_prefix, web_seat = web_seats_by_title[(new_seat.parent_id, new_seat.title)]
+                for web_attribute_value in web_seat.attribute_values.all():
+                    if web_attribute_value.attribute.code in MOBILE_SEAT_ATTRIBUTES:
+                        attribute_value = ProductAttributeValue(
+                            product=new_seat, attribute=web_attribute_value.attribute
+                        )
+                        attribute_value.value = web_attribute_value.value
+                        attribute_values.append(attribute_value)
+
+                existing_stock_record = web_seat.stockrecords.all()[0]
+                stock_records.append(StockRecord(
+                    product=new_seat,
+                    partner_id=existing_stock_record.partner_id,
+                    partner_sku=self._get_mobile_partner_sku(sku_prefix, existing_stock_record),
+                    price_currency=existing_stock_record.price_currency,
+                    price=existing_stock_record.price,
+                ))
+            bulk_create_with_history(attribute_values, ProductAttributeValue)
+            bulk_create_with_history(stock_records, StockRecord)
+
+        logger.info("Created mobile seats for %d parent products.", len(web_seats))
+        return courses
+
+    def _publish_to_lms(self, courses):
+        """ Publish the given courses and their seats to LMS in one batch. """
+        def log_failure(course_id, error_message):
+            if error_message:
+                logger.error("Failed to publish %s to LMS: %s", course_id, error_message)
+
+        BatchLMSPublisher().publish_courses(courses, callback=log_failure)
+
+    @staticmethod
+    def _get_mobile_seat_title(sku_prefix, existing_web_seat):
+        return "{} {}".format(sku_prefix.capitalize(), existing_web_seat.title.lower())
+
+    @staticmethod
+    def _get_mobile_partner_sku(sku_prefix, existing_stock_record):
+        return 'mobile.{}.{}'.format(sku_prefix.lower(), existing_stock_record.partner_sku.lower())
 
     def _create_mobile_seat(self, sku_prefix, existing_web_seat):
         """
@@ -138,7 +237,7 @@ class Command(BaseCommand):
         in the same Parent Product.
         """
         new_mobile_seat, _ = Product.objects.get_or_create(
-            title="{} {}".format(sku_prefix.capitalize(), existing_web_seat.title.lower()),
+            title=self._get_mobile_seat_title(sku_prefix, existing_web_seat),
             course=existing_web_seat.course,
             parent=existing_web_seat.parent,
             product_class=existing_web_seat.product_class,
@@ -161,8 +260,7 @@ class Command(BaseCommand):
             partner=existing_stock_record.partner
         )
         if created:
-            partner_sku = 'mobile.{}.{}'.format(sku_prefix.lower(), existing_stock_record.partner_sku.lower())
-            mobile_stock_record.partner_sku = partner_sku
+            mobile_stock_record.partner_sku = self._get_mobile_partner_sku(sku_prefix, existing_stock_record)
         mobile_stock_record.price_currency = existing_stock_record.price_currency
         mobile_stock_record.price = existing_stock_record.price
         mobile_stock_record.save()
@@ -6,7 +6,7 @@ from django.core.management import call_command
 from django.utils.timezone import now, timedelta
 from testfixtures import LogCapture
 
-from ecommerce.courses.models import Course
+from ecommerce.courses.publishers import BatchLMSPublisher
 from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.extensions.catalogue.models import Product
 from ecommerce.extensions.catalogue.tests.mixins import DiscoveryTestMixin
@@ -84,10 +84,10 @@ class BatchUpdateMobileSeatsTests(DiscoveryTestMixin, TransactionTestCase):
 
     @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_detail')
     @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_run_detail')
-    @patch.object(Course, 'publish_to_lms')
+    @patch.object(BatchLMSPublisher, 'publish_courses')
     @patch.object(mobile_seats_command, '_send_email_about_expired_courses')
     def test_mobile_seat_for_new_course_run_created(
-            self, mock_email, mock_publish_to_lms, mock_course_run, mock_course_detail):
+            self, mock_email, mock_publish_courses, mock_course_run, mock_course_detail):
         """Test that the command creates mobile seats for new course run."""
         course_with_mobile_seat = self._create_course_and_seats(create_mobile_seats=True, expired_in_past=True)
         course_run_without_mobile_seat = self._create_course_and_seats()
@@ -95,7 +95,7 @@ class BatchUpdateMobileSeatsTests(DiscoveryTestMixin, TransactionTestCase):
         course_detail_return_value = {'course_run_keys': [course_run_without_mobile_seat.id]}
 
         mock_email.return_value = None
-        mock_publish_to_lms.return_value = None
+        mock_publish_courses.return_value = None
         mock_course_run.return_value = course_run_return_value
         mock_course_detail.return_value = course_detail_return_value
 
@@ -110,10 +110,73 @@ class BatchUpdateMobileSeatsTests(DiscoveryTestMixin, TransactionTestCase):
 
     @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_detail')
     @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_run_detail')
-    @patch.object(Course, 'publish_to_lms')
+    @patch.object(BatchLMSPublisher, 'publish_courses')
+    @patch.object(mobile_seats_command, '_send_email_about_expired_courses')
+    def test_mobile_seats_created_in_bulk(
+            self, mock_email, mock_publish_courses, mock_course_run, mock_course_detail):
+        """Test that mobile seats are copied from the web seats, and all the courses are published at once."""
+        course_with_mobile_seat = self._create_course_and_seats(create_mobile_seats=True, expired_in_past=True)
+        course_runs = [self._create_course_and_seats() for __ in range(3)]
+        mock_email.return_value = None
+        mock_course_run.return_value = {'course': course_with_mobile_seat.id}
+        mock_course_detail.return_value = {'course_run_keys': [course_run.id for course_run in course_runs]}
+
+        call_command(self.command, chunk_size=2)
+
+        for course_run in course_runs:
+            web_seat = Product.objects.filter(
+                course=course_run,
+                attribute_values__attribute__name='certificate_type',
+                attribute_values__value_text='verified',
+                stockrecords__isnull=False,
+            ).exclude(stockrecords__partner_sku__icontains='mobile').get()
+            web_stock_record = web_seat.stockrecords.first()
+            for sku_prefix in (ANDROID_SKU_PREFIX, IOS_SKU_PREFIX):
+                mobile_seat = Product.objects.get(
+                    course=course_run,
+                    stockrecords__partner_sku='mobile.{}.{}'.format(sku_prefix, web_stock_record.partner_sku.lower())
+                )
+                self.assertEqual(mobile_seat.title, '{} {}'.format(sku_prefix.capitalize(), web_seat.title.lower()))
+                self.assertEqual(mobile_seat.parent, web_seat.parent)
+                self.assertEqual(mobile_seat.expires, web_seat.expires)
+                self.assertEqual(mobile_seat.attr.certificate_type, web_seat.attr.certificate_type)
+                self.assertEqual(mobile_seat.attr.course_key, web_seat.attr.course_key)
+                self.assertEqual(mobile_seat.attr.id_verification_required, web_seat.attr.id_verification_required)
+                self.assertEqual(mobile_seat.stockrecords.first().price, web_stock_record.price)
+                self.assertEqual(mobile_seat.history.count(), 1)
+
+        mock_publish_courses.assert_called_once()
+        published_courses = mock_publish_courses.call_args[0][0]
+        self.assertCountEqual(published_courses, [course_with_mobile_seat] + course_runs)
+
+    @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_detail')
+    @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_run_detail')
+    @patch.object(BatchLMSPublisher, 'publish_courses')
+    @patch.object(mobile_seats_command, '_send_email_about_expired_courses')
+    def test_partially_created_mobile_seats_completed(
+            self, mock_email, mock_publish_courses, mock_course_run, mock_course_detail):
+        """Test that a mobile seat left without its stock record is completed, and the other one created."""
+        course_with_mobile_seat = self._create_course_and_seats(create_mobile_seats=True, expired_in_past=True)
+        course_run = self._create_course_and_seats()
+        android_seat = self._create_mobile_seat_for_course(course_run, ANDROID_SKU_PREFIX)
+        android_seat.stockrecords.all().delete()
+        mock_email.return_value = None
+        mock_publish_courses.return_value = None
+        mock_course_run.return_value = {'course': course_with_mobile_seat.id}
+        mock_course_detail.return_value = {'course_run_keys': [course_run.id]}
+
+        call_command(self.command)
+
+        mobile_seats = Product.objects.filter(course=course_run, stockrecords__partner_sku__icontains='mobile')
+        self.assertEqual(mobile_seats.count(), 2)
+        self.assertIn(android_seat, mobile_seats)
+
+    @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_detail')
+    @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_run_detail')
+    @patch.object(BatchLMSPublisher, 'publish_courses')
     @patch.object(mobile_seats_command, '_send_email_about_expired_courses')
     def test_extra_seats_not_created(
-            self, mock_email, mock_publish_to_lms, mock_course_run, mock_course_detail):
+            self, mock_email, mock_publish_courses, mock_course_run, mock_course_detail):
         """Test the case where mobile seats are already created for course run."""
         course_with_mobile_seat = self._create_course_and_seats(create_mobile_seats=True, expired_in_past=True)
         course_run_with_mobile_seat = self._create_course_and_seats(create_mobile_seats=True)
@@ -121,7 +184,7 @@ class BatchUpdateMobileSeatsTests(DiscoveryTestMixin, TransactionTestCase):
         course_detail_return_value = {'course_run_keys': [course_run_with_mobile_seat.id]}
 
         mock_email.return_value = None
-        mock_publish_to_lms.return_value = None
+        mock_publish_courses.return_value = None
         mock_course_run.return_value = course_run_return_value
         mock_course_detail.return_value = course_detail_return_value
 
@@ -136,10 +199,10 @@ class BatchUpdateMobileSeatsTests(DiscoveryTestMixin, TransactionTestCase):
 
     @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_detail')
     @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_run_detail')
-    @patch.object(Course, 'publish_to_lms')
+    @patch.object(BatchLMSPublisher, 'publish_courses')
     @patch.object(mobile_seats_command, '_send_email_about_expired_courses')
     def test_no_response_from_discovery_for_course_run_api(
-            self, mock_email, mock_publish_to_lms, mock_course_run, mock_course_detail):
+            self, mock_email, mock_publish_courses, mock_course_run, mock_course_detail):
         """Test that the command handles exceptions if no response returned from Discovery for course run API."""
         course_with_mobile_seat = self._create_course_and_seats(create_mobile_seats=True, expired_in_past=True)
         course_run_without_mobile_seat = self._create_course_and_seats()
@@ -148,7 +211,7 @@ class BatchUpdateMobileSeatsTests(DiscoveryTestMixin, TransactionTestCase):
 
         logger_name = 'ecommerce.extensions.iap.management.commands.batch_update_mobile_seats'
         mock_email.return_value = None
-        mock_publish_to_lms.return_value = None
+        mock_publish_courses.return_value = None
         mock_course_run.return_value = course_run_return_value
         mock_course_detail.return_value = course_detail_return_value
 
@@ -166,10 +229,10 @@ class BatchUpdateMobileSeatsTests(DiscoveryTestMixin, TransactionTestCase):
 
     @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_detail')
     @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_run_detail')
-    @patch.object(Course, 'publish_to_lms')
+    @patch.object(BatchLMSPublisher, 'publish_courses')
     @patch.object(mobile_seats_command, '_send_email_about_expired_courses')
     def test_no_response_from_discovery_for_course_detail_api(
-            self, mock_email, mock_publish_to_lms, mock_course_run, mock_course_detail):
+            self, mock_email, mock_publish_courses, mock_course_run, mock_course_detail):
         """Test that the command handles exceptions if no response returned from Discovery for course detail API."""
         course_with_mobile_seat = self._create_course_and_seats(create_mobile_seats=True, expired_in_past=True)
         course_run_without_mobile_seat = self._create_course_and_seats()
@@ -177,7 +240,7 @@ class BatchUpdateMobileSeatsTests(DiscoveryTestMixin, TransactionTestCase):
 
         logger_name = 'ecommerce.extensions.iap.management.commands.batch_update_mobile_seats'
         mock_email.return_value = None
-        mock_publish_to_lms.return_value = None
+        mock_publish_courses.return_value = None
         mock_course_run.return_value = course_run_return_value
         mock_course_detail.return_value = None
 
@@ -195,13 +258,13 @@ class BatchUpdateMobileSeatsTests(DiscoveryTestMixin, TransactionTestCase):
 
     @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_detail')
     @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_run_detail')
-    @patch.object(Course, 'publish_to_lms')
+    @patch.object(BatchLMSPublisher, 'publish_courses')
     @patch.object(mobile_seats_command, '_send_email_about_expired_courses')
     def test_command_arguments_are_processed(
-            self, mock_email, mock_publish_to_lms, mock_course_run, mock_course_detail):
+            self, mock_email, mock_publish_courses, mock_course_run, mock_course_detail):
         course_with_mobile_seat = self._create_course_and_seats(create_mobile_seats=True, expired_in_past=True)
         mock_email.return_value = None
-        mock_publish_to_lms.return_value = None
+        mock_publish_courses.return_value = None
         mock_course_run.return_value = {'course': course_with_mobile_seat.id}
         mock_course_detail.return_value = {'course_run_keys': []}
 
@@ -210,8 +273,8 @@ class BatchUpdateMobileSeatsTests(DiscoveryTestMixin, TransactionTestCase):
 
     @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_detail')
     @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_run_detail')
-    @patch.object(Course, 'publish_to_lms')
-    def test_send_mail_to_mobile_team(self, mock_publish_to_lms, mock_course_run, mock_course_detail):
+    @patch.object(BatchLMSPublisher, 'publish_courses')
+    def test_send_mail_to_mobile_team(self, mock_publish_courses, mock_course_run, mock_course_detail):
         logger_name = 'ecommerce.extensions.iap.management.commands.batch_update_mobile_seats'
         email_sender = 'ecommerce.extensions.communication.utils.Dispatcher.dispatch_direct_messages'
         mock_mobile_team_mail = 'abc@example.com'
@@ -220,7 +283,7 @@ class BatchUpdateMobileSeatsTests(DiscoveryTestMixin, TransactionTestCase):
         iap_configs.save()
         course = self._create_course_and_seats(create_mobile_seats=True, expired_in_past=True)
 
-        mock_publish_to_lms.return_value = None
+        mock_publish_courses.return_value = None
         mock_course_run.return_value = {'course': course.id}
         mock_course_detail.return_value = {'course_run_keys': []}
         mock_email_body = {
@@ -244,8 +307,8 @@ class BatchUpdateMobileSeatsTests(DiscoveryTestMixin, TransactionTestCase):
 
     @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_detail')
     @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_run_detail')
-    @patch.object(Course, 'publish_to_lms')
-    def test_send_mail_to_mobile_team_with_no_email(self, mock_publish_to_lms, mock_course_run, mock_course_detail):
+    @patch.object(BatchLMSPublisher, 'publish_courses')
+    def test_send_mail_to_mobile_team_with_no_email(self, mock_publish_courses, mock_course_run, mock_course_detail):
         logger_name = 'ecommerce.extensions.iap.management.commands.batch_update_mobile_seats'
         email_sender = 'ecommerce.extensions.communication.utils.Dispatcher.dispatch_direct_messages'
         iap_configs = IAPProcessorConfiguration.get_solo()
@@ -253,7 +316,7 @@ class BatchUpdateMobileSeatsTests(DiscoveryTestMixin, TransactionTestCase):
         iap_configs.save()
         course = self._create_course_and_seats(create_mobile_seats=True, expired_in_past=True)
 
-        mock_publish_to_lms.return_value = None
+        mock_publish_courses.return_value = None
         mock_course_run.return_value = {'course': course.id}
         mock_course_detail.return_value = {'course_run_keys': []}
 
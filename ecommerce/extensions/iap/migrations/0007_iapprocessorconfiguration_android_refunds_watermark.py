@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-19 10:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('iap', '0006_iapprocessorconfiguration_mobile_team_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='iapprocessorconfiguration',
+            name='android_refunds_watermark',
+            field=models.BigIntegerField(blank=True, null=True, verbose_name='Voided time, in milliseconds since the epoch, from which to fetch the next Android refunds.'),
+        ),
+    ]
@@ -22,6 +22,14 @@ class IAPProcessorConfiguration(SingletonModel):
         )
     )
 
+    android_refunds_watermark = models.BigIntegerField(
+        null=True,
+        blank=True,
+        verbose_name=_(
+            'Voided time, in milliseconds since the epoch, from which to fetch the next Android refunds.'
+        )
+    )
+
     mobile_team_email = models.EmailField(
         default='',
         verbose_name=_('mobile team email'),
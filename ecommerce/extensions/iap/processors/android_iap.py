@@ -18,6 +18,4 @@ class AndroidIAP(BaseIAP):  # pylint: disable=W0223
         """
         Return True if the transaction_id has previously been processed for a purchase.
         """
-        return PaymentProcessorResponse.objects.filter(
-            processor_name=self.NAME,
-            transaction_id=transaction_id).exists()
+        return PaymentProcessorResponse.transaction_exists(self.NAME, transaction_id)
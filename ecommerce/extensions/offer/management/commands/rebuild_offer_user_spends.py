@@ -0,0 +1,101 @@
+"""
+This command rebuilds the ledger of the discounts users have received from offers.
+"""
+
+
+import logging
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Sum
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.fulfillment.status import ORDER
+from ecommerce.extensions.refund.status import REFUND
+
+OfferUserSpend = get_model('offer', 'OfferUserSpend')
+OrderDiscount = get_model('order', 'OrderDiscount')
+Refund = get_model('refund', 'Refund')
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the OfferUserSpend ledger from the order history.
+
+    The ledger is kept up to date as orders are completed and refunded, so this is only needed to reconcile it,
+    e.g. after orders were updated without triggering model signals.
+
+    Example:
+
+        ./manage.py rebuild_offer_user_spends --offer-id 1 --offer-id 2
+    """
+
+    help = 'Rebuild the ledger of the discounts users have received from offers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--offer-id',
+            action='append',
+            dest='offer_ids',
+            default=None,
+            help='ID of an offer whose ledger entries should be rebuilt. Defaults to all offers.',
+            type=int,
+        )
+        parser.add_argument(
+            '--batch-size',
+            dest='batch_size',
+            default=100,
+            help='Number of offers to rebuild per transaction.',
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        offer_ids = options['offer_ids']
+        batch_size = options['batch_size']
+
+        if not offer_ids:
+            offer_ids = set(
+                OrderDiscount.objects.filter(offer_id__isnull=False).values_list('offer_id', flat=True).distinct()
+            )
+            offer_ids.update(OfferUserSpend.objects.values_list('offer_id', flat=True).distinct())
+        offer_ids = sorted(offer_ids)
+
+        entries_count = 0
+        for start in range(0, len(offer_ids), batch_size):
+            entries_count += self.rebuild(offer_ids[start:start + batch_size])
+
+        logger.info(
+            'Rebuilt %d offer user spend entries for %d offers.', entries_count, len(offer_ids)
+        )
+
+    @staticmethod
+    def rebuild(offer_ids):
+        """
+        Replace the ledger entries of the given offers with totals aggregated from the order history.
+        """
+        refunds = Refund.objects.filter(
+            order_id=OuterRef('order_id'), user_id=OuterRef('order__user_id'), status=REFUND.COMPLETE
+        )
+        totals = OrderDiscount.objects.filter(
+            offer_id__in=offer_ids,
+            order__status=ORDER.COMPLETE,
+            order__user_id__isnull=False,
+        ).annotate(
+            is_refunded=Exists(refunds)
+        ).filter(
+            is_refunded=False
+        ).order_by().values('offer_id', 'order__user_id').annotate(total_discount=Sum('amount'))
+
+        entries = [
+            OfferUserSpend(
+                offer_id=total['offer_id'],
+                user_id=total['order__user_id'],
+                total_discount=total['total_discount'],
+            )
+            for total in totals
+        ]
+        with transaction.atomic():
+            OfferUserSpend.objects.filter(offer_id__in=offer_ids).delete()
+            OfferUserSpend.objects.bulk_create(entries)
+        return len(entries)
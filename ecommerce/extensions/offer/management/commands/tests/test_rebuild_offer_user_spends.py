@@ -0,0 +1,52 @@
+
+
+from django.core.management import call_command
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.extensions.fulfillment.status import ORDER
+from ecommerce.extensions.refund.status import REFUND
+from ecommerce.extensions.refund.tests.factories import RefundFactory
+from ecommerce.tests.factories import UserFactory
+from ecommerce.tests.testcases import TestCase
+
+OfferUserSpend = get_model('offer', 'OfferUserSpend')
+
+
+class RebuildOfferUserSpendsTests(TestCase):
+    """Tests for rebuild_offer_user_spends management command."""
+
+    def setUp(self):
+        super(RebuildOfferUserSpendsTests, self).setUp()
+        self.offer = factories.ConditionalOfferFactory()
+        self.users = UserFactory.create_batch(2)
+        for user in self.users:
+            for amount in (10, 30):
+                order = factories.OrderFactory(user=user, status=ORDER.COMPLETE)
+                factories.OrderDiscountFactory(order=order, offer_id=self.offer.id, amount=amount)
+        RefundFactory(order=order, user=self.users[1], status=REFUND.COMPLETE)
+
+    def assert_ledger(self):
+        self.assertEqual(
+            dict(OfferUserSpend.objects.filter(offer=self.offer).values_list('user_id', 'total_discount')),
+            {self.users[0].id: 40, self.users[1].id: 10},
+        )
+
+    def test_rebuild(self):
+        """Test that command replaces stale and missing ledger entries."""
+        OfferUserSpend.objects.filter(user=self.users[0]).update(total_discount=1000)
+        OfferUserSpend.objects.filter(user=self.users[1]).delete()
+
+        call_command('rebuild_offer_user_spends')
+        self.assert_ledger()
+
+    def test_rebuild_offer(self):
+        """Test that command only rebuilds the ledger entries of the given offers."""
+        other_offer_spend = OfferUserSpend.objects.create(
+            offer=factories.ConditionalOfferFactory(), user=self.users[0], total_discount=5
+        )
+        OfferUserSpend.objects.filter(offer=self.offer).delete()
+
+        call_command('rebuild_offer_user_spends', '--offer-id={}'.format(self.offer.id), '--batch-size=1')
+        self.assert_ledger()
+        self.assertTrue(OfferUserSpend.objects.filter(id=other_offer_spend.id).exists())
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-19 10:27
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('offer', '0055_auto_20231108_1355'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferUserSpend',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_discount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('modified', models.DateTimeField(auto_now=True)),
+                ('offer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_spends', to='offer.conditionaloffer')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offer_spends', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('offer', 'user')},
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
 import logging
 import re
 from datetime import datetime
+from decimal import Decimal
 from urllib.parse import urljoin
 
 import boto3
@@ -12,7 +13,8 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
-from django.db.models.signals import post_delete
+from django.db.models import Sum
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
 from django.utils.translation import ugettext_lazy as _
 from django_extensions.db.models import TimeStampedModel
@@ -32,6 +34,7 @@ from simple_history.models import HistoricalRecords
 from threadlocals.threadlocals import get_current_request
 
 from ecommerce.core.utils import get_cache_key, log_message_and_raise_validation_error
+from ecommerce.extensions.fulfillment.status import ORDER
 from ecommerce.extensions.offer.constants import (
     EMAIL_TEMPLATE_TYPES,
     NUDGE_EMAIL_CYCLE,
@@ -45,7 +48,8 @@ from ecommerce.extensions.offer.constants import (
     SENDER_CATEGORY_TYPES,
     OfferUsageEmailTypes
 )
-from ecommerce.extensions.offer.utils import format_assigned_offer_email
+from ecommerce.extensions.offer.utils import format_assigned_offer_email, get_email_domain_matcher
+from ecommerce.extensions.refund.status import REFUND
 
 OFFER_PRIORITY_ENTERPRISE = 10
 OFFER_PRIORITY_VOUCHER = 20
@@ -340,12 +344,7 @@ class ConditionalOffer(AbstractConditionalOffer):
             False otherwise.
         """
         if self.email_domains:
-            for domain in self.email_domains.split(','):
-                pattern = r'(?P<username>.+)@(?P<subdomain>\w+\.)*{domain}'.format(domain=domain)
-                match = re.match(pattern, email, re.IGNORECASE)
-                if match and match.group(0) == email:
-                    return True
-            return False
+            return get_email_domain_matcher(self.email_domains).matches(email)
         return True
 
     def is_condition_satisfied(self, basket):
@@ -928,4 +927,133 @@ class CodeAssignmentNudgeEmails(TimeStampedModel):
         cls.objects.filter(code__in=codes, user_email__in=user_emails, already_sent=False).update(is_subscribed=False)
 
 
+class OfferUserSpend(models.Model):
+    """
+    Ledger of the discount a user has received from an offer, in completed orders that have not been refunded.
+
+    Enterprise offer conditions read it to enforce `max_user_discount`, instead of aggregating the user's order
+    history on every basket evaluation. The ledger entry of a user and an offer is recomputed whenever one of
+    the user's orders with a discount from the offer is updated or refunded, see `update_offer_user_spends`.
+    Missing entries are computed when they are first read, and the rebuild_offer_user_spends management command
+    rebuilds them all.
+    """
+    offer = models.ForeignKey('offer.ConditionalOffer', related_name='user_spends', on_delete=models.CASCADE)
+    user = models.ForeignKey('core.User', related_name='offer_spends', on_delete=models.CASCADE)
+    total_discount = models.DecimalField(decimal_places=2, max_digits=12, default=Decimal('0.00'))
+    modified = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('offer', 'user')
+
+    @staticmethod
+    def compute_total_discount(offer_id, user_id):
+        """
+        Aggregate the discount the user has received from the offer, in completed orders that have not been refunded.
+        """
+        refunded_order_ids = get_model('refund', 'Refund').objects.filter(
+            user_id=user_id, status=REFUND.COMPLETE
+        ).values_list('order_id', flat=True)
+
+        return get_model('order', 'OrderDiscount').objects.filter(
+            offer_id=offer_id, order__user_id=user_id, order__status=ORDER.COMPLETE
+        ).exclude(order_id__in=refunded_order_ids).aggregate(Sum('amount'))['amount__sum'] or Decimal('0.00')
+
+    @classmethod
+    def get_total_discount(cls, offer, user):
+        """
+        Return the discount the user has received from the offer, from the ledger.
+        """
+        if user is None or user.id is None:
+            return Decimal('0.00')
+
+        total_discount = cls.objects.filter(offer=offer, user=user).values_list('total_discount', flat=True).first()
+        if total_discount is None:
+            total_discount = cls.update(offer.id, user.id)
+        return total_discount
+
+    @classmethod
+    def update(cls, offer_id, user_id):
+        """
+        Recompute the ledger entry of the user and the offer, and return its total discount.
+        """
+        total_discount = cls.compute_total_discount(offer_id, user_id)
+        cls.objects.update_or_create(offer_id=offer_id, user_id=user_id, defaults={'total_discount': total_discount})
+        return total_discount
+
+    @classmethod
+    def update_users(cls, offer_id, user_ids):
+        """
+        Recompute the ledger entries of the given users and the offer, aggregating their discounts in a single query.
+        """
+        user_ids = set(user_ids)
+        refunded_order_ids = get_model('refund', 'Refund').objects.filter(
+            user_id__in=user_ids, status=REFUND.COMPLETE
+        ).values_list('order_id', flat=True)
+
+        totals = dict(
+            get_model('order', 'OrderDiscount').objects.filter(
+                offer_id=offer_id, order__user_id__in=user_ids, order__status=ORDER.COMPLETE
+            ).exclude(
+                order_id__in=refunded_order_ids
+            ).order_by().values('order__user_id').annotate(total_discount=Sum('amount')).values_list(
+                'order__user_id', 'total_discount'
+            )
+        )
+
+        cls.objects.filter(offer_id=offer_id, user_id__in=user_ids).delete()
+        cls.objects.bulk_create([
+            cls(offer_id=offer_id, user_id=user_id, total_discount=totals.get(user_id) or Decimal('0.00'))
+            for user_id in user_ids
+        ])
+
+
+def update_offer_user_spends(order_id, user_id):
+    """
+    Recompute the ledger entries of the given user for every offer that discounted the given order.
+    """
+    if user_id is None:
+        return
+
+    offer_ids = get_model('order', 'OrderDiscount').objects.filter(
+        order_id=order_id, offer_id__isnull=False
+    ).values_list('offer_id', flat=True).distinct()
+    for offer_id in offer_ids:
+        OfferUserSpend.update(offer_id, user_id)
+
+
+@receiver(post_save, sender='order.OrderDiscount', dispatch_uid='offer.update_offer_user_spend_on_discount')
+def update_offer_user_spend_on_discount(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    if instance.offer_id and instance.order.user_id:
+        OfferUserSpend.update(instance.offer_id, instance.order.user_id)
+
+
+@receiver(post_init, sender='order.Order', dispatch_uid='offer.track_original_order_status')
+def track_original_order_status(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Records the status an order was loaded with, so that saves that do not complete or uncomplete the order
+    can skip recomputing the ledger.
+    """
+    # Read the field directly, so that loading orders with a deferred status does not query it.
+    instance.original_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender='order.Order', dispatch_uid='offer.update_offer_user_spends_on_order')
+def update_offer_user_spends_on_order(sender, instance, created, **kwargs):  # pylint: disable=unused-argument
+    original_status = instance.original_status
+    instance.original_status = instance.status
+
+    # Discounts are recorded after their order is created, so new orders have none to account for yet. The ledger
+    # only counts completed orders, so it only changes when an order moves into or out of the complete status.
+    if created:
+        return
+    if original_status is None or (original_status == ORDER.COMPLETE) != (instance.status == ORDER.COMPLETE):
+        update_offer_user_spends(instance.id, instance.user_id)
+
+
+@receiver(post_save, sender='refund.Refund', dispatch_uid='offer.update_offer_user_spends_on_refund')
+def update_offer_user_spends_on_refund(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    if instance.status == REFUND.COMPLETE:
+        update_offer_user_spends(instance.order_id, instance.user_id)
+
+
 from oscar.apps.offer.models import *  # noqa isort:skip pylint: disable=wildcard-import,unused-wildcard-import,wrong-import-position,wrong-import-order,ungrouped-imports
@@ -24,8 +24,11 @@ from requests.exceptions import RequestException, Timeout
 
 from ecommerce.coupons.tests.mixins import CouponMixin, DiscoveryMockMixin
 from ecommerce.extensions.catalogue.tests.mixins import DiscoveryTestMixin
+from ecommerce.extensions.fulfillment.status import ORDER
 from ecommerce.extensions.offer.constants import ASSIGN, DAY3, DAY10, DAY19, REMIND, REVOKE
 from ecommerce.extensions.offer.models import delete_files_from_s3
+from ecommerce.extensions.refund.status import REFUND
+from ecommerce.extensions.refund.tests.factories import RefundFactory
 from ecommerce.extensions.test.factories import CodeAssignmentNudgeEmailTemplatesFactory
 from ecommerce.tests.factories import UserFactory
 from ecommerce.tests.testcases import TestCase
@@ -40,6 +43,8 @@ OfferAssignmentEmailSentRecord = get_model('offer', 'OfferAssignmentEmailSentRec
 Range = get_model('offer', 'Range')
 CodeAssignmentNudgeEmails = get_model('offer', 'CodeAssignmentNudgeEmails')
 CodeAssignmentNudgeEmailTemplates = get_model('offer', 'CodeAssignmentNudgeEmailTemplates')
+OfferUserSpend = get_model('offer', 'OfferUserSpend')
+Order = get_model('order', 'Order')
 
 NOW = datetime.now(pytz.UTC)
 
@@ -515,6 +520,15 @@ class ConditionalOfferTests(DiscoveryTestMixin, DiscoveryMockMixin, TestCase):
         valid_email_2 = 'test@sub2.{domain}'.format(domain=self.valid_domain)
         self.assertTrue(self.offer.is_email_valid(valid_email_2))
 
+    def test_is_email_valid_after_email_domains_change(self):
+        """Verify emails are validated against the current email domains of the offer."""
+        email = 'test@{domain}'.format(domain=self.valid_domain)
+        self.assertTrue(self.offer.is_email_valid(email))
+
+        self.offer.email_domains = 'other.com'
+        self.assertFalse(self.offer.is_email_valid(email))
+        self.assertTrue(self.offer.is_email_valid('test@other.com'))
+
     @ddt.data(
         '', 'domain.com', 'multi.it,domain.hr', 'sub.domain.net', '例如.com', 'val-id.例如', 'valid1.co例如',
         'valid-domain.com', 'çççç.рф', 'çç-ççç32.中国', 'ççç.ççç.இலங்கை'
@@ -831,3 +845,59 @@ def test_file_delete_without_bucket_name(caplog):
     delete_files_from_s3(sender=TemplateFileAttachment, instance=FakeInstance('xyz'), using=None)
     assert '[TemplateFileAttachment] Raised an error while deleting the object xyz' in caplog.text
     assert 'Parameter validation failed:\nInvalid bucket name' in caplog.text
+
+
+class OfferUserSpendTests(TestCase):
+    """ Tests for the OfferUserSpend ledger. """
+
+    def setUp(self):
+        super(OfferUserSpendTests, self).setUp()
+        self.user = UserFactory()
+        self.offer = factories.ConditionalOfferFactory()
+
+    def get_ledger_total(self):
+        return OfferUserSpend.objects.get(offer=self.offer, user=self.user).total_discount
+
+    def test_updated_on_order_completion_and_refund(self):
+        """ Verify the ledger only counts the discounts of completed orders that were not refunded. """
+        order = factories.OrderFactory(user=self.user, status=ORDER.OPEN)
+        factories.OrderDiscountFactory(order=order, offer_id=self.offer.id, amount=10)
+        self.assertEqual(self.get_ledger_total(), 0)
+
+        order.status = ORDER.COMPLETE
+        order.save()
+        self.assertEqual(self.get_ledger_total(), 10)
+
+        other_order = factories.OrderFactory(user=self.user, status=ORDER.COMPLETE)
+        factories.OrderDiscountFactory(order=other_order, offer_id=self.offer.id, amount=30)
+        self.assertEqual(self.get_ledger_total(), 40)
+
+        RefundFactory(order=order, user=self.user, status=REFUND.COMPLETE)
+        self.assertEqual(self.get_ledger_total(), 30)
+
+    def test_not_updated_on_order_save_without_completion_change(self):
+        """ Verify saving an order only recomputes the ledger when the order is completed or uncompleted. """
+        order = factories.OrderFactory(user=self.user, status=ORDER.COMPLETE)
+        factories.OrderDiscountFactory(order=order, offer_id=self.offer.id, amount=10)
+
+        with mock.patch('ecommerce.extensions.offer.models.update_offer_user_spends') as mock_update:
+            order.guest_email = 'guest@example.com'
+            order.save()
+            Order.objects.get(id=order.id).save()
+            self.assertFalse(mock_update.called)
+
+        order.status = ORDER.FULFILLMENT_ERROR
+        order.save()
+        self.assertEqual(self.get_ledger_total(), 0)
+
+    def test_get_total_discount(self):
+        """ Verify missing entries are computed on first read, and later reads only read the ledger. """
+        order = factories.OrderFactory(user=self.user, status=ORDER.COMPLETE)
+        factories.OrderDiscountFactory(order=order, offer_id=self.offer.id, amount=20)
+        OfferUserSpend.objects.all().delete()
+
+        self.assertEqual(OfferUserSpend.get_total_discount(self.offer, self.user), 20)
+        with self.assertNumQueries(1):
+            self.assertEqual(OfferUserSpend.get_total_discount(self.offer, self.user), 20)
+
+        self.assertEqual(OfferUserSpend.get_total_discount(self.offer, None), 0)
@@ -14,11 +14,13 @@ from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.extensions.catalogue.tests.mixins import DiscoveryTestMixin
 from ecommerce.extensions.checkout.utils import add_currency
 from ecommerce.extensions.offer.utils import (
+    EmailDomainMatcher,
     SafeDict,
     _remove_exponent_and_trailing_zeros,
     format_assigned_offer_email,
     format_benefit_value,
     format_email,
+    get_email_domain_matcher,
     send_assigned_offer_email,
     send_assigned_offer_reminder_email,
     send_revoked_offer_email
@@ -564,3 +566,38 @@ class UtilTests(DiscoveryTestMixin, TestCase):
             More text.<br/>
             """
         self.assertEqual(email.split(), expected_email.split())
+
+
+@ddt.ddt
+class EmailDomainMatcherTests(TestCase):
+    """ Tests for EmailDomainMatcher. """
+
+    @ddt.data(
+        ('user@example.com', True),
+        ('user@sub.example.com', True),
+        ('user@sub1.sub2.example.com', True),
+        ('User@EXAMPLE.com', True),
+        ('user@sub.example2.com', True),
+        ('user@other.sub.example2.com', True),
+        ('user@b@example.com', True),
+        ('user@example2.com', False),
+        ('user@sub1.example2.com', False),
+        ('user@testsub.example2.com', False),
+        ('user@exampleXcom', False),
+        ('user@example.com.fake', False),
+        ('user@sub-1.example.com', False),
+        ('user@.example.com', False),
+        ('@example.com', False),
+        ('example.com', False),
+        ('', False),
+    )
+    @ddt.unpack
+    def test_matches(self, email, expected):
+        matcher = EmailDomainMatcher('example.com,sub.example2.com')
+        self.assertEqual(matcher.matches(email), expected)
+
+    def test_get_email_domain_matcher(self):
+        """ Verify matchers are shared by all the lists of the same domains. """
+        matcher = get_email_domain_matcher('example.com')
+        self.assertIs(get_email_domain_matcher('example.com'), matcher)
+        self.assertIsNot(get_email_domain_matcher('example.com,example.org'), matcher)
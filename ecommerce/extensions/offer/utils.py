@@ -2,8 +2,10 @@
 
 
 import logging
+import re
 import string  # pylint: disable=W0402
 from decimal import Decimal
+from functools import lru_cache
 from urllib.parse import urlencode
 
 import bleach
@@ -22,6 +24,8 @@ from ecommerce.extensions.offer.constants import OFFER_ASSIGNED
 
 logger = logging.getLogger(__name__)
 
+SUBDOMAIN_LABEL_PATTERN = re.compile(r'\w+')
+
 
 def _remove_exponent_and_trailing_zeros(decimal):
     """
@@ -406,3 +410,51 @@ def update_assignments_for_multi_use_per_customer(voucher):
                 for __ in range(offer_assignments_available)
             ]
             OfferAssignment.objects.bulk_create(assignments)
+
+
+class EmailDomainMatcher:
+    """
+    Matches email addresses against a comma-separated list of email domains.
+
+    An address matches a domain of the list if its own domain is that domain, or one of its subdomains. The domains
+    are stored in a trie of their labels, from the top level domain down, so matching an address costs one lookup
+    per label of its domain, regardless of the number of domains in the list.
+    """
+
+    DOMAIN_END = None
+
+    def __init__(self, email_domains):
+        self.trie = {}
+        for domain in email_domains.split(','):
+            node = self.trie
+            for label in reversed(domain.lower().split('.')):
+                node = node.setdefault(label, {})
+            node[self.DOMAIN_END] = True
+
+    def matches(self, email):
+        username, __, domain = email.rpartition('@')
+        if not username:
+            return False
+
+        labels = domain.lower().split('.')
+        node = self.trie
+        for index in range(len(labels) - 1, -1, -1):
+            node = node.get(labels[index])
+            if node is None:
+                return False
+
+            # The labels preceding an allowed domain are its subdomains, which may only contain word characters.
+            if self.DOMAIN_END in node and all(SUBDOMAIN_LABEL_PATTERN.fullmatch(label) for label in labels[:index]):
+                return True
+        return False
+
+
+@lru_cache(maxsize=1024)
+def get_email_domain_matcher(email_domains):
+    """
+    Returns the EmailDomainMatcher of the given comma-separated email domains.
+
+    Matchers are built once per distinct list of domains, and shared by all the offers restricted to it. Offers
+    whose email domains change use the matcher of their new list.
+    """
+    return EmailDomainMatcher(email_domains)
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-19 11:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0028_alter_lineattribute_value'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='line',
+            index=models.Index(fields=['partner_sku'], name='order_line_partner_cbb354_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='line',
+            index=models.Index(fields=['upc'], name='order_line_upc_2bc3ed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'date_placed'], name='order_order_status_b8ac37_idx'),
+        ),
+    ]
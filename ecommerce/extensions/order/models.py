@@ -14,6 +14,11 @@ class Order(AbstractOrder):
     partner = models.ForeignKey('partner.Partner', null=True, blank=True, on_delete=models.CASCADE)
     history = HistoricalRecords()
 
+    class Meta(AbstractOrder.Meta):
+        indexes = [
+            models.Index(fields=['status', 'date_placed']),
+        ]
+
     @property
     def is_fulfillable(self):
         """Returns a boolean indicating if order can be fulfilled."""
@@ -34,6 +39,12 @@ class Line(AbstractLine):
     effective_contract_discount_percentage = models.DecimalField(max_digits=8, decimal_places=5, null=True)
     effective_contract_discounted_price = models.DecimalField(max_digits=12, decimal_places=2, null=True)
 
+    class Meta(AbstractLine.Meta):
+        indexes = [
+            models.Index(fields=['partner_sku']),
+            models.Index(fields=['upc']),
+        ]
+
 
 class PaymentEvent(AbstractPaymentEvent):
     processor_name = models.CharField(_('Payment Processor'), max_length=32, blank=True, null=True)
@@ -2,27 +2,41 @@
 
 
 import logging
+from collections import defaultdict, namedtuple
+from decimal import Decimal
 
 import waffle
 from django.conf import settings
+from django.db import transaction
+from django.utils.timezone import now
 from edx_django_utils.cache import TieredCache
+from oscar.apps.order.signals import order_placed
 from oscar.apps.order.utils import OrderCreator as OscarOrderCreator
-from oscar.core.loading import get_model
+from oscar.core.loading import get_class, get_model
 from requests.exceptions import ConnectionError as ReqConnectionError  # pylint: disable=ungrouped-imports
 from requests.exceptions import ConnectTimeout, HTTPError
 from threadlocals.threadlocals import get_current_request
 
+from ecommerce.extensions.fulfillment.status import LINE, ORDER
 from ecommerce.extensions.order.constants import DISABLE_REPEAT_ORDER_CHECK_SWITCH_NAME
 from ecommerce.extensions.refund.status import REFUND_LINE
 from ecommerce.referrals.models import Referral
 
 logger = logging.getLogger(__name__)
 
+LinePrice = get_model('order', 'LinePrice')
+NoShippingRequired = get_class('shipping.methods', 'NoShippingRequired')
 Option = get_model('catalogue', 'Option')
 Order = get_model('order', 'Order')
+OrderDiscount = get_model('order', 'OrderDiscount')
 OrderLine = get_model('order', 'Line')
+OrderStatusChange = get_model('order', 'OrderStatusChange')
 RefundLine = get_model('refund', 'RefundLine')
 
+FreeOrderPlacement = namedtuple(
+    'FreeOrderPlacement', ['user', 'product', 'stockrecord', 'offer', 'unit_price', 'date_placed', 'line_fields']
+)
+
 
 class OrderNumberGenerator:
     OFFSET = 100000
@@ -126,6 +140,202 @@ class OrderCreator(OscarOrderCreator):
         return order
 
 
+class BulkFreeOrderCreator:
+    """
+    Places free orders of a single product in bulk, for order sources such as manual enrollments that bypass checkout.
+
+    Each FreeOrderPlacement is placed for its user, in a submitted basket of its own, with its product entirely
+    discounted by its offer. The baskets, lines, orders and discounts of all the placements are inserted with one
+    query per table, instead of the dozens of queries per order of OrderCreator.
+
+    `unit_price` is the price of the product before the discount, which defaults to the stock record price, and
+    `line_fields` are set on the order line. Orders are placed, and their lines set, in the given statuses directly,
+    recording a single status change from the initial order status.
+    """
+
+    def place_orders(self, site, placements, status=ORDER.COMPLETE, line_status=LINE.COMPLETE):
+        """
+        Place an order for each of the given placements, and return the orders in the same order.
+        """
+        if not placements:
+            return []
+
+        with transaction.atomic():
+            baskets = self._create_baskets(site, placements)
+            self._create_basket_lines(baskets, placements)
+            orders = self._create_orders(site, baskets, placements, status)
+            lines = self._create_order_lines(orders, placements, line_status)
+            self._create_order_models(orders, lines, placements, status)
+            self._record_offer_usage(orders, placements)
+
+        for order, placement in zip(orders, placements):
+            order_placed.send(sender=self, order=order, user=placement.user)
+
+        return orders
+
+    @staticmethod
+    def _get_price(placement):
+        return placement.stockrecord.price or Decimal('0.00')
+
+    @staticmethod
+    def _create_baskets(site, placements):
+        """
+        Create a submitted basket for each placement.
+
+        Bulk inserts do not return primary keys on MySQL, so the baskets are read back by their submission time. The
+        baskets of a user are identical, so it does not matter which of them is matched to which placement.
+        """
+        # The basket models load this module, so they can only be looked up once it is loaded.
+        Basket = get_model('basket', 'Basket')
+        submitted_at = now()
+        baskets = Basket.objects.bulk_create([
+            Basket(owner=placement.user, site=site, status=Basket.SUBMITTED, date_submitted=submitted_at)
+            for placement in placements
+        ])
+        if all(basket.pk for basket in baskets):
+            return baskets
+
+        owner_baskets = defaultdict(list)
+        for basket in Basket.objects.filter(
+                site=site,
+                status=Basket.SUBMITTED,
+                date_submitted=submitted_at,
+                owner_id__in={placement.user.id for placement in placements},
+        ).order_by('id'):
+            owner_baskets[basket.owner_id].append(basket)
+        return [owner_baskets[placement.user.id].pop(0) for placement in placements]
+
+    def _create_basket_lines(self, baskets, placements):
+        BasketLine = get_model('basket', 'Line')
+        BasketLine.objects.bulk_create([
+            BasketLine(
+                basket=basket,
+                line_reference='{}_{}'.format(placement.product.id, placement.stockrecord.id),
+                product=placement.product,
+                stockrecord=placement.stockrecord,
+                quantity=1,
+                price_currency=placement.stockrecord.price_currency,
+                price_excl_tax=self._get_price(placement),
+                price_incl_tax=self._get_price(placement),
+            )
+            for basket, placement in zip(baskets, placements)
+        ])
+
+    @staticmethod
+    def _create_orders(site, baskets, placements, status):
+        partner = site.siteconfiguration.partner
+        shipping_method = NoShippingRequired()
+        number_generator = OrderNumberGenerator()
+        placed_at = now()
+
+        orders = [
+            Order(
+                basket=basket,
+                number=number_generator.order_number_from_basket_id(partner, basket.id),
+                site=site,
+                partner=partner,
+                currency=placement.stockrecord.price_currency,
+                total_incl_tax=Decimal('0.00'),
+                total_excl_tax=Decimal('0.00'),
+                shipping_incl_tax=Decimal('0.00'),
+                shipping_excl_tax=Decimal('0.00'),
+                shipping_method=shipping_method.name,
+                shipping_code=shipping_method.code,
+                user=placement.user,
+                status=status,
+                date_placed=placement.date_placed or placed_at,
+            )
+            for basket, placement in zip(baskets, placements)
+        ]
+        Order.objects.bulk_create(orders)
+
+        # Order numbers are unique, so they identify the inserted orders on databases that do not return their keys.
+        if not all(order.pk for order in orders):
+            created_orders = Order.objects.in_bulk([order.number for order in orders], field_name='number')
+            orders = [created_orders[order.number] for order in orders]
+        Order.history.bulk_history_create(orders)
+        return orders
+
+    def _create_order_lines(self, orders, placements, line_status):
+        lines = [
+            OrderLine(
+                order=order,
+                partner=placement.stockrecord.partner,
+                partner_name=placement.stockrecord.partner.name,
+                partner_sku=placement.stockrecord.partner_sku,
+                stockrecord=placement.stockrecord,
+                product=placement.product,
+                title=placement.product.get_title(),
+                upc=placement.product.upc,
+                quantity=1,
+                line_price_excl_tax=Decimal('0.00'),
+                line_price_incl_tax=Decimal('0.00'),
+                line_price_before_discounts_excl_tax=placement.unit_price,
+                line_price_before_discounts_incl_tax=placement.unit_price,
+                unit_price_excl_tax=placement.unit_price,
+                unit_price_incl_tax=placement.unit_price,
+                status=line_status,
+                **placement.line_fields
+            )
+            for order, placement in zip(orders, placements)
+        ]
+        OrderLine.objects.bulk_create(lines)
+
+        if not all(line.pk for line in lines):
+            order_lines = {line.order_id: line for line in OrderLine.objects.filter(order__in=orders)}
+            lines = [order_lines[order.id] for order in orders]
+        OrderLine.history.bulk_history_create(lines)
+        return lines
+
+    def _create_order_models(self, orders, lines, placements, status):
+        """
+        Create the line prices, discounts and status changes of the orders.
+        """
+        LinePrice.objects.bulk_create([
+            LinePrice(
+                order=order, line=line, quantity=1, price_incl_tax=Decimal('0.00'), price_excl_tax=Decimal('0.00')
+            )
+            for order, line in zip(orders, lines)
+        ])
+
+        OrderDiscount.objects.bulk_create([
+            OrderDiscount(
+                order=order,
+                offer_id=placement.offer.id,
+                offer_name=placement.offer.name,
+                frequency=1,
+                amount=self._get_price(placement),
+            )
+            for order, placement in zip(orders, placements)
+        ])
+        OrderDiscount.history.bulk_history_create(OrderDiscount.objects.filter(order__in=orders))
+
+        initial_status = getattr(settings, 'OSCAR_INITIAL_ORDER_STATUS', '')
+        if status != initial_status:
+            OrderStatusChange.objects.bulk_create([
+                OrderStatusChange(order=order, old_status=initial_status, new_status=status) for order in orders
+            ])
+
+    def _record_offer_usage(self, orders, placements):
+        """
+        Record the usage of each offer once for all its orders, and update the ledger of its users' discounts.
+        """
+        ConditionalOffer = get_model('offer', 'ConditionalOffer')
+        OfferUserSpend = get_model('offer', 'OfferUserSpend')
+        offer_placements = defaultdict(list)
+        for order, placement in zip(orders, placements):
+            offer_placements[placement.offer.id].append((order, placement))
+
+        for offer_id, applications in offer_placements.items():
+            offer = ConditionalOffer.objects.select_for_update().get(id=offer_id)
+            offer.num_applications += len(applications)
+            offer.num_orders += len(applications)
+            offer.total_discount += sum(self._get_price(placement) for __, placement in applications)
+            offer.save()
+
+            OfferUserSpend.update_users(offer_id, [order.user_id for order, __ in applications])
+
+
 class UserAlreadyPlacedOrder:
     """
     Provides utils methods to check if user has already placed an order
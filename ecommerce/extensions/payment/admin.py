@@ -7,7 +7,7 @@ from oscar.apps.payment.admin import *  # noqa pylint: disable=wildcard-import,u
 from oscar.core.loading import get_model
 from solo.admin import SingletonModelAdmin
 
-from ecommerce.extensions.payment.models import SDNCheckFailure
+from ecommerce.extensions.payment.models import SDNCheckFailure, StripeWebhookEvent
 
 PaymentProcessorResponse = get_model('payment', 'PaymentProcessorResponse')
 PaypalProcessorConfiguration = get_model('payment', 'PaypalProcessorConfiguration')
@@ -51,4 +51,15 @@ class SDNCheckFailureAdmin(admin.ModelAdmin):
         return format_html('<br><br><pre>{}</pre>', pretty_response)
 
 
+@admin.register(StripeWebhookEvent)
+class StripeWebhookEventAdmin(admin.ModelAdmin):
+    list_filter = ('status', 'event_type')
+    search_fields = ('event_id', 'payment_intent_id', 'order_number')
+    list_display = ('event_id', 'event_type', 'payment_intent_id', 'order_number', 'status', 'attempts', 'created')
+    readonly_fields = (
+        'event_id', 'event_type', 'payment_intent_id', 'order_number', 'amount', 'attempts', 'processed_at',
+    )
+    show_full_result_count = False
+
+
 admin.site.register(PaypalProcessorConfiguration, SingletonModelAdmin)
@@ -0,0 +1,51 @@
+"""
+Compressed archive storage for PaymentProcessorResponse rows.
+
+Archives are gzip-compressed files with one JSON object per line (JSONL), written to the storage configured by
+PAYMENT_PROCESSOR_RESPONSE_ARCHIVE_STORAGE, or to the default file storage (e.g. S3) if it is not set.
+"""
+
+
+import gzip
+import json
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage, get_storage_class
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+def get_archive_storage():
+    storage_class = getattr(settings, 'PAYMENT_PROCESSOR_RESPONSE_ARCHIVE_STORAGE', None)
+    if storage_class:
+        return get_storage_class(storage_class)()
+    return default_storage
+
+
+def write_archive(name, records):
+    """
+    Writes records to a new compressed archive.
+
+    Arguments:
+        name (str): Name of the archive, relative to PAYMENT_PROCESSOR_RESPONSE_ARCHIVE_PREFIX.
+        records (list): JSON-serializable dicts, each of which must have an `id` key.
+
+    Returns:
+        str: Path of the archive in the archive storage.
+    """
+    lines = ''.join(json.dumps(record, cls=DjangoJSONEncoder) + '\n' for record in records)
+    path = '{prefix}/{name}'.format(prefix=settings.PAYMENT_PROCESSOR_RESPONSE_ARCHIVE_PREFIX, name=name)
+    return get_archive_storage().save(path, ContentFile(gzip.compress(lines.encode('utf-8'))))
+
+
+def read_archived_record(path, record_id):
+    """
+    Returns the record with the given ID from an archive, or None if the archive does not contain it.
+    """
+    with get_archive_storage().open(path, 'rb') as archive:
+        with gzip.open(archive, 'rt', encoding='utf-8') as lines:
+            for line in lines:
+                record = json.loads(line)
+                if record['id'] == record_id:
+                    return record
+    return None
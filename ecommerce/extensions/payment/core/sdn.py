@@ -4,14 +4,23 @@ import io
 import logging
 import re
 import string
+import threading
+import time
 import unicodedata
+from array import array
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
 from urllib.parse import urlencode
 
 import pycountry
 import requests
 from django.conf import settings
 from django.contrib.auth import logout
+from django.core.cache import cache
+from django.db import transaction
 from oscar.core.loading import get_model
 from requests.exceptions import HTTPError, Timeout
 
@@ -25,6 +34,14 @@ BasketAttributeType = get_model('basket', 'BasketAttributeType')
 
 COUNTRY_CODES = {country.alpha_2 for country in pycountry.countries}
 
+SDN_FALLBACK_SOURCE = 'Specially Designated Nationals (SDN) - Treasury Department'
+SDN_FALLBACK_TYPE = 'Individual'
+SDN_FALLBACK_VERSION_CACHE_KEY = 'sdn_fallback_dataset_version'
+SDN_FALLBACK_IMPORT_BATCH_SIZE = 1000
+
+_sdn_fallback_dataset = None
+_sdn_fallback_dataset_lock = threading.Lock()
+
 
 def checkSDN(request, name, city, country):
     """
@@ -80,8 +97,11 @@ def checkSDNFallback(name, city, country):
     """
     Performs an SDN check against the SDNFallbackData
 
-    First, filter the SDNFallbackData records by source, type and country.
-    Then, compare the provided name/city against each record and return whether we find a match.
+    The check runs against the in-memory SDNFallbackDataset of the current import, so it does not query the
+    database unless the dataset needs to be (re)loaded.
+
+    First, select the records of the given country. Then, compare the provided name/city against each record
+    and return whether we find a match.
     The check uses the following properties:
         1. Order of words doesn’t matter
         2. Number of times that a given word appears doesn’t matter
@@ -89,17 +109,117 @@ def checkSDNFallback(name, city, country):
         4. If a subset of words match, it still counts as a match
         5. Capitalization doesn’t matter
     """
-    hit_count = 0
-    records = SDNFallbackData.get_current_records_and_filter_by_source_and_type(
-        'Specially Designated Nationals (SDN) - Treasury Department', 'Individual'
-    )
-    records = records.filter(countries__contains=country)
-    processed_name, processed_city = process_text(name), process_text(city)
-    for record in records:
-        record_names, record_addresses = set(record.names.split()), set(record.addresses.split())
-        if (processed_name.issubset(record_names) and processed_city.issubset(record_addresses)):
-            hit_count = hit_count + 1
-    return hit_count
+    dataset = get_sdn_fallback_dataset()
+    return dataset.count_hits(set(process_text(name)), set(process_text(city)), country)
+
+
+class SDNFallbackDataset:
+    """
+    Compact, read-only copy of the SDN fallback records checked by checkSDNFallback.
+
+    Only the individuals of the Treasury Department SDN list are kept. Their name and address words are interned
+    as integer ids, and each record is stored as two sorted arrays of word ids under every country it is
+    associated with.
+
+    Arguments:
+        version (str): Checksum of the imported SDN csv.
+        records (iterable): (names, addresses, countries) space separated strings of each record.
+    """
+
+    def __init__(self, version, records):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.token_ids = {}
+
+        records_by_country = defaultdict(list)
+        for names, addresses, countries in records:
+            record = (self._intern(names), self._intern(addresses))
+            for country in set(countries.split()):
+                records_by_country[country].append(record)
+        self.records_by_country = {country: tuple(records) for country, records in records_by_country.items()}
+
+    def _intern(self, text):
+        token_ids = {self.token_ids.setdefault(token, len(self.token_ids)) for token in text.split()}
+        return array('I', sorted(token_ids))
+
+    def _get_token_ids(self, tokens):
+        """ Returns the ids of the given words, or None if any of them is not part of any record. """
+        try:
+            return {self.token_ids[token] for token in tokens}
+        except KeyError:
+            return None
+
+    def count_hits(self, name_tokens, city_tokens, country):
+        """
+        Returns the number of records of the given country whose names and addresses contain all the given words.
+        """
+        name_ids, city_ids = self._get_token_ids(name_tokens), self._get_token_ids(city_tokens)
+        if name_ids is None or city_ids is None:
+            return 0
+
+        return sum(
+            1 for record_names, record_addresses in self.records_by_country.get(country, ())
+            if name_ids.issubset(record_names) and city_ids.issubset(record_addresses)
+        )
+
+    def is_expired(self):
+        return time.monotonic() - self.loaded_at > settings.SDN_FALLBACK_DATASET_MAX_AGE
+
+
+def load_sdn_fallback_dataset():
+    """
+    Loads the SDNFallbackDataset of the current SDN fallback import from the database.
+
+    Raises:
+        SDNFallbackDataEmptyError: If there is no current import.
+    """
+    current_metadata = SDNFallbackMetadata.get_current_metadata()
+    records = SDNFallbackData.objects.filter(
+        sdn_fallback_metadata=current_metadata, source=SDN_FALLBACK_SOURCE, sdn_type=SDN_FALLBACK_TYPE
+    ).values_list('names', 'addresses', 'countries').iterator()
+    dataset = SDNFallbackDataset(current_metadata.file_checksum, records)
+
+    # Workers that have not been notified of any import yet are notified of the one found in the database.
+    cache.add(SDN_FALLBACK_VERSION_CACHE_KEY, dataset.version, None)
+    return dataset
+
+
+def get_sdn_fallback_dataset():
+    """
+    Returns the SDNFallbackDataset of the current SDN fallback import.
+
+    The dataset is loaded once per process, and reloaded when a new import is published in the cache by
+    populate_sdn_fallback_data_and_metadata, or when it is older than SDN_FALLBACK_DATASET_MAX_AGE.
+    """
+    global _sdn_fallback_dataset  # pylint: disable=global-statement
+
+    dataset = _sdn_fallback_dataset
+    if dataset is not None and not dataset.is_expired():
+        published_version = cache.get(SDN_FALLBACK_VERSION_CACHE_KEY)
+        if published_version is None or published_version == dataset.version:
+            return dataset
+
+    with _sdn_fallback_dataset_lock:
+        # Another thread may have reloaded the dataset while this one was waiting for the lock.
+        if _sdn_fallback_dataset is dataset:
+            _sdn_fallback_dataset = load_sdn_fallback_dataset()
+            logger.info(
+                'SDNFallback: Loaded %d countries of SDN fallback data, version %s.',
+                len(_sdn_fallback_dataset.records_by_country),
+                _sdn_fallback_dataset.version
+            )
+        return _sdn_fallback_dataset
+
+
+def clear_sdn_fallback_dataset():
+    """ Discards the SDNFallbackDataset of this process, so that the next check loads it again. """
+    global _sdn_fallback_dataset  # pylint: disable=global-statement
+    _sdn_fallback_dataset = None
+
+
+def publish_sdn_fallback_version(version):
+    """ Notifies all processes that the given SDN fallback import is now the current one. """
+    cache.set(SDN_FALLBACK_VERSION_CACHE_KEY, version, None)
 
 
 class SDNClient:
@@ -188,6 +308,7 @@ class SDNClient:
         basket.owner.deactivate_account(site.siteconfiguration)
 
 
+@lru_cache(maxsize=4096)
 def transliterate_text(text):
     """
     Transliterate unicode characters into ascii (such as accented characters into non-accented
@@ -285,50 +406,108 @@ def populate_sdn_fallback_metadata(sdn_csv_string):
     return metadata_entry
 
 
-def populate_sdn_fallback_data(sdn_csv_string, metadata_entry):
+def process_sdn_csv_row(row):
+    """
+    Process a row of the sdn csv into the field values of its SDNFallbackData record.
+
+    Args:
+        row (dict): Row of the sdn csv
+
+    Returns:
+        tuple: source, sdn_type, names, addresses and countries of the record
+    """
+    sdn_source, sdn_type, names, addresses, alt_names, ids = (
+        row['source'] or '', row['type'] or '', row['name'] or '',
+        row['addresses'] or '', row['alt_names'] or '', row['ids'] or ''
+    )
+    processed_names = ' '.join(process_text(' '.join(filter(None, [names, alt_names]))))
+    processed_addresses = ' '.join(process_text(addresses))
+    countries = extract_country_information(addresses, ids)
+    return sdn_source, sdn_type, processed_names, processed_addresses, countries
+
+
+def populate_sdn_fallback_data(sdn_csv, metadata_entry, batch_size=SDN_FALLBACK_IMPORT_BATCH_SIZE, workers=1):
     """
     Process CSV data and create SDNFallbackData records
 
+    The csv is read and inserted in batches of rows, so that only one batch is held in memory at a time.
+
     Args:
-        sdn_csv_string (str): String of the sdn csv
+        sdn_csv (str|file): String of the sdn csv, or text file object to read it from
         metadata_entry (SDNFallbackMetadata): Instance of the current SDNFallbackMetadata class
+        batch_size (int): Number of rows processed and inserted at once
+        workers (int): Number of processes the rows are processed in. Rows are processed in this process if 1.
+
+    Returns:
+        int: Number of imported records
     """
-    sdn_csv_reader = csv.DictReader(io.StringIO(sdn_csv_string))
-    processed_records = []
-    for row in sdn_csv_reader:
-        sdn_source, sdn_type, names, addresses, alt_names, ids = (
-            row['source'] or '', row['type'] or '', row['name'] or '',
-            row['addresses'] or '', row['alt_names'] or '', row['ids'] or ''
-        )
-        processed_names = ' '.join(process_text(' '.join(filter(None, [names, alt_names]))))
-        processed_addresses = ' '.join(process_text(addresses))
-        countries = extract_country_information(addresses, ids)
-        processed_records.append(SDNFallbackData(
-            sdn_fallback_metadata=metadata_entry,
-            source=sdn_source,
-            sdn_type=sdn_type,
-            names=processed_names,
-            addresses=processed_addresses,
-            countries=countries
-        ))
-    # Bulk create should be more efficient for a few thousand records without needing to use SQL directly.
-    SDNFallbackData.objects.bulk_create(processed_records)
-
-
-def populate_sdn_fallback_data_and_metadata(sdn_csv_string):
+    if isinstance(sdn_csv, str):
+        sdn_csv = io.StringIO(sdn_csv)
+    rows = csv.DictReader(sdn_csv)
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    imported_count = 0
+    try:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+
+            if executor:
+                processed_rows = executor.map(process_sdn_csv_row, batch, chunksize=max(1, len(batch) // workers))
+            else:
+                processed_rows = map(process_sdn_csv_row, batch)
+
+            SDNFallbackData.objects.bulk_create([
+                SDNFallbackData(
+                    sdn_fallback_metadata=metadata_entry,
+                    source=sdn_source,
+                    sdn_type=sdn_type,
+                    names=names,
+                    addresses=addresses,
+                    countries=countries
+                )
+                for sdn_source, sdn_type, names, addresses, countries in processed_rows
+            ])
+            imported_count += len(batch)
+            logger.info('SDNFallback: Imported %d records for metadata id %s.', imported_count, metadata_entry.id)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return imported_count
+
+
+@transaction.atomic
+def populate_sdn_fallback_data_and_metadata(
+    sdn_csv, file_checksum=None, batch_size=SDN_FALLBACK_IMPORT_BATCH_SIZE, workers=1
+):
     """
     1. Create the SDNFallbackMetadata entry
     2. Populate the SDNFallbackData from the csv
 
+    The import is atomic, so a failed import leaves no partial data behind and can simply be run again.
+
     Args:
-        sdn_csv_string (str): String of the sdn csv
+        sdn_csv (str|file): String of the sdn csv, or text file object to read it from
+        file_checksum (str): SHA-256 hex digest of the csv. Required if sdn_csv is a file.
+        batch_size (int): Number of rows processed and inserted at once
+        workers (int): Number of processes the rows are processed in
     """
-    metadata_entry = populate_sdn_fallback_metadata(sdn_csv_string)
+    if file_checksum is None:
+        metadata_entry = populate_sdn_fallback_metadata(sdn_csv)
+    else:
+        metadata_entry = SDNFallbackMetadata.insert_new_sdn_fallback_metadata_entry(file_checksum)
     if metadata_entry:
-        populate_sdn_fallback_data(sdn_csv_string, metadata_entry)
+        populate_sdn_fallback_data(sdn_csv, metadata_entry, batch_size=batch_size, workers=workers)
         # Once data is successfully imported, update the metadata import timestamp and state
         now = datetime.now(timezone.utc)
         metadata_entry.import_timestamp = now
         metadata_entry.save()
         metadata_entry.swap_all_states()
+
+        clear_sdn_fallback_dataset()
+        # Other processes must not load the new import before it is committed.
+        file_checksum = metadata_entry.file_checksum
+        transaction.on_commit(lambda: publish_sdn_fallback_version(file_checksum))
     return metadata_entry
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import io
 import json
 import logging
 import random
@@ -9,15 +10,18 @@ import ddt
 import mock
 import responses
 from django.contrib.sessions.middleware import SessionMiddleware
-from django.test import RequestFactory
+from django.core.cache import cache
+from django.test import RequestFactory, override_settings
 from oscar.test import factories
 from requests.exceptions import HTTPError, Timeout
 
 from ecommerce.core.models import User
 from ecommerce.extensions.payment.core.sdn import (
+    SDN_FALLBACK_VERSION_CACHE_KEY,
     SDNClient,
     checkSDN,
     checkSDNFallback,
+    clear_sdn_fallback_dataset,
     extract_country_information,
     populate_sdn_fallback_data,
     populate_sdn_fallback_data_and_metadata,
@@ -265,6 +269,25 @@ Joshuafort, MD 72104, TH",,,,,,,,,,,,,,https://banks-bender.com/,Michael Anderso
         populate_sdn_fallback_data(csv, metadata)
         self.assertEqual(len(SDNFallbackData.objects.filter()), 30)
 
+    @ddt.data(1, 2)
+    def test_populate_sdn_fallback_data_batches(self, workers):
+        """ Verify that a csv file is imported in batches, with its rows processed by the given number of processes """
+        metadata = populate_sdn_fallback_metadata('test')
+        csv_file = io.StringIO(self.csv_header + '\n'.join(
+            ',Specially Designated Nationals (SDN) - Treasury Department,,Individual,,'
+            'Jöhn Doe {},,"Paris, FR"'.format(i)
+            for i in range(5)
+        ))
+
+        with mock.patch('ecommerce.extensions.payment.core.sdn.logger.info') as mock_logger:
+            self.assertEqual(populate_sdn_fallback_data(csv_file, metadata, batch_size=2, workers=workers), 5)
+
+        self.assertEqual(mock_logger.call_count, 3)
+        self.assertCountEqual(
+            [(set(record.names.split()), record.countries) for record in SDNFallbackData.objects.all()],
+            [({'john', 'doe', str(i)}, 'FR') for i in range(5)]
+        )
+
     def test_populate_sdn_fallback_data_empty(self):
         """ Verify that we are able to correctly import empty data entries """
         metadata = populate_sdn_fallback_metadata('test')
@@ -519,8 +542,43 @@ Port Andrewport, OR 39456, EE",,,,,,,,,,,,,,http://douglas.com/,Misty Johnson,CV
         sdn_fallback_hit_count = checkSDNFallback('Juan Cruz', 'North Kristinaport', 'SN')
         self.assertEqual(sdn_fallback_hit_count, 2)
 
+    def test_sdn_fallback_dataset(self):
+        """
+        Verify checkSDNFallback loads the current import once, and reloads it when a new import is published.
+        """
+        # pylint: disable=line-too-long
+        csv_string = self.csv_header + """94734218,Specially Designated Nationals (SDN) - Treasury Department,96663868,Individual,material,Juan M. de la Cruz,Dr.,"17472 Christie Stream Apt. 976 North Kristinaport, HI 91033, SN",,,,,,,,,,,,,,https://www.juarez-collier.org/,Wendy Brock,DJ,1944-03-05,Faroe Islands,PK,http://richardson-richardson.org/,"CI; MX, 1234\""""
+        # pylint: enable=line-too-long
+        with self.captureOnCommitCallbacks(execute=True):
+            metadata_entry = populate_sdn_fallback_data_and_metadata(csv_string)
+        self.assertEqual(cache.get(SDN_FALLBACK_VERSION_CACHE_KEY), metadata_entry.file_checksum)
+
+        self.assertEqual(checkSDNFallback('Juan Cruz', 'North Kristinaport', 'SN'), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(checkSDNFallback('Juan Cruz', 'North Kristinaport', 'MX'), 1)
+            self.assertEqual(checkSDNFallback('Juan Cruz', 'Kristinaport', 'CI'), 0)
+            self.assertEqual(checkSDNFallback('Juan Cruz', 'Unknown', 'SN'), 0)
+
+        # Another process imported a new csv without this record.
+        SDNFallbackData.objects.all().delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(checkSDNFallback('Juan Cruz', 'North Kristinaport', 'SN'), 1)
+        cache.set(SDN_FALLBACK_VERSION_CACHE_KEY, 'new-checksum', None)
+        self.assertEqual(checkSDNFallback('Juan Cruz', 'North Kristinaport', 'SN'), 0)
+
+    def test_sdn_fallback_dataset_expired(self):
+        """ Verify the dataset is reloaded once it is older than its maximum age. """
+        checkSDNFallback('Juan Cruz', 'North Kristinaport', 'SN')
+        with override_settings(SDN_FALLBACK_DATASET_MAX_AGE=-1):
+            with self.assertNumQueries(2):
+                checkSDNFallback('Juan Cruz', 'North Kristinaport', 'SN')
+
 
 class SDNFallbackTestsWithoutSetup(TestCase):
+    def setUp(self):
+        super(SDNFallbackTestsWithoutSetup, self).setUp()
+        clear_sdn_fallback_dataset()
+
     def test_SDNFallback_empty_data(self):
         """
         when checkSDNFallback is called and data isn't populated, we throw the expected Exception
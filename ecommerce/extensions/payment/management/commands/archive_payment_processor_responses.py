@@ -0,0 +1,115 @@
+"""
+Management command that moves old PaymentProcessorResponse rows to compressed archive storage.
+"""
+
+
+import datetime
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from ecommerce.extensions.catalogue.management.utils import BatchProgress, iterate_pk_batches
+from ecommerce.extensions.payment.archive import write_archive
+from ecommerce.extensions.payment.models import ArchivedPaymentProcessorResponse, PaymentProcessorResponse
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = """
+    Move payment processor responses older than the given number of days to compressed archive storage.
+
+    Each batch of responses is written to a gzip-compressed JSONL archive. The responses are then replaced by
+    ArchivedPaymentProcessorResponse rows, which only keep the fields used to look them up, so that
+    PaymentProcessorResponse.get_for_transaction can still find them.
+
+    Responses with a PaymentProcessorResponseExtension are not archived, since the in-app purchase processors look
+    up the original transaction ID of the extension to detect receipts that were already fulfilled.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            dest='days',
+            type=int,
+            required=True,
+            help='Archive responses created more than this many days ago.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            dest='batch_size',
+            type=int,
+            default=1000,
+            help='Number of responses written to each archive.'
+        )
+        parser.add_argument(
+            '--dry-run',
+            dest='dry_run',
+            action='store_true',
+            default=False,
+            help='Only count the responses that would be archived.'
+        )
+
+    def handle(self, *args, **options):
+        days = options['days']
+        batch_size = options['batch_size']
+        if days < 1 or batch_size < 1:
+            raise CommandError('--days and --batch-size must be positive.')
+
+        cutoff = timezone.now() - datetime.timedelta(days=days)
+        # Deleting a response would cascade to its extension, which the archive does not keep.
+        queryset = PaymentProcessorResponse.objects.filter(created__lt=cutoff, extension__isnull=True)
+        if options['dry_run']:
+            logger.info('%d payment processor responses created before %s would be archived.',
+                        queryset.count(), cutoff)
+            return
+
+        progress = BatchProgress('archive_payment_processor_responses')
+        for responses in iterate_pk_batches(queryset, batch_size):
+            self._archive(responses)
+            progress.record(succeeded=len(responses))
+        progress.log_summary()
+
+    def _archive(self, responses):
+        """
+        Writes a batch of responses to an archive, then replaces them with their archive index rows.
+
+        The archive is written first, so responses are never deleted before they have been archived. If the
+        command is interrupted in between, the responses are archived again, to a new archive, on the next run.
+        """
+        archive_path = write_archive(
+            '{date}/{first}-{last}.jsonl.gz'.format(
+                date=responses[0].created.strftime('%Y-%m-%d'),
+                first=responses[0].id,
+                last=responses[-1].id,
+            ),
+            [
+                {
+                    'id': response.id,
+                    'processor_name': response.processor_name,
+                    'transaction_id': response.transaction_id,
+                    'basket_id': response.basket_id,
+                    'created': response.created,
+                    'response': response.response,
+                }
+                for response in responses
+            ]
+        )
+
+        with transaction.atomic():
+            ArchivedPaymentProcessorResponse.objects.bulk_create(
+                [
+                    ArchivedPaymentProcessorResponse(
+                        response_id=response.id,
+                        processor_name=response.processor_name,
+                        transaction_id=response.transaction_id,
+                        basket_id=response.basket_id,
+                        created=response.created,
+                        archive_path=archive_path,
+                    )
+                    for response in responses
+                ]
+            )
+            PaymentProcessorResponse.objects.filter(id__in=[response.id for response in responses]).delete()
@@ -0,0 +1,56 @@
+"""
+Management command that handles the Stripe webhook events stored by StripeWebhooksView.
+"""
+
+
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from ecommerce.extensions.payment.webhooks import process_pending_webhook_events
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Process stored Stripe webhook events.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            dest='batch_size',
+            type=int,
+            default=100,
+            help='Maximum number of events to process per batch.'
+        )
+        parser.add_argument(
+            '--max-attempts',
+            dest='max_attempts',
+            type=int,
+            default=5,
+            help='Number of times a failing event is attempted before it is left for manual review.'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            dest='poll_interval',
+            type=float,
+            default=0,
+            help='Seconds to wait for new events once all stored events have been processed. '
+                 'If not set, the command exits once all stored events have been processed.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        max_attempts = options['max_attempts']
+        poll_interval = options['poll_interval']
+
+        while True:
+            results = process_pending_webhook_events(batch_size=batch_size, max_attempts=max_attempts)
+            if results:
+                logger.info('Processed Stripe webhook events: %s.', results)
+
+            if sum(results.values()) < batch_size:
+                if not poll_interval:
+                    break
+                time.sleep(poll_interval)
@@ -0,0 +1,92 @@
+import datetime
+import shutil
+import tempfile
+
+import mock
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+from oscar.test.factories import BasketFactory
+
+from ecommerce.extensions.iap.models import PaymentProcessorResponseExtension
+from ecommerce.extensions.iap.processors.ios_iap import IOSIAP
+from ecommerce.extensions.payment.models import ArchivedPaymentProcessorResponse, PaymentProcessorResponse
+from ecommerce.tests.testcases import TestCase
+
+
+class ArchivePaymentProcessorResponsesTests(TestCase):
+    """ Tests for the archive_payment_processor_responses management command. """
+    command = 'archive_payment_processor_responses'
+
+    def setUp(self):
+        super(ArchivePaymentProcessorResponsesTests, self).setUp()
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+        patcher = mock.patch(
+            'ecommerce.extensions.payment.archive.get_archive_storage',
+            return_value=FileSystemStorage(location=self.archive_dir)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.basket = BasketFactory()
+        self.old_responses = [
+            self.create_response('txn-{}'.format(index), days_old=100) for index in range(5)
+        ]
+        self.recent_response = self.create_response('txn-recent', days_old=1)
+
+    def create_response(self, transaction_id, days_old):
+        response = PaymentProcessorResponse.objects.create(
+            processor_name='android-iap',
+            transaction_id=transaction_id,
+            basket=self.basket,
+            response={'transaction_id': transaction_id, 'state': 'approved'},
+        )
+        # The created field is set automatically when the response is created.
+        PaymentProcessorResponse.objects.filter(id=response.id).update(
+            created=timezone.now() - datetime.timedelta(days=days_old)
+        )
+        return response
+
+    def test_archive(self):
+        """ Verify old responses are moved to the archive, and can still be looked up. """
+        call_command(self.command, days=30, batch_size=2)
+
+        self.assertEqual(list(PaymentProcessorResponse.objects.all()), [self.recent_response])
+        self.assertEqual(ArchivedPaymentProcessorResponse.objects.count(), 5)
+        self.assertEqual(ArchivedPaymentProcessorResponse.objects.values('archive_path').distinct().count(), 3)
+
+        archived = PaymentProcessorResponse.get_for_transaction('android-iap', 'txn-3')
+        self.assertEqual(archived.id, self.old_responses[3].id)
+        self.assertEqual(archived.basket, self.basket)
+        self.assertEqual(archived.response, {'transaction_id': 'txn-3', 'state': 'approved'})
+        self.assertTrue(PaymentProcessorResponse.transaction_exists('android-iap', 'txn-3'))
+
+        self.assertEqual(PaymentProcessorResponse.get_for_transaction('android-iap', 'txn-recent'), self.recent_response)
+        self.assertIsNone(PaymentProcessorResponse.get_for_transaction('android-iap', 'txn-unknown'))
+        self.assertFalse(PaymentProcessorResponse.transaction_exists('ios-iap', 'txn-3'))
+
+    def test_responses_with_extension_not_archived(self):
+        """ Verify iOS responses keep their extension, so that their receipts are still detected as redundant. """
+        ios_response = self.create_response('txn-ios', days_old=100)
+        PaymentProcessorResponse.objects.filter(id=ios_response.id).update(processor_name=IOSIAP.NAME)
+        PaymentProcessorResponseExtension.objects.create(
+            processor_response=ios_response, original_transaction_id='original-txn-ios'
+        )
+
+        call_command(self.command, days=30)
+
+        self.assertTrue(PaymentProcessorResponse.objects.filter(id=ios_response.id).exists())
+        self.assertFalse(ArchivedPaymentProcessorResponse.objects.filter(response_id=ios_response.id).exists())
+        self.assertTrue(IOSIAP(self.site).is_payment_redundant(original_transaction_id='original-txn-ios'))
+
+    def test_dry_run(self):
+        """ Verify nothing is archived in dry run mode. """
+        call_command(self.command, days=30, dry_run=True)
+        self.assertEqual(PaymentProcessorResponse.objects.count(), 6)
+        self.assertFalse(ArchivedPaymentProcessorResponse.objects.exists())
+
+    def test_invalid_days(self):
+        with self.assertRaises(CommandError):
+            call_command(self.command, days=0)
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:22
+
+from django.db import migrations, models
+import django_extensions.db.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payment', '0033_auto_20231108_1355'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StripeWebhookEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('event_id', models.CharField(max_length=255, unique=True)),
+                ('event_type', models.CharField(max_length=255)),
+                ('payment_intent_id', models.CharField(blank=True, db_index=True, max_length=255, null=True)),
+                ('order_number', models.CharField(blank=True, max_length=128, null=True)),
+                ('amount', models.PositiveIntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('New', 'New'), ('Processed', 'Processed'), ('Failed', 'Failed'), ('Ignored', 'Ignored')], default='New', max_length=32)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Stripe Webhook Event',
+                'index_together': {('status', 'created')},
+            },
+        ),
+    ]
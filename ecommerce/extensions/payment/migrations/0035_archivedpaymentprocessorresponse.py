@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('basket', '0017_alter_lineattribute_value'),
+        ('payment', '0034_stripewebhookevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPaymentProcessorResponse',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('response_id', models.PositiveIntegerField(unique=True)),
+                ('processor_name', models.CharField(max_length=255)),
+                ('transaction_id', models.CharField(blank=True, max_length=255, null=True)),
+                ('created', models.DateTimeField(db_index=True)),
+                ('archive_path', models.CharField(max_length=255)),
+                ('basket', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='basket.basket')),
+            ],
+            options={
+                'index_together': {('processor_name', 'transaction_id')},
+            },
+        ),
+    ]
@@ -12,6 +12,7 @@ from jsonfield import JSONField
 from oscar.apps.payment.abstract_models import AbstractSource
 from solo.models import SingletonModel
 
+from ecommerce.extensions.payment.archive import read_archived_record
 from ecommerce.extensions.payment.constants import CARD_TYPE_CHOICES
 from ecommerce.extensions.payment.exceptions import SDNFallbackDataEmptyError
 
@@ -36,6 +37,67 @@ class PaymentProcessorResponse(models.Model):
         verbose_name = _('Payment Processor Response')
         verbose_name_plural = _('Payment Processor Responses')
 
+    @classmethod
+    def transaction_exists(cls, processor_name, transaction_id):
+        """
+        Returns True if a response has been recorded for the transaction, including archived responses.
+        """
+        query = {'processor_name': processor_name, 'transaction_id': transaction_id}
+        return (
+            cls.objects.filter(**query).exists() or
+            ArchivedPaymentProcessorResponse.objects.filter(**query).exists()
+        )
+
+    @classmethod
+    def get_for_transaction(cls, processor_name, transaction_id):
+        """
+        Returns the first response recorded for the transaction, or None if there is none.
+
+        Responses that have been moved to the archive by the archive_payment_processor_responses management
+        command are restored from the archive. Restored responses are not saved back to the database.
+        """
+        response = cls.objects.filter(processor_name=processor_name, transaction_id=transaction_id).first()
+        if response:
+            return response
+
+        archived_response = ArchivedPaymentProcessorResponse.objects.filter(
+            processor_name=processor_name,
+            transaction_id=transaction_id
+        ).order_by('response_id').first()
+        return archived_response.restore() if archived_response else None
+
+
+class ArchivedPaymentProcessorResponse(models.Model):
+    """
+    Index of a PaymentProcessorResponse that has been moved to compressed archive storage.
+
+    Only the fields used to look responses up are kept in the database. The response itself is stored in the
+    archive file, see ecommerce.extensions.payment.archive.
+    """
+    response_id = models.PositiveIntegerField(unique=True)
+    processor_name = models.CharField(max_length=255)
+    transaction_id = models.CharField(max_length=255, null=True, blank=True)
+    basket = models.ForeignKey('basket.Basket', null=True, blank=True, on_delete=models.SET_NULL)
+    created = models.DateTimeField(db_index=True)
+    archive_path = models.CharField(max_length=255)
+
+    class Meta:
+        index_together = ('processor_name', 'transaction_id')
+
+    def restore(self):
+        """
+        Returns an unsaved PaymentProcessorResponse with the response read from the archive.
+        """
+        record = read_archived_record(self.archive_path, self.response_id)
+        return PaymentProcessorResponse(
+            id=self.response_id,
+            processor_name=self.processor_name,
+            transaction_id=self.transaction_id,
+            basket_id=self.basket_id,
+            response=record['response'] if record else None,
+            created=self.created,
+        )
+
 
 class Source(AbstractSource):
     card_type = models.CharField(max_length=255, choices=CARD_TYPE_CHOICES, null=True, blank=True)
@@ -151,6 +213,24 @@ class SDNFallbackMetadata(TimeStampedModel):
         default='New',
     )
 
+    @classmethod
+    def get_current_metadata(cls):
+        """
+        Return the metadata entry in the 'Current' import state.
+
+        Raises:
+            SDNFallbackDataEmptyError: If no SDN csv has been imported yet.
+        """
+        try:
+            return SDNFallbackMetadata.objects.get(import_state='Current')
+        # The 'get' relies on the manage command having been run. If it fails, tell engineer what's needed
+        except SDNFallbackMetadata.DoesNotExist as fallback_metadata_no_exist:
+            logger.warning(
+                "SDNFallback: SDNFallbackMetadata is empty! Run this: "
+                "./manage.py populate_sdn_fallback_data_and_metadata"
+            )
+            raise SDNFallbackDataEmptyError from fallback_metadata_no_exist
+
     @classmethod
     def insert_new_sdn_fallback_metadata_entry(cls, file_checksum):
         """
@@ -274,18 +354,74 @@ class SDNFallbackData(models.Model):
         """
         Query the records that have 'Current' import state, and filter by source and sdn_type.
         """
-        try:
-            current_metadata = SDNFallbackMetadata.objects.get(import_state='Current')
-        # The 'get' relies on the manage command having been run. If it fails, tell engineer what's needed
-        except SDNFallbackMetadata.DoesNotExist as fallback_metadata_no_exist:
-            logger.warning(
-                "SDNFallback: SDNFallbackMetadata is empty! Run this: "
-                "./manage.py populate_sdn_fallback_data_and_metadata"
-            )
-            raise SDNFallbackDataEmptyError from fallback_metadata_no_exist
+        current_metadata = SDNFallbackMetadata.get_current_metadata()
         query_params = {'source': source, 'sdn_fallback_metadata': current_metadata, 'sdn_type': sdn_type}
         return SDNFallbackData.objects.filter(**query_params)
 
 
+class StripeWebhookEvent(TimeStampedModel):
+    """
+    Compact record of a verified Stripe webhook event.
+
+    Events are stored once per Stripe event ID when they are received, and handled later by the
+    `process_stripe_webhook_events` management command, so that the webhook can be acknowledged immediately.
+    Only the fields needed to handle payment intent events are kept.
+    """
+    NEW = 'New'
+    PROCESSED = 'Processed'
+    FAILED = 'Failed'
+    IGNORED = 'Ignored'
+    STATUS_CHOICES = (
+        (NEW, NEW),
+        (PROCESSED, PROCESSED),
+        (FAILED, FAILED),
+        (IGNORED, IGNORED),
+    )
+
+    event_id = models.CharField(max_length=255, unique=True)
+    event_type = models.CharField(max_length=255)
+    payment_intent_id = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    order_number = models.CharField(max_length=128, null=True, blank=True)
+    amount = models.PositiveIntegerField(null=True, blank=True)
+    status = models.CharField(max_length=32, choices=STATUS_CHOICES, default=NEW)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        index_together = ('status', 'created')
+        verbose_name = 'Stripe Webhook Event'
+
+    def __str__(self):
+        return '{event_type} [{event_id}]'.format(event_type=self.event_type, event_id=self.event_id)
+
+    @classmethod
+    def record(cls, event):
+        """
+        Stores a verified Stripe event, unless an event with the same ID has already been stored.
+
+        Stripe delivers events at least once, and retries deliveries it considers failed, so the same event
+        may be received several times.
+
+        Args:
+            event (stripe.Event): Event constructed from the webhook payload.
+
+        Returns:
+            tuple: The StripeWebhookEvent, and whether it was created by this call.
+        """
+        event_object = event.data.object
+        metadata = getattr(event_object, 'metadata', None) or {}
+        is_payment_intent = event.type.startswith('payment_intent.')
+        return cls.objects.get_or_create(
+            event_id=event.id,
+            defaults={
+                'event_type': event.type,
+                'payment_intent_id': event_object.id if is_payment_intent else None,
+                'order_number': metadata.get('order_number') if is_payment_intent else None,
+                'amount': getattr(event_object, 'amount', None) if is_payment_intent else None,
+                'status': cls.NEW if is_payment_intent else cls.IGNORED,
+            }
+        )
+
+
 # noinspection PyUnresolvedReferences
 from oscar.apps.payment.models import *  # noqa isort:skip pylint: disable=ungrouped-imports, wildcard-import,unused-wildcard-import,wrong-import-position,wrong-import-order
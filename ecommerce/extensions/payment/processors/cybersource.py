@@ -127,6 +127,7 @@ class CybersourceREST(ApplePayMixin, BaseClientSidePaymentProcessor):
     """
 
     NAME = "cybersource-rest"
+    MAX_CAPTURE_CONTEXTS = 20
 
     def __init__(self, site):
         """
@@ -197,38 +198,69 @@ class CybersourceREST(ApplePayMixin, BaseClientSidePaymentProcessor):
 
         new_capture_context = {'key_id': return_data.key_id}
 
-        capture_contexts = [
-            capture_context
-            for (capture_context, _)
-            in self._unexpired_capture_contexts(session)
-        ]
-        capture_contexts.insert(0, new_capture_context)
-        # Prevent session size explosion by limiting the number of recorded capture contexts
-        session['capture_contexts'] = capture_contexts[:20]
+        capture_contexts = self._stored_capture_contexts(session)
+        capture_contexts.insert(0, self._compact_capture_context(return_data.key_id))
+        self._save_capture_contexts(session, capture_contexts)
         return new_capture_context
 
-    def _unexpired_capture_contexts(self, session):
+    @staticmethod
+    def _compact_capture_context(key_id):
+        """
+        Return the session representation of a capture context.
+
+        The expiration time is decoded once, when the capture context is stored, so that expired capture
+        contexts can be pruned without decoding every stored JWT.
         """
-        Return all unexpired capture contexts in the supplied session.
+        return {'key_id': key_id, 'exp': jwt.decode(key_id, options={'verify_signature': False})['exp']}
+
+    def _stored_capture_contexts(self, session):
+        """
+        Return the unexpired capture contexts stored in the supplied session, newest first.
 
         Arguments:
             session (Session): the current user session
 
-        Returns: [(capture_context, decoded_capture_context)]
-            The list of all still-valid capture contexts, both encoded and decoded
+        Returns: [{'key_id': str, 'exp': int}]
         """
-        now = datetime.datetime.now(UTC)
+        now = datetime.datetime.now(UTC).timestamp()
         return [
-            (capture_context, decoded_capture_context)
-            for (capture_context, decoded_capture_context)
-            in (
-                (capture_context, jwt.decode(capture_context['key_id'], verify=False))
-                for capture_context
-                in session.get('capture_contexts', [])
+            capture_context
+            for capture_context in (
+                # Capture contexts stored before expiration times were recorded are decoded once here.
+                capture_context if 'exp' in capture_context
+                else self._compact_capture_context(capture_context['key_id'])
+                for capture_context in session.get('capture_contexts', [])
             )
-            if not datetime.datetime.fromtimestamp(decoded_capture_context['exp'], tz=UTC) < now
+            if capture_context['exp'] >= now
         ]
 
+    def _save_capture_contexts(self, session, capture_contexts):
+        """
+        Store the supplied capture contexts in the session, if they differ from those already stored.
+
+        Assigning to the session marks it as modified, so it is only done when the stored set actually changes.
+        """
+        # Prevent session size explosion by limiting the number of recorded capture contexts
+        capture_contexts = capture_contexts[:self.MAX_CAPTURE_CONTEXTS]
+        if capture_contexts != session.get('capture_contexts', []):
+            session['capture_contexts'] = capture_contexts
+
+    def _unexpired_capture_contexts(self, session):
+        """
+        Yield the unexpired capture contexts in the supplied session, newest first.
+
+        Each capture context is only decoded when it is reached, so callers that stop at the first match do not
+        decode the others.
+
+        Arguments:
+            session (Session): the current user session
+
+        Yields: (capture_context, decoded_capture_context)
+            The still-valid capture contexts, both encoded and decoded
+        """
+        for capture_context in self._stored_capture_contexts(session):
+            yield capture_context, jwt.decode(capture_context['key_id'], options={'verify_signature': False})
+
     def get_transaction_parameters(self, basket, request=None, use_client_side_checkout=False, **kwargs):
         """
         Generate a dictionary of signed parameters CyberSource requires to complete a transaction.
@@ -307,7 +339,7 @@ class CybersourceREST(ApplePayMixin, BaseClientSidePaymentProcessor):
         transaction_id = response.transaction_id
         if transaction_id and response.decision == Decision.accept:
             if Order.objects.filter(number=response.order_id).exists():
-                if PaymentProcessorResponse.objects.filter(transaction_id=transaction_id).exists():
+                if PaymentProcessorResponse.transaction_exists(self.NAME, transaction_id):
                     raise RedundantPaymentNotificationError
                 raise ExcessivePaymentForOrderError
 
@@ -8,6 +8,7 @@ from django.dispatch import receiver
 from edx_django_utils.cache import TieredCache
 from waffle.models import Switch
 
+from ecommerce.core.models import SiteConfiguration
 from ecommerce.extensions.api.v2.views.payments import PAYMENT_PROCESSOR_CACHE_KEY
 
 logger = logging.getLogger(__name__)
@@ -17,7 +18,8 @@ logger = logging.getLogger(__name__)
 def invalidate_processor_cache(*_args, **kwargs):
     """
     When Waffle switches for payment processors are toggled, the
-    payment processor list view cache must be invalidated.
+    payment processor list view cache and the cached lists of
+    processors enabled for each site must be invalidated.
     """
     switch = kwargs['instance']
     parts = switch.name.split(settings.PAYMENT_PROCESSOR_SWITCH_PREFIX)
@@ -25,4 +27,6 @@ def invalidate_processor_cache(*_args, **kwargs):
         processor = parts[1]
         logger.info('Switched payment processor [%s] %s.', processor, 'on' if switch.active else 'off')
         TieredCache.delete_all_tiers(PAYMENT_PROCESSOR_CACHE_KEY)
+        for site_configuration in SiteConfiguration.objects.all():
+            site_configuration.invalidate_payment_processors_cache()
         logger.info('Invalidated payment processor cache after toggling [%s].', switch.name)
@@ -3,19 +3,24 @@
 
 
 import json
+import time
 from decimal import Decimal
 from unittest import SkipTest
 
 import ddt
+import jwt
 import mock
 import requests
 import responses
 from CyberSource.api_client import ApiClient
+from django.contrib.sessions.backends.base import SessionBase
+from django.utils import timezone
 from oscar.apps.payment.exceptions import GatewayError
 from oscar.core.loading import get_model
 from oscar.test import factories
 
-from ecommerce.extensions.payment.models import PaymentProcessorResponse
+from ecommerce.extensions.payment.exceptions import ExcessivePaymentForOrderError, RedundantPaymentNotificationError
+from ecommerce.extensions.payment.models import ArchivedPaymentProcessorResponse, PaymentProcessorResponse
 from ecommerce.extensions.payment.processors.cybersource import (
     Cybersource,
     CybersourceREST,
@@ -305,3 +310,89 @@ class CybersourceRESTTests(CybersourceMixin, PaymentProcessorTestCaseMixin, Cybe
 
     def test_client_side_payment_url(self):
         raise SkipTest("No client side payment url for CybersourceREST")
+
+    def accepted_response_for_existing_order(self):
+        order = factories.create_order()
+        return UnhandledCybersourceResponse(
+            decision=Decision.accept,
+            duplicate_payment=False,
+            partial_authorization=False,
+            currency='USD',
+            total=Decimal('10.00'),
+            card_number='xxxx xxxx xxxx 1111',
+            card_type='visa',
+            transaction_id='6021683934456376603262',
+            order_id=order.number,
+            raw_json=None,
+        )
+
+    def test_handle_processor_response_excessive_payment(self):
+        """ Verify a payment for an order that was paid with another transaction is reported as excessive. """
+        with self.assertRaises(ExcessivePaymentForOrderError):
+            self.processor.handle_processor_response(self.accepted_response_for_existing_order(), basket=self.basket)
+
+    def test_handle_processor_response_redundant_archived_notification(self):
+        """ Verify a repeated notification for a transaction whose response was archived is reported as redundant. """
+        response = self.accepted_response_for_existing_order()
+        ArchivedPaymentProcessorResponse.objects.create(
+            response_id=1,
+            processor_name=self.processor_name,
+            transaction_id=response.transaction_id,
+            created=timezone.now(),
+            archive_path='payment_processor_responses/archive.jsonl.gz',
+        )
+
+        with self.assertRaises(RedundantPaymentNotificationError):
+            self.processor.handle_processor_response(response, basket=self.basket)
+
+    def test_unexpired_capture_contexts(self):
+        """ Verify expired capture contexts are skipped, each one is decoded lazily, and the session is unchanged. """
+        now = int(time.time())
+        newer, older, expired = (jwt.encode({'exp': exp}, 'secret') for exp in (now + 900, now + 600, now - 60))
+        session = SessionBase()
+        session['capture_contexts'] = [
+            {'key_id': newer, 'exp': now + 900}, {'key_id': older, 'exp': now + 600}, {'key_id': expired}
+        ]
+        session.modified = False
+
+        capture_contexts = self.processor._unexpired_capture_contexts(session)  # pylint: disable=protected-access
+        with mock.patch('ecommerce.extensions.payment.processors.cybersource.jwt.decode', wraps=jwt.decode) as decode:
+            self.assertEqual(next(capture_contexts)[1]['exp'], now + 900)
+            self.assertEqual(decode.call_count, 2)
+            self.assertEqual([decoded['exp'] for __, decoded in capture_contexts], [now + 600])
+            self.assertEqual(decode.call_count, 3)
+        self.assertFalse(session.modified)
+
+    def test_get_capture_context_prunes_expired_capture_contexts(self):
+        """ Verify expired capture contexts are removed from the session when a new one is stored. """
+        now = int(time.time())
+        unexpired, expired, key_id = (jwt.encode({'exp': exp}, 'secret') for exp in (now + 600, now - 60, now + 900))
+        session = SessionBase()
+        session['capture_contexts'] = [{'key_id': unexpired, 'exp': now + 600}, {'key_id': expired}]
+
+        with mock.patch('ecommerce.extensions.payment.processors.cybersource.KeyGenerationApi') as api:
+            api.return_value.generate_public_key.return_value = (mock.Mock(key_id=key_id), None, None)
+            self.processor.get_capture_context(mock.Mock(session=session))
+
+        self.assertEqual(
+            session['capture_contexts'],
+            [{'key_id': key_id, 'exp': now + 900}, {'key_id': unexpired, 'exp': now + 600}]
+        )
+
+    def test_capture_contexts_are_bounded(self):
+        """ Verify the number of capture contexts stored in the session is limited. """
+        exp = int(time.time()) + 900
+        session = SessionBase()
+        session['capture_contexts'] = [
+            {'key_id': 'key-{}'.format(index), 'exp': exp} for index in range(CybersourceREST.MAX_CAPTURE_CONTEXTS)
+        ]
+        key_id = jwt.encode({'exp': exp}, 'secret')
+
+        with mock.patch('ecommerce.extensions.payment.processors.cybersource.KeyGenerationApi') as api:
+            api.return_value.generate_public_key.return_value = (mock.Mock(key_id=key_id), None, None)
+            self.assertEqual(self.processor.get_capture_context(mock.Mock(session=session)), {'key_id': key_id})
+
+        capture_contexts = session['capture_contexts']
+        self.assertEqual(len(capture_contexts), CybersourceREST.MAX_CAPTURE_CONTEXTS)
+        self.assertEqual(capture_contexts[0], {'key_id': key_id, 'exp': exp})
+        self.assertEqual(capture_contexts[-1]['key_id'], 'key-{}'.format(CybersourceREST.MAX_CAPTURE_CONTEXTS - 2))
@@ -0,0 +1,163 @@
+
+
+import mock
+from django.core.management import call_command
+from django.test import override_settings
+from oscar.core.loading import get_model
+from oscar.test.factories import create_order
+from testfixtures import LogCapture
+
+from ecommerce.extensions.fulfillment.status import ORDER
+from ecommerce.extensions.payment.models import PaymentProcessorResponse, StripeWebhookEvent
+from ecommerce.extensions.payment.processors.stripe import Stripe
+from ecommerce.extensions.payment.webhooks import process_pending_webhook_events, process_webhook_event
+from ecommerce.extensions.test.factories import create_basket
+from ecommerce.management.utils import FulfillFrozenBaskets
+from ecommerce.tests.testcases import TestCase
+
+Order = get_model('order', 'Order')
+
+LOGGER_NAME = 'ecommerce.extensions.payment.webhooks'
+
+
+class StripeWebhookEventProcessingTests(TestCase):
+    """ Tests for the handling of stored Stripe webhook events. """
+    PAYMENT_INTENT = {
+        'id': 'pi_123dummy',
+        'status': 'succeeded',
+        'payment_method': {'card': {'brand': 'visa', 'last4': '4242'}},
+    }
+
+    def create_event(self, event_type='payment_intent.succeeded', order_number='EDX-10001', **kwargs):
+        return StripeWebhookEvent.objects.create(
+            event_id='evt_{}'.format(StripeWebhookEvent.objects.count()),
+            event_type=event_type,
+            payment_intent_id='pi_123dummy',
+            order_number=order_number,
+            amount=299,
+            **kwargs
+        )
+
+    def create_frozen_basket(self):
+        basket = create_basket(site=self.site)
+        basket.freeze()
+        return basket
+
+    def assert_order_placed(self, basket):
+        order = Order.objects.get(number=basket.order_number)
+        self.assertEqual(order.status, ORDER.COMPLETE)
+        self.assertEqual(order.sources.get().reference, 'pi_123dummy')
+
+    def test_payment_intent_succeeded_for_placed_order(self):
+        """ Verify a successful payment intent for an order that has been placed is marked as processed. """
+        order = create_order()
+        webhook_event = self.create_event(order_number=order.number)
+
+        with LogCapture(LOGGER_NAME) as log_capture:
+            self.assertEqual(process_webhook_event(webhook_event), StripeWebhookEvent.PROCESSED)
+            log_capture.check_present((
+                LOGGER_NAME,
+                'INFO',
+                '[Stripe webhooks] Order [{}] for payment intent [pi_123dummy] has been placed.'.format(order.number),
+            ))
+
+        webhook_event.refresh_from_db()
+        self.assertEqual(webhook_event.attempts, 1)
+        self.assertIsNotNone(webhook_event.processed_at)
+
+    def test_payment_intent_succeeded_without_basket(self):
+        """ Verify a warning is logged when the basket of the order paid for with a payment intent does not exist. """
+        webhook_event = self.create_event()
+
+        with LogCapture(LOGGER_NAME) as log_capture:
+            self.assertEqual(process_webhook_event(webhook_event), StripeWebhookEvent.PROCESSED)
+            log_capture.check_present((
+                LOGGER_NAME,
+                'WARNING',
+                '[Stripe webhooks] Payment intent [pi_123dummy] succeeded, but the basket of order [EDX-10001] does '
+                'not exist.',
+            ))
+
+    @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule'])
+    def test_payment_intent_succeeded_places_order(self):
+        """ Verify the order is placed from the frozen basket when the checkout view recorded the payment only. """
+        basket = self.create_frozen_basket()
+        PaymentProcessorResponse.objects.create(
+            basket=basket, transaction_id='pi_123dummy', processor_name=Stripe.NAME, response=self.PAYMENT_INTENT
+        )
+        webhook_event = self.create_event(order_number=basket.order_number)
+
+        with mock.patch('stripe.PaymentIntent.retrieve') as mock_retrieve:
+            self.assertEqual(process_webhook_event(webhook_event), StripeWebhookEvent.PROCESSED)
+            self.assertFalse(mock_retrieve.called)
+        self.assert_order_placed(basket)
+
+        # Handling another event for the same payment intent does not place a second order.
+        self.assertEqual(
+            process_webhook_event(self.create_event(order_number=basket.order_number)), StripeWebhookEvent.PROCESSED
+        )
+        self.assertEqual(Order.objects.filter(basket=basket).count(), 1)
+
+    @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule'])
+    def test_payment_intent_succeeded_records_payment(self):
+        """ Verify the payment intent is retrieved and recorded when the checkout view did not record it. """
+        basket = self.create_frozen_basket()
+        webhook_event = self.create_event(order_number=basket.order_number)
+
+        with mock.patch('stripe.PaymentIntent.retrieve', return_value=self.PAYMENT_INTENT) as mock_retrieve:
+            self.assertEqual(process_webhook_event(webhook_event), StripeWebhookEvent.PROCESSED)
+            mock_retrieve.assert_called_once_with('pi_123dummy', expand=['payment_method'])
+        self.assertTrue(basket.paymentprocessorresponse_set.filter(transaction_id='pi_123dummy').exists())
+        self.assert_order_placed(basket)
+
+    def test_payment_intent_succeeded_order_placement_failure(self):
+        """ Verify the event fails, to be retried, when the order cannot be placed. """
+        basket = self.create_frozen_basket()
+        webhook_event = self.create_event(order_number=basket.order_number)
+
+        with mock.patch('stripe.PaymentIntent.retrieve', return_value=self.PAYMENT_INTENT):
+            with mock.patch.object(FulfillFrozenBaskets, 'fulfill_basket', return_value=False):
+                self.assertEqual(process_webhook_event(webhook_event), StripeWebhookEvent.FAILED)
+        self.assertFalse(Order.objects.filter(basket=basket).exists())
+
+    def test_processed_event_is_not_handled_again(self):
+        """ Verify processing is idempotent. """
+        webhook_event = self.create_event()
+        process_webhook_event(webhook_event)
+
+        with mock.patch('ecommerce.extensions.payment.webhooks.handle_payment_intent_succeeded') as mock_handler:
+            self.assertEqual(process_webhook_event(webhook_event), StripeWebhookEvent.PROCESSED)
+            self.assertFalse(mock_handler.called)
+
+        webhook_event.refresh_from_db()
+        self.assertEqual(webhook_event.attempts, 1)
+
+    def test_unhandled_payment_intent_event(self):
+        """ Verify payment intent events without a handler are ignored. """
+        webhook_event = self.create_event(event_type='payment_intent.created')
+        self.assertEqual(process_webhook_event(webhook_event), StripeWebhookEvent.IGNORED)
+
+    def test_failed_event_is_retried(self):
+        """ Verify events whose handler raises are marked as failed, and retried up to the maximum attempts. """
+        webhook_event = self.create_event()
+        handlers = {'payment_intent.succeeded': mock.Mock(side_effect=Exception)}
+
+        with mock.patch.dict('ecommerce.extensions.payment.webhooks.EVENT_HANDLERS', handlers):
+            self.assertEqual(process_pending_webhook_events(max_attempts=2), {StripeWebhookEvent.FAILED: 1})
+            self.assertEqual(process_pending_webhook_events(max_attempts=2), {StripeWebhookEvent.FAILED: 1})
+            self.assertEqual(process_pending_webhook_events(max_attempts=2), {})
+
+        webhook_event.refresh_from_db()
+        self.assertEqual(webhook_event.status, StripeWebhookEvent.FAILED)
+        self.assertEqual(webhook_event.attempts, 2)
+
+    def test_command(self):
+        """ Verify the management command processes all pending events in batches. """
+        for __ in range(3):
+            self.create_event()
+        self.create_event(status=StripeWebhookEvent.IGNORED)
+
+        call_command('process_stripe_webhook_events', batch_size=2)
+
+        self.assertEqual(StripeWebhookEvent.objects.filter(status=StripeWebhookEvent.PROCESSED).count(), 3)
+        self.assertEqual(StripeWebhookEvent.objects.filter(status=StripeWebhookEvent.IGNORED).count(), 1)
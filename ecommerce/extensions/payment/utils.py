@@ -24,6 +24,14 @@ def get_basket_program_uuid(basket):
     Returns:
         string: The program UUID if the basket is associated with a bundled purchase, otherwise None.
     """
+    prefetched_attributes = getattr(basket, '_prefetched_objects_cache', {}).get('basketattribute_set')
+    if prefetched_attributes is not None:
+        bundle_attribute = next(
+            (attribute for attribute in prefetched_attributes if attribute.attribute_type.name == 'bundle_identifier'),
+            None
+        )
+        return bundle_attribute.value_text if bundle_attribute else None
+
     try:
         attribute_type = BasketAttributeType.objects.get(name='bundle_identifier')
     except BasketAttributeType.DoesNotExist:
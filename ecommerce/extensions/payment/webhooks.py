@@ -0,0 +1,155 @@
+"""Handling of the Stripe webhook events stored by StripeWebhooksView."""
+
+
+import logging
+
+import stripe
+from django.db import transaction
+from django.utils import timezone
+from oscar.apps.payment.exceptions import PaymentError
+from oscar.core.loading import get_class, get_model
+
+from ecommerce.extensions.payment.processors.stripe import Stripe
+from ecommerce.management.utils import FulfillFrozenBaskets
+
+logger = logging.getLogger(__name__)
+
+Basket = get_model('basket', 'Basket')
+Order = get_model('order', 'Order')
+OrderNumberGenerator = get_class('order.utils', 'OrderNumberGenerator')
+StripeWebhookEvent = get_model('payment', 'StripeWebhookEvent')
+
+
+def handle_payment_intent_succeeded(webhook_event):
+    """
+    Places the order paid for with a successful payment intent, if the Stripe checkout view has not placed it.
+
+    Orders are normally placed by the Stripe checkout view once the payment is confirmed. If the view failed after
+    Stripe took the payment, the order is placed here from the frozen basket, recording the payment intent first
+    if the view did not record it. The event row is locked while this runs, and nothing is done once the order
+    exists, so the order is placed at most once.
+
+    Raises:
+        PaymentError: If the order could not be placed. The event is then retried.
+    """
+    order_number = webhook_event.order_number
+    payment_intent_id = webhook_event.payment_intent_id
+    if Order.objects.filter(number=order_number).exists():
+        logger.info(
+            '[Stripe webhooks] Order [%s] for payment intent [%s] has been placed.',
+            order_number,
+            payment_intent_id,
+        )
+        return
+
+    basket = Basket.objects.select_related('site').filter(
+        id=OrderNumberGenerator().basket_id(order_number)
+    ).first()
+    if basket is None:
+        logger.warning(
+            '[Stripe webhooks] Payment intent [%s] succeeded, but the basket of order [%s] does not exist.',
+            payment_intent_id,
+            order_number,
+        )
+        return
+
+    succeeded_responses = basket.paymentprocessorresponse_set.filter(
+        transaction_id=payment_intent_id, response__contains='succeeded'
+    )
+    if not succeeded_responses.exists():
+        payment_processor = Stripe(basket.site)
+        payment_intent = stripe.PaymentIntent.retrieve(payment_intent_id, expand=['payment_method'])
+        if payment_intent['status'] != 'succeeded':
+            raise PaymentError(
+                'Payment intent [{}] has status [{}].'.format(payment_intent_id, payment_intent['status'])
+            )
+        payment_processor.record_processor_response(payment_intent, transaction_id=payment_intent_id, basket=basket)
+
+    logger.info(
+        '[Stripe webhooks] Payment intent [%s] succeeded, but order [%s] has not been placed. Placing it.',
+        payment_intent_id,
+        order_number,
+    )
+    if not FulfillFrozenBaskets().fulfill_basket(basket.id, basket.site):
+        raise PaymentError('Order [{}] could not be placed for basket [{}].'.format(order_number, basket.id))
+
+
+def handle_payment_intent_payment_failed(webhook_event):
+    logger.info(
+        '[Stripe webhooks] Payment for order [%s] with payment intent [%s] failed.',
+        webhook_event.order_number,
+        webhook_event.payment_intent_id,
+    )
+
+
+def handle_payment_intent_requires_action(webhook_event):
+    logger.info(
+        '[Stripe webhooks] Payment for order [%s] with payment intent [%s] requires action.',
+        webhook_event.order_number,
+        webhook_event.payment_intent_id,
+    )
+
+
+EVENT_HANDLERS = {
+    'payment_intent.succeeded': handle_payment_intent_succeeded,
+    'payment_intent.payment_failed': handle_payment_intent_payment_failed,
+    'payment_intent.requires_action': handle_payment_intent_requires_action,
+}
+
+
+def process_webhook_event(webhook_event):
+    """
+    Runs the handler for a stored Stripe event, and records the outcome on the event.
+
+    The event row is locked while it is handled, and events that have already been processed are skipped, so
+    several workers can run at the same time without handling an event twice.
+
+    Args:
+        webhook_event (StripeWebhookEvent): Event to process.
+
+    Returns:
+        str: The status of the event once processed.
+    """
+    with transaction.atomic():
+        webhook_event = StripeWebhookEvent.objects.select_for_update().get(pk=webhook_event.pk)
+        if webhook_event.status in (StripeWebhookEvent.PROCESSED, StripeWebhookEvent.IGNORED):
+            return webhook_event.status
+
+        handler = EVENT_HANDLERS.get(webhook_event.event_type)
+        webhook_event.attempts += 1
+        if handler is None:
+            logger.warning('[Stripe webhooks] unhandled event with type [%s].', webhook_event.event_type)
+            webhook_event.status = StripeWebhookEvent.IGNORED
+        else:
+            try:
+                with transaction.atomic():
+                    handler(webhook_event)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('[Stripe webhooks] Failed to process event [%s].', webhook_event.event_id)
+                webhook_event.status = StripeWebhookEvent.FAILED
+            else:
+                webhook_event.status = StripeWebhookEvent.PROCESSED
+                webhook_event.processed_at = timezone.now()
+
+        webhook_event.save(update_fields=['attempts', 'status', 'processed_at', 'modified'])
+        return webhook_event.status
+
+
+def process_pending_webhook_events(batch_size=100, max_attempts=5):
+    """
+    Processes the oldest stored events that have not been handled yet, including failed events that have been
+    attempted fewer than `max_attempts` times.
+
+    Returns:
+        dict: Number of events processed, keyed by their resulting status.
+    """
+    pending_events = StripeWebhookEvent.objects.filter(
+        status__in=(StripeWebhookEvent.NEW, StripeWebhookEvent.FAILED),
+        attempts__lt=max_attempts,
+    ).order_by('created')[:batch_size]
+
+    results = {}
+    for webhook_event in pending_events:
+        status = process_webhook_event(webhook_event)
+        results[status] = results.get(status, 0) + 1
+    return results
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-19 11:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('refund', '0008_auto_20210526_2005'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='refund',
+            index=models.Index(fields=['created', 'id'], name='refund_refu_created_38f10c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='refund',
+            index=models.Index(fields=['status', 'created'], name='refund_refu_status_2fca34_idx'),
+        ),
+    ]
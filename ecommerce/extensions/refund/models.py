@@ -84,6 +84,12 @@ class Refund(StatusMixin, TimeStampedModel):
     history = HistoricalRecords()
     pipeline_setting = 'OSCAR_REFUND_STATUS_PIPELINE'
 
+    class Meta(TimeStampedModel.Meta):
+        indexes = [
+            models.Index(fields=['created', 'id']),
+            models.Index(fields=['status', 'created']),
+        ]
+
     @classmethod
     def all_statuses(cls):
         """Returns all possible statuses for a refund."""
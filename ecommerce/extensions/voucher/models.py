@@ -103,6 +103,14 @@ class Voucher(AbstractVoucher):
 
     @property
     def original_offer(self):
+        if 'offers' in getattr(self, '_prefetched_objects_cache', {}):
+            # Resolve the offer from the prefetched offers (and their conditions) instead of querying again.
+            offers = list(self.offers.all())
+            range_offers = [offer for offer in offers if offer.condition.range_id is not None]
+            if range_offers:
+                return range_offers[0]
+            return sorted(offers, key=lambda offer: offer.date_created)[0]
+
         try:
             return self.offers.filter(condition__range__isnull=False)[0]
         except (IndexError, ObjectDoesNotExist):
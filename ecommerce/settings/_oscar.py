@@ -227,6 +227,10 @@ OSCAR_REFUND_LINE_STATUS_PIPELINE = {
 }
 # END REFUND PROCESSING
 
+# The order and refund lists of the dashboard show the number of rows estimated from table statistics, instead of
+# counting them, when they are not filtered and the estimate is at least this large.
+DASHBOARD_EXACT_COUNT_THRESHOLD = 10000
+
 # DASHBOARD NAVIGATION MENU
 OSCAR_DASHBOARD_NAVIGATION = [
     {
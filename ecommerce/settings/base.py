@@ -224,6 +224,7 @@ MIDDLEWARE = (
     'edx_django_utils.monitoring.DeploymentMonitoringMiddleware',
     'edx_django_utils.cache.middleware.RequestCacheMiddleware',
     'edx_django_utils.monitoring.CachedCustomMonitoringMiddleware',
+    'ecommerce.core.middleware.RequestInstrumentationMiddleware',
     'edx_django_utils.monitoring.CookieMonitoringMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -251,6 +252,12 @@ MIDDLEWARE = (
     'edx_rest_framework_extensions.auth.jwt.middleware.EnsureJWTAuthSettingsMiddleware',
     'crum.CurrentRequestUserMiddleware',
 )
+
+# Per-request instrumentation of SQL queries, TieredCache lookups and API calls. Budgets are dictionaries with
+# optional sql_queries, duplicate_queries, cache_misses and http_calls limits, keyed by view name, or 'default'.
+REQUEST_INSTRUMENTATION_ENABLED = False
+REQUEST_INSTRUMENTATION_BUDGETS = {}
+REQUEST_INSTRUMENTATION_ENFORCE_BUDGETS = False
 # END MIDDLEWARE CONFIGURATION
 
 
@@ -265,6 +272,9 @@ COMMERCE_API_TIMEOUT = 7
 COURSES_API_CACHE_TIMEOUT = 3600  # Value is in seconds
 PROGRAM_CACHE_TIMEOUT = 3600  # Value is in seconds.
 
+# Cache the seat products of each course run, used when previewing voucher offers.
+COURSE_RUN_SEATS_CACHE_TIMEOUT = 3600  # Value is in seconds.
+
 # Cache catalog results from the enterprise and discovery service.
 CATALOG_RESULTS_CACHE_TIMEOUT = 86400
 
@@ -290,8 +300,18 @@ EXTRA_PAYMENT_PROCESSOR_URLS = {}
 
 VOUCHER_CACHE_TIMEOUT = 10  # Value is in seconds.
 
+# Cache the voucher, product and Enterprise Customer of coupon redemptions.
+COUPON_REDEMPTION_PLAN_CACHE_TIMEOUT = 60  # Value is in seconds.
+
+# Cache the payment processors enabled for each site.
+PAYMENT_PROCESSORS_CACHE_TIMEOUT = 600  # Value is in seconds.
+
 SDN_CHECK_REQUEST_TIMEOUT = 5  # Value is in seconds.
 
+# Maximum age of the in-memory SDN fallback dataset before it is checked against the database, in case the
+# notification of a newer import was lost.
+SDN_FALLBACK_DATASET_MAX_AGE = 900  # Value is in seconds.
+
 # APP CONFIGURATION
 DJANGO_APPS = [
     'django.contrib.admin',
@@ -642,6 +662,9 @@ DEFAULT_SITE_THEME = None
 
 THEME_CACHE_TIMEOUT = 30 * 60
 
+# Look up all the themes in the themes dirs at startup, instead of on the first request for each theme
+WARM_UP_THEME_CACHE = False
+
 # End Theme settings
 
 
@@ -854,6 +877,12 @@ CACHES = {
 BACKEND_SERVICE_EDX_OAUTH2_KEY = "ecommerce-backend-service-key"
 BACKEND_SERVICE_EDX_OAUTH2_SECRET = "ecommerce-backend-service-secret"
 BACKEND_SERVICE_EDX_OAUTH2_PROVIDER_URL = "http://127.0.0.1:8000/oauth2"
+# Dotted path of the class used by SiteConfiguration.oauth_api_client, OAuthAPIClient if None. Set it to
+# 'ecommerce.core.service_stubs.StubAPIClient' to serve canned Discovery, LMS and Enterprise responses.
+BACKEND_SERVICE_API_CLIENT_CLASS = None
+# JSON file of additional routes served by StubAPIClient, and the delay (in seconds) added to each response.
+SERVICE_STUB_FIXTURES = None
+SERVICE_STUB_LATENCY = 0
 EXTRA_APPS = []
 API_ROOT = None
 
@@ -891,3 +920,7 @@ CAMPAIGN_IDS_BY_EMAIL_TYPE = {
     OfferUsageEmailTypes.LOW_BALANCE: BRAZE_OFFER_LOW_BALANCE_CAMPAIGN,
     OfferUsageEmailTypes.OUT_OF_BALANCE: BRAZE_OFFER_NO_BALANCE_CAMPAIGN
 }
+
+# Storage class used for archived payment processor responses. The default file storage is used if not set.
+PAYMENT_PROCESSOR_RESPONSE_ARCHIVE_STORAGE = None
+PAYMENT_PROCESSOR_RESPONSE_ARCHIVE_PREFIX = 'payment_processor_responses'
@@ -0,0 +1,114 @@
+"""
+Data generators for the benchmark scenarios.
+
+Sizes are multiplied by the BENCHMARK_SCALE environment variable (1 by default), so that the scenarios can be run
+quickly while iterating, and at production-like volumes before merging.
+"""
+
+
+import os
+
+from faker import Faker
+from oscar.core.loading import get_model
+from oscar.test.factories import ProductFactory, RangeFactory
+
+from ecommerce.extensions.test.factories import SDNFallbackMetadataFactory
+
+Benefit = get_model('offer', 'Benefit')
+Condition = get_model('offer', 'Condition')
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+SDNFallbackData = get_model('payment', 'SDNFallbackData')
+Voucher = get_model('voucher', 'Voucher')
+
+SDN_SOURCE = 'Specially Designated Nationals (SDN) - Treasury Department'
+
+
+def scaled(count):
+    """ Returns the given count, multiplied by the BENCHMARK_SCALE environment variable. """
+    return max(1, int(count * float(os.environ.get('BENCHMARK_SCALE', 1))))
+
+
+def create_products(partner, count, price=100):
+    """ Creates `count` standalone products, each with a stock record from the given partner. """
+    return ProductFactory.create_batch(
+        count, categories=[], stockrecords__partner=partner, stockrecords__price=price,
+        stockrecords__price_currency='USD'
+    )
+
+
+def create_site_offers(count, applicable_range, applicable_every=10):
+    """
+    Creates `count` open site offers, each with its own condition and percentage benefit.
+
+    Only one offer in `applicable_every` is on `applicable_range`. The others are on an empty range, so the
+    Applicator has to evaluate, and reject, most of the offers, as it does in production.
+
+    Returns:
+        list: The created ConditionalOffer objects.
+    """
+    empty_range = RangeFactory(products=[])
+    offers = []
+    for index in range(count):
+        offer_range = applicable_range if index % applicable_every == 0 else empty_range
+        condition = Condition.objects.create(range=offer_range, type=Condition.COUNT, value=1)
+        benefit = Benefit.objects.create(range=offer_range, type=Benefit.PERCENTAGE, value=1 + index % 50)
+        offers.append(ConditionalOffer.objects.create(
+            name='Benchmark offer {}'.format(index),
+            offer_type=ConditionalOffer.SITE,
+            condition=condition,
+            benefit=benefit,
+            priority=index % 5,
+        ))
+    return offers
+
+
+def add_vouchers(coupon_vouchers, offer, count, prefix='BENCH'):
+    """
+    Adds `count` single use vouchers, for the given offer, to the coupon.
+
+    The vouchers are bulk inserted, since creating them one at a time would dominate the setup time of the
+    coupon report scenarios.
+    """
+    template = coupon_vouchers.vouchers.first()
+    Voucher.objects.bulk_create([
+        Voucher(
+            name='{} {}'.format(template.name, index),
+            code='{}{:08d}'.format(prefix, index),
+            usage=Voucher.SINGLE_USE,
+            start_datetime=template.start_datetime,
+            end_datetime=template.end_datetime,
+        )
+        for index in range(count)
+    ], batch_size=1000)
+
+    vouchers = list(Voucher.objects.filter(code__startswith=prefix).values_list('id', flat=True))
+    Voucher.offers.through.objects.bulk_create([
+        Voucher.offers.through(voucher_id=voucher_id, conditionaloffer_id=offer.id) for voucher_id in vouchers
+    ], batch_size=1000)
+    coupon_vouchers.vouchers.through.objects.bulk_create([
+        coupon_vouchers.vouchers.through(couponvouchers_id=coupon_vouchers.id, voucher_id=voucher_id)
+        for voucher_id in vouchers
+    ], batch_size=1000)
+
+
+def create_sdn_fallback_records(count, country):
+    """
+    Creates `count` current SDN fallback records of individuals from the given country.
+
+    Returns:
+        SDNFallbackMetadata: The metadata of the created records.
+    """
+    faker = Faker()
+    metadata = SDNFallbackMetadataFactory(import_state='Current')
+    SDNFallbackData.objects.bulk_create([
+        SDNFallbackData(
+            sdn_fallback_metadata=metadata,
+            source=SDN_SOURCE,
+            sdn_type='Individual',
+            names=' '.join(faker.name().lower().split()),
+            addresses=' '.join(faker.city().lower().split()),
+            countries=country,
+        )
+        for __ in range(count)
+    ], batch_size=1000)
+    return metadata
@@ -0,0 +1,216 @@
+"""
+Benchmarks of the pricing, offer and checkout paths that dominate production CPU time.
+
+These scenarios are excluded from the default test run. Run them with `make benchmark`, which reports the query
+count, wall time and peak allocations of each scenario, and fails if the query count or allocations of any of them
+regressed compared to baseline.json. Wall times are only reported, since they depend on the machine, unless
+BENCHMARK_TIME_TOLERANCE is set. Set BENCHMARK_UPDATE_BASELINE=1 to store the new measurements as the baseline
+instead.
+"""
+
+
+import logging
+import os
+from urllib.parse import urlencode
+
+import pytest
+from django.test import RequestFactory
+from django.urls import reverse
+from oscar.core.loading import get_class, get_model
+from oscar.test.factories import RangeFactory
+
+from ecommerce.coupons.tests.mixins import CouponMixin
+from ecommerce.extensions.basket.utils import prepare_basket
+from ecommerce.extensions.checkout.mixins import EdxOrderPlacementMixin
+from ecommerce.extensions.payment.core.sdn import checkSDNFallback
+from ecommerce.extensions.test.factories import create_basket
+from ecommerce.extensions.voucher.utils import generate_coupon_report
+from ecommerce.tests.benchmarks.generators import (
+    add_vouchers,
+    create_products,
+    create_sdn_fallback_records,
+    create_site_offers,
+    scaled
+)
+from ecommerce.tests.benchmarks.utils import (
+    DEFAULT_MEMORY_TOLERANCE,
+    find_regressions,
+    load_baseline,
+    measure,
+    save_baseline
+)
+from ecommerce.tests.testcases import TestCase
+
+Applicator = get_class('offer.applicator', 'Applicator')
+Basket = get_model('basket', 'Basket')
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+CouponVouchers = get_model('voucher', 'CouponVouchers')
+NoShippingRequired = get_class('shipping.methods', 'NoShippingRequired')
+OrderNumberGenerator = get_class('order.utils', 'OrderNumberGenerator')
+OrderTotalCalculator = get_class('checkout.calculators', 'OrderTotalCalculator')
+Selector = get_class('partner.strategy', 'Selector')
+
+logger = logging.getLogger(__name__)
+
+
+def get_time_tolerance():
+    """ Returns the wall time tolerance set with BENCHMARK_TIME_TOLERANCE, or None if wall times are not compared. """
+    time_tolerance = os.environ.get('BENCHMARK_TIME_TOLERANCE')
+    return float(time_tolerance) if time_tolerance else None
+
+
+@pytest.mark.benchmark
+class HotPathBenchmarks(CouponMixin, TestCase):
+    """ Benchmark scenarios for the hot paths. """
+
+    measurements = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        if os.environ.get('BENCHMARK_UPDATE_BASELINE'):
+            baseline = load_baseline()
+            baseline.update(cls.measurements)
+            save_baseline(baseline)
+        super(HotPathBenchmarks, cls).tearDownClass()
+
+    def setUp(self):
+        super(HotPathBenchmarks, self).setUp()
+        self.user = self.create_user(is_staff=True)
+        self.request = RequestFactory(SERVER_NAME=self.site.domain).get('/')
+        self.request.site = self.site
+        self.request.user = self.user
+        self.request.COOKIES = {}
+
+    def run_benchmark(self, name, func, repeat=3):
+        """ Measures the given scenario, and verifies it has not regressed compared to its baseline. """
+        measurement = measure(func, repeat=repeat)
+        self.measurements[name] = measurement
+        logger.info('[Benchmark] %s: %s', name, measurement)
+
+        baseline = load_baseline().get(name)
+        if baseline is None or os.environ.get('BENCHMARK_UPDATE_BASELINE'):
+            return
+
+        regressions = find_regressions(
+            measurement,
+            baseline,
+            time_tolerance=get_time_tolerance(),
+            memory_tolerance=float(os.environ.get('BENCHMARK_MEMORY_TOLERANCE', DEFAULT_MEMORY_TOLERANCE)),
+        )
+        self.assertFalse(regressions, '{} regressed: {}'.format(name, '; '.join(regressions)))
+
+    def create_basket(self, products):
+        basket = create_basket(owner=self.user, site=self.site, empty=True)
+        for product in products:
+            basket.add_product(product)
+        basket.strategy = Selector().strategy(user=self.user, request=self.request)
+        return basket
+
+    def test_applicator_apply(self):
+        """ Apply thousands of site offers to a basket with many lines. """
+        products = create_products(self.partner, scaled(20))
+        create_site_offers(scaled(1000), RangeFactory(products=products[:5]))
+        basket = self.create_basket(products)
+
+        def apply_offers():
+            basket.reset_offer_applications()
+            Applicator().apply(basket, user=self.user, request=self.request)
+
+        self.run_benchmark('applicator_apply', apply_offers, repeat=1)
+
+    def test_benefit_get_applicable_lines(self):
+        """ Find the lines a benefit applies to, in a basket with many lines. """
+        products = create_products(self.partner, scaled(100))
+        offer = create_site_offers(1, RangeFactory(products=products))[0]
+        basket = self.create_basket(products)
+        benefit = offer.benefit.proxy()
+
+        self.run_benchmark('benefit_get_applicable_lines', lambda: benefit.get_applicable_lines(offer, basket))
+
+    def test_basket_calculate_view(self):
+        """ Calculate the price of a multi-product basket for a user, with site offers to evaluate. """
+        products = create_products(self.partner, scaled(10))
+        create_site_offers(scaled(200), RangeFactory(products=products[:2]))
+        self.client.login(username=self.user.username, password=self.password)
+        url = '{path}?{query}'.format(
+            path=reverse('api:v2:baskets:calculate'),
+            query=urlencode(
+                [('sku', product.stockrecords.first().partner_sku) for product in products] +
+                [('username', self.user.username)]
+            ),
+        )
+
+        def calculate():
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+        self.run_benchmark('basket_calculate_view', calculate)
+
+    def test_prepare_basket(self):
+        """ Add several products and a voucher to the user's basket. """
+        products = create_products(self.partner, scaled(10))
+        coupon = self.create_coupon(quantity=1, catalog=None, partner=self.partner)
+        voucher = coupon.attr.coupon_vouchers.vouchers.first()
+
+        self.run_benchmark('prepare_basket', lambda: prepare_basket(self.request, products, voucher))
+
+    def test_handle_order_placement(self):
+        """ Place an order for a basket with several lines. """
+        products = create_products(self.partner, scaled(10))
+        # measure() places one order per call, so prepare a basket for each of them ahead of time.
+        baskets = iter([self.create_basket(products) for __ in range(5)])
+        shipping_method = NoShippingRequired()
+
+        def place_order():
+            basket = next(baskets)
+            shipping_charge = shipping_method.calculate(basket)
+            EdxOrderPlacementMixin().handle_order_placement(
+                order_number=OrderNumberGenerator().order_number(basket),
+                user=self.user,
+                basket=basket,
+                shipping_address=None,
+                shipping_method=shipping_method,
+                shipping_charge=shipping_charge,
+                billing_address=None,
+                order_total=OrderTotalCalculator().calculate(basket, shipping_charge),
+                request=self.request,
+            )
+
+        self.run_benchmark('handle_order_placement', place_order)
+
+    def test_generate_coupon_report(self):
+        """ Generate the report of a coupon with ten thousand vouchers. """
+        coupon = self.create_coupon(
+            quantity=1, partner=self.partner, catalog_query='*:*', course_seat_types='verified'
+        )
+        coupon_vouchers = CouponVouchers.objects.filter(coupon=coupon)
+        add_vouchers(coupon_vouchers.first(), coupon_vouchers.first().vouchers.first().offers.first(), scaled(10000))
+
+        self.run_benchmark('generate_coupon_report', lambda: generate_coupon_report(coupon_vouchers), repeat=1)
+
+    def test_check_sdn_fallback(self):
+        """ Check a name and city against thousands of SDN fallback records from the same country. """
+        create_sdn_fallback_records(scaled(5000), 'SN')
+
+        self.run_benchmark('check_sdn_fallback', lambda: checkSDNFallback('Juan Perez', 'Kristinaport', 'SN'))
+
+    def test_offer_is_email_valid(self):
+        """ Validate a thousand emails against the email domains of an offer, as the list of domains grows. """
+        measurements = {}
+        for count in (1, 100, 10000):
+            offer = ConditionalOffer(
+                email_domains=','.join('domain{}.example.com'.format(index) for index in range(count))
+            )
+            emails = [
+                'user{}@sub.domain{}.example.com'.format(index, index % count) for index in range(500)
+            ] + [
+                'user{}@domain{}.example.org'.format(index, index % count) for index in range(500)
+            ]
+            name = 'offer_is_email_valid_{}_domains'.format(count)
+            self.run_benchmark(name, lambda: [offer.is_email_valid(email) for email in emails], repeat=5)  # pylint: disable=cell-var-from-loop
+            measurements[count] = self.measurements[name]
+
+        # Lookups cost the same whatever the number of domains.
+        time_tolerance = get_time_tolerance()
+        if time_tolerance is not None:
+            self.assertLess(measurements[10000].wall_time, measurements[1].wall_time * time_tolerance * 2)
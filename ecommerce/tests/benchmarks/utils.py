@@ -0,0 +1,117 @@
+""" Measurement and baseline comparison utilities for the benchmark scenarios. """
+
+
+import json
+import os
+import time
+import tracemalloc
+from collections import namedtuple
+
+from django.db import connection
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Query counts are deterministic, and must not exceed the baseline at all. Allocations vary slightly between runs, so
+# they are only reported as regressions when they exceed the baseline by this factor. Wall time depends on the machine
+# the baseline was recorded on, so it is only compared when a tolerance is explicitly given.
+DEFAULT_MEMORY_TOLERANCE = 1.25
+
+
+class Measurement(namedtuple('Measurement', ['queries', 'wall_time', 'allocated'])):
+    """
+    Cost of one run of a benchmark scenario.
+
+    Attributes:
+        queries (int): Number of database queries made.
+        wall_time (float): Wall time, in seconds.
+        allocated (int): Peak memory allocated, in bytes.
+    """
+
+    def __str__(self):
+        return '{queries} queries, {wall_time:.4f}s, {allocated:.1f} KiB'.format(
+            queries=self.queries, wall_time=self.wall_time, allocated=self.allocated / 1024.0
+        )
+
+
+class QueryCounter:
+    """
+    Database execute wrapper counting the queries made.
+
+    Unlike CaptureQueriesContext, this is not limited by the size of the connection's query log.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(func, repeat=3):
+    """
+    Measures the cost of calling `func`.
+
+    The function is called once to warm up caches, then `repeat` more times. The query count and allocations
+    are those of the last call, and the wall time is the fastest of the measured calls, which is the least
+    affected by noise from the rest of the machine.
+
+    Returns:
+        Measurement
+    """
+    func()
+
+    wall_times = []
+    for __ in range(repeat):
+        start = time.perf_counter()
+        func()
+        wall_times.append(time.perf_counter() - start)
+
+    queries = QueryCounter()
+    tracemalloc.start()
+    try:
+        with connection.execute_wrapper(queries):
+            func()
+        __, allocated = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Measurement(queries.count, min(wall_times), allocated)
+
+
+def load_baseline(path=BASELINE_PATH):
+    """ Returns the stored baseline measurements, keyed by scenario name. """
+    if not os.path.exists(path):
+        return {}
+
+    with open(path) as baseline_file:
+        return {name: Measurement(**values) for name, values in json.load(baseline_file).items()}
+
+
+def save_baseline(measurements, path=BASELINE_PATH):
+    """ Stores the given measurements, keyed by scenario name, as the new baseline. """
+    with open(path, 'w') as baseline_file:
+        json.dump(
+            {name: measurement._asdict() for name, measurement in sorted(measurements.items())},
+            baseline_file, indent=2, sort_keys=True
+        )
+        baseline_file.write('\n')
+
+
+def find_regressions(measurement, baseline, time_tolerance=None, memory_tolerance=DEFAULT_MEMORY_TOLERANCE):
+    """
+    Compares a measurement to its baseline.
+
+    The wall time is only compared if `time_tolerance` is given.
+
+    Returns:
+        list: Descriptions of the regressions found, empty if there are none.
+    """
+    regressions = []
+    if measurement.queries > baseline.queries:
+        regressions.append('{} queries, baseline is {}'.format(measurement.queries, baseline.queries))
+    if time_tolerance is not None and measurement.wall_time > baseline.wall_time * time_tolerance:
+        regressions.append('{:.4f}s, baseline is {:.4f}s'.format(measurement.wall_time, baseline.wall_time))
+    if measurement.allocated > baseline.allocated * memory_tolerance:
+        regressions.append('{} bytes allocated, baseline is {}'.format(measurement.allocated, baseline.allocated))
+    return regressions
@@ -4,9 +4,10 @@ Module for code that should run during application startup
 
 
 from django.apps import AppConfig
+from django.conf import settings
 
 from ecommerce.theming.core import enable_theming
-from ecommerce.theming.helpers import is_comprehensive_theming_enabled
+from ecommerce.theming.helpers import is_comprehensive_theming_enabled, warm_theme_cache
 
 
 class ThemeAppConfig(AppConfig):
@@ -25,3 +26,9 @@ class ThemeAppConfig(AppConfig):
             # proceed only if comprehensive theming in enabled
 
             enable_theming()
+
+            if settings.WARM_UP_THEME_CACHE:
+                warm_theme_cache()
+
+        # Register signal handlers
+        import ecommerce.theming.signals  # pylint: disable=unused-import, import-outside-toplevel
@@ -8,11 +8,15 @@ import os
 
 import waffle
 from django.conf import ImproperlyConfigured, settings
+from django.utils.functional import cached_property
 from path import Path
 from threadlocals.threadlocals import get_current_request
 
 logger = logging.getLogger(__name__)
 
+# Themes memoized by `get_theme`, keyed by theme directory name.
+_THEMES = {}
+
 
 def get_current_site_theme():
     """
@@ -45,16 +49,56 @@ def get_current_theme():
     site_theme = get_current_site_theme()
     if not site_theme:
         return None
-    try:
-        return Theme(
-            name=site_theme.theme_dir_name,
-            theme_dir_name=site_theme.theme_dir_name,
-            themes_base_dir=get_theme_base_dir(site_theme.theme_dir_name),
+
+    theme = get_theme(site_theme.theme_dir_name)
+    if not theme:
+        # Log the error and return None, so that open source theme is used instead
+        logger.error(
+            'Theme [%s] not found in any of the themes dirs %s.', site_theme.theme_dir_name, get_theme_base_dirs()
         )
-    except ValueError as e:
-        # Log exception message and return None, so that open source theme is used instead
-        logger.exception('Theme not found in any of the themes dirs. [%s]', e)
-        return None
+    return theme
+
+
+def get_theme(theme_dir_name):
+    """
+    Return the theme with the given directory name. Returns None if the theme is not in any of the themes dirs.
+
+    Themes are looked up in the themes dirs once per process, and memoized by directory name. The memoized themes
+    are cleared when a SiteTheme is saved or deleted, or when the theme settings change. Themes that are not
+    found are not memoized, since the directory name can come from the `preview-theme` query parameter.
+
+    Args:
+        theme_dir_name (str): directory name of the theme
+    Returns:
+        (ecommerce.theming.helpers.Theme): theme object for the given directory name, or None.
+    """
+    theme = _THEMES.get(theme_dir_name)
+    if theme is None:
+        themes_base_dir = get_theme_base_dir(theme_dir_name, suppress_error=True)
+        if themes_base_dir is None:
+            return None
+
+        theme = _THEMES[theme_dir_name] = Theme(
+            name=theme_dir_name,
+            theme_dir_name=theme_dir_name,
+            themes_base_dir=themes_base_dir,
+        )
+    return theme
+
+
+def warm_theme_cache():
+    """
+    Memoize all the themes in the themes dirs, so that the first requests for each theme do not scan them.
+    """
+    for theme in get_themes():
+        _THEMES.setdefault(theme.theme_dir_name, theme)
+
+
+def clear_theme_cache():
+    """
+    Clear the themes memoized by `get_theme`.
+    """
+    _THEMES.clear()
 
 
 def get_theme_base_dir(theme_dir_name, suppress_error=False):
@@ -250,7 +294,7 @@ class Theme:
     def path(self):
         return Path(self.themes_base_dir) / self.theme_dir_name
 
-    @property
+    @cached_property
     def template_dirs(self):
         return [
             self.path / 'templates',
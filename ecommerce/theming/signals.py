@@ -0,0 +1,32 @@
+"""
+Signal handlers for the theming app.
+"""
+
+
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ecommerce.theming.helpers import clear_theme_cache
+from ecommerce.theming.models import SiteTheme
+
+THEME_SETTINGS = ('COMPREHENSIVE_THEME_DIRS', 'ENABLE_COMPREHENSIVE_THEMING')
+
+
+@receiver(post_save, sender=SiteTheme, dispatch_uid='theming.invalidate_theme_cache_on_save')
+@receiver(post_delete, sender=SiteTheme, dispatch_uid='theming.invalidate_theme_cache_on_delete')
+def invalidate_theme_cache(*_args, **_kwargs):
+    """
+    Clear the memoized themes when a site theme changes, so that themes added to the themes dirs since they were
+    memoized are picked up.
+    """
+    clear_theme_cache()
+
+
+@receiver(setting_changed, dispatch_uid='theming.invalidate_theme_cache_on_setting_changed')
+def invalidate_theme_cache_on_setting_changed(*_args, **kwargs):
+    """
+    Clear the memoized themes when the themes dirs are overridden.
+    """
+    if kwargs['setting'] in THEME_SETTINGS:
+        clear_theme_cache()
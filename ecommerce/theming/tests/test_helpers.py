@@ -10,13 +10,17 @@ from mock import patch
 from ecommerce.tests.testcases import TestCase
 from ecommerce.theming.helpers import (
     Theme,
+    clear_theme_cache,
     get_all_theme_template_dirs,
     get_current_site_theme,
     get_current_theme,
+    get_theme,
     get_theme_base_dir,
     get_theme_base_dirs,
-    get_themes
+    get_themes,
+    warm_theme_cache
 )
+from ecommerce.theming.models import SiteTheme
 from ecommerce.theming.test_utils import with_comprehensive_theme
 
 
@@ -195,3 +199,60 @@ class TestHelpers(TestCase):
         Tests get_theme_base_dir returns None if theme is not found istead of raising an error.
         """
         self.assertIsNone(get_theme_base_dir("non-existent-theme", suppress_error=True))
+
+
+class TestThemeCache(TestCase):
+    """
+    Test memoization of themes by get_theme.
+    """
+
+    def setUp(self):
+        super(TestThemeCache, self).setUp()
+        clear_theme_cache()
+        self.addCleanup(clear_theme_cache)
+
+    def test_get_theme_memoized(self):
+        """
+        Tests the themes dirs are only scanned the first time a theme is looked up.
+        """
+        with patch('ecommerce.theming.helpers.get_theme_base_dir', wraps=get_theme_base_dir) as mock_base_dir:
+            theme = get_theme('test-theme')
+            self.assertIs(get_theme('test-theme'), theme)
+            self.assertIs(theme.template_dirs, get_theme('test-theme').template_dirs)
+
+        self.assertEqual(mock_base_dir.call_count, 1)
+        self.assertEqual(theme, Theme('test-theme', 'test-theme', settings.COMPREHENSIVE_THEME_DIRS[0]))
+
+    def test_get_theme_not_found(self):
+        """
+        Tests get_theme returns None, and does not memoize anything, for themes not in the themes dirs.
+        """
+        with patch('ecommerce.theming.helpers.get_theme_base_dir', wraps=get_theme_base_dir) as mock_base_dir:
+            self.assertIsNone(get_theme('non-existent-theme'))
+            self.assertIsNone(get_theme('non-existent-theme'))
+
+        self.assertEqual(mock_base_dir.call_count, 2)
+
+    def test_site_theme_save_clears_cache(self):
+        """
+        Tests saving or deleting a site theme clears the memoized themes.
+        """
+        theme = get_theme('test-theme')
+        site_theme = SiteTheme.objects.create(site=self.site, theme_dir_name='test-theme-2')
+        self.assertIsNot(get_theme('test-theme'), theme)
+
+        theme = get_theme('test-theme')
+        site_theme.delete()
+        self.assertIsNot(get_theme('test-theme'), theme)
+
+    def test_warm_theme_cache(self):
+        """
+        Tests warm_theme_cache memoizes all the themes.
+        """
+        warm_theme_cache()
+
+        with patch('ecommerce.theming.helpers.get_theme_base_dir') as mock_base_dir:
+            themes = [get_theme(theme.theme_dir_name) for theme in get_themes()]
+
+        self.assertFalse(mock_base_dir.called)
+        self.assertCountEqual(themes, get_themes())